@@ -19,6 +19,7 @@ import { Product, Transaction, Customer, Supplier, CartItem, PaymentMethod, Tran
 import { authAPI, productsAPI, customersAPI, suppliersAPI, transactionsAPI, shiftsAPI, quotationsAPI, settingsAPI, usersAPI, activityLogAPI, systemAPI } from './services/endpoints';
 import { handleAPIError } from './services/errorHandler';
 import { useAutoLogout } from './hooks/useAutoLogout';
+import { useLiveUpdates, applyProductEvent, isUnknownProduct } from './hooks/useLiveUpdates';
 
 // Helper to load from localStorage
 const loadState = <T,>(key: string, fallback: T): T => {
@@ -85,6 +86,32 @@ function App() {
     enabled: isAuthenticated // Only run when user is logged in
   });
 
+  const reloadProducts = async () => {
+    try {
+      setProducts(getListData(await productsAPI.list()));
+    } catch (err) {
+      console.error('Error reloading products:', err);
+    }
+  };
+
+  // Live stock / price / settings changes from other tills
+  useLiveUpdates({
+    onProduct: (event) => {
+      if (isUnknownProduct(products, event)) reloadProducts();
+      else setProducts(prev => applyProductEvent(prev, event));
+    },
+    onCatalogChange: reloadProducts,
+    onSettingsChange: async () => {
+      try {
+        const res = await settingsAPI.get();
+        if (res.data) setSettings(prev => ({ ...res.data, currentShiftId: prev.currentShiftId }));
+      } catch (err) {
+        console.error('Error reloading settings:', err);
+      }
+    },
+    enabled: isAuthenticated
+  });
+
   // Check authentication on mount (with browser close detection)
   useEffect(() => {
     const token = localStorage.getItem('token');
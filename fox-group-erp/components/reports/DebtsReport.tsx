@@ -1,14 +1,14 @@
 import React from 'react';
 import { AlertOctagon, ShoppingBag } from 'lucide-react';
-import { Customer, Supplier } from '../../types';
+import { DashboardReport } from '../../types';
 
 interface DebtsReportProps {
-  customersWithDebt: Customer[];
+  customersWithDebt: DashboardReport['customers_with_debt'];
   totalReceivables: number;
-  suppliersWithCredit: Supplier[];
+  suppliersWithCredit: DashboardReport['suppliers_with_credit'];
   totalPayables: number;
   topSuppliers: Array<{name: string, amount: number}>;
-  overdueInvoices: any[];
+  overdueInvoices: DashboardReport['overdue_invoices'];
 }
 
 export const DebtsReport: React.FC<DebtsReportProps> = ({
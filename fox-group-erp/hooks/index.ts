@@ -77,6 +77,7 @@ export {
 
 // Other hooks
 export { useAutoLogout } from './useAutoLogout';
+export { useLiveUpdates, applyProductEvent, isUnknownProduct } from './useLiveUpdates';
 export { useDebounce } from './useDebounce';
-export { useReportsData } from './useReportsData';
+export { useDashboardReport, dashboardKeys } from './useDashboardReport';
 export { useTreasuryBalance } from './useTreasuryBalance';
@@ -0,0 +1,26 @@
+import { useQuery } from '@tanstack/react-query';
+import { reportsAPI } from '../services/endpoints';
+import { DashboardReport } from '../types';
+
+// Query Keys
+export const dashboardKeys = {
+    all: ['reports', 'dashboard'] as const,
+    range: (from_date?: string, to_date?: string) =>
+        [...dashboardKeys.all, { from_date, to_date }] as const,
+};
+
+/**
+ * Hook to fetch the pre-aggregated dashboard KPIs for a date range.
+ * Replaces downloading the whole transaction history and aggregating it
+ * in the browser.
+ */
+export const useDashboardReport = (from_date?: string, to_date?: string) => {
+    return useQuery({
+        queryKey: dashboardKeys.range(from_date, to_date),
+        queryFn: async () => {
+            const response = await reportsAPI.dashboard({ from_date, to_date });
+            return response.data as DashboardReport;
+        },
+        staleTime: 60 * 1000,
+    });
+};
@@ -0,0 +1,147 @@
+import { useEffect, useRef } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { Product } from '../types';
+import { productKeys } from './useProducts';
+import { settingsKeys } from './useSettings';
+
+const API_BASE_URL = import.meta.env.VITE_API_URL || '/api';
+const RECONNECT_DELAY = 3000;
+const MAX_RECONNECT_DELAY = 5 * 60 * 1000;
+
+export interface LiveProductEvent {
+  id: number;
+  stock?: number;
+  price?: number;
+  active?: boolean;
+  deleted?: boolean;
+}
+
+interface UseLiveUpdatesOptions {
+  onProduct?: (event: LiveProductEvent) => void; // one product's stock / price changed
+  onCatalogChange?: () => void; // many products changed (or events were missed): refetch
+  onSettingsChange?: () => void;
+  enabled?: boolean; // default: true - only run when user is authenticated
+}
+
+/**
+ * Whether an event is about a product the list does not have (e.g. created
+ * or reactivated at another till): the event does not carry the whole
+ * product, so the list has to be refetched
+ */
+export const isUnknownProduct = (products: Product[], event: LiveProductEvent): boolean =>
+  !event.deleted && event.active !== false && !products.some(p => p.id === event.id);
+
+/**
+ * Apply a product event to a product list (deactivated products are dropped)
+ */
+export const applyProductEvent = (products: Product[], event: LiveProductEvent): Product[] => {
+  if (event.deleted || event.active === false) {
+    return products.filter(p => p.id !== event.id);
+  }
+  return products.map(p => p.id === event.id ? {
+    ...p,
+    quantity: event.stock ?? p.quantity,
+    sellPrice: event.price ?? p.sellPrice,
+  } : p);
+};
+
+/**
+ * Subscribe to the server's live event stream (/api/events/) so stock,
+ * prices and settings changed at another till show up without polling.
+ * EventSource resumes from the last event id after a dropped connection;
+ * the stream is reopened with the current token when the server closes it,
+ * backing off while it keeps failing. A server that cannot stream (WSGI)
+ * answers 'unavailable' and the hook stops.
+ */
+export const useLiveUpdates = ({
+  onProduct,
+  onCatalogChange,
+  onSettingsChange,
+  enabled = true
+}: UseLiveUpdatesOptions) => {
+  const queryClient = useQueryClient();
+  const handlersRef = useRef({ onProduct, onCatalogChange, onSettingsChange });
+  handlersRef.current = { onProduct, onCatalogChange, onSettingsChange };
+
+  useEffect(() => {
+    if (!enabled) return;
+
+    let source: EventSource | null = null;
+    let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+    let lastEventId = '';
+    let closed = false;
+    let reconnectDelay = RECONNECT_DELAY;
+
+    const track = (e: MessageEvent) => {
+      if (e.lastEventId) lastEventId = e.lastEventId;
+    };
+
+    const refetchCatalog = (e: MessageEvent) => {
+      track(e);
+      queryClient.invalidateQueries({ queryKey: productKeys.all });
+      handlersRef.current.onCatalogChange?.();
+    };
+
+    const connect = () => {
+      const token = localStorage.getItem('token');
+      if (!token || closed) return;
+
+      const params = new URLSearchParams({ token });
+      if (lastEventId) params.set('last_event_id', lastEventId);
+      source = new EventSource(`${API_BASE_URL}/events/?${params}`);
+
+      source.onopen = () => {
+        reconnectDelay = RECONNECT_DELAY;
+      };
+
+      source.addEventListener('ready', track);
+
+      source.addEventListener('unavailable', () => {
+        closed = true;
+        source?.close();
+      });
+
+      source.addEventListener('product', (e: MessageEvent) => {
+        track(e);
+        const event: LiveProductEvent = JSON.parse(e.data);
+        const lists = queryClient.getQueriesData<Product[]>({ queryKey: productKeys.lists() })
+          .map(([, data]) => data)
+          .filter((data): data is Product[] => Array.isArray(data));
+        if (lists.length && lists.every(list => isUnknownProduct(list, event))) {
+          queryClient.invalidateQueries({ queryKey: productKeys.lists() });
+        }
+        queryClient.setQueriesData<Product[]>({ queryKey: productKeys.lists() }, (old) =>
+          old ? applyProductEvent(old, event) : old
+        );
+        handlersRef.current.onProduct?.(event);
+      });
+
+      source.addEventListener('catalog', refetchCatalog);
+      source.addEventListener('reset', refetchCatalog);
+
+      source.addEventListener('settings', (e: MessageEvent) => {
+        track(e);
+        queryClient.invalidateQueries({ queryKey: settingsKeys.all });
+        handlersRef.current.onSettingsChange?.();
+      });
+
+      source.onerror = () => {
+        // CLOSED means the browser gave up (e.g. 401 after the token expired,
+        // or 404 from a server without the stream): reopen with whatever
+        // token is current now, waiting longer after each failure
+        if (source?.readyState === EventSource.CLOSED && !closed) {
+          reconnectTimer = setTimeout(connect, reconnectDelay);
+          reconnectDelay = Math.min(reconnectDelay * 2, MAX_RECONNECT_DELAY);
+        }
+      };
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      if (reconnectTimer) clearTimeout(reconnectTimer);
+      source?.close();
+    };
+  }, [enabled, queryClient]);
+};
@@ -1,22 +1,20 @@
 import React, { useState, useEffect } from 'react';
-import { Transaction, ActivityLogEntry, Customer, Supplier, Product, User, Shift, AppSettings } from '../types';
+import { Transaction, ActivityLogEntry, Product, User, Shift, AppSettings, DashboardReport } from '../types';
 import { FileText, Download, Calendar, Activity, Wallet, ArrowRight, Package, Printer, History } from 'lucide-react';
-import { useReportsData } from '../hooks/useReportsData';
+import { useDashboardReport } from '../hooks/useDashboardReport';
 import { SalesReport } from '../components/reports/SalesReport';
 import { InventoryReport } from '../components/reports/InventoryReport';
 import { FinancialReport } from '../components/reports/FinancialReport';
 import { DebtsReport } from '../components/reports/DebtsReport';
 import { ActivityReport } from '../components/reports/ActivityReport';
 import { ShiftsReport } from '../components/reports/ShiftsReport';
-import { transactionsAPI, activityLogAPI, shiftsAPI, customersAPI, suppliersAPI, productsAPI } from '../services/endpoints';
+import { transactionsAPI, activityLogAPI, shiftsAPI, productsAPI } from '../services/endpoints';
 import { handleAPIError } from '../services/errorHandler';
 
 const Reports: React.FC = () => {
   const [transactions, setTransactions] = useState<Transaction[]>([]);
   const [logs, setLogs] = useState<ActivityLogEntry[]>([]);
   const [shifts, setShifts] = useState<Shift[]>([]);
-  const [customers, setCustomers] = useState<Customer[]>([]);
-  const [suppliers, setSuppliers] = useState<Supplier[]>([]);
   const [products, setProducts] = useState<Product[]>([]);
   const [loading, setLoading] = useState(false);
   const [activeTab, setActiveTab] = useState<'sales' | 'inventory' | 'financial' | 'debts' | 'activity' | 'shifts'>('sales');
@@ -34,12 +32,10 @@ const Reports: React.FC = () => {
   const fetchAllData = async () => {
     setLoading(true);
     try {
-      const [transactionsRes, logsRes, shiftsRes, customersRes, suppliersRes, productsRes] = await Promise.all([
+      const [transactionsRes, logsRes, shiftsRes, productsRes] = await Promise.all([
         transactionsAPI.list({ from_date: startDate, to_date: endDate }),
         activityLogAPI.list({ from_date: startDate, to_date: endDate }),
         shiftsAPI.list(),
-        customersAPI.list(),
-        suppliersAPI.list(),
         productsAPI.list()
       ]);
       
@@ -53,8 +49,6 @@ const Reports: React.FC = () => {
       setTransactions(extractData(transactionsRes));
       setLogs(extractData(logsRes));
       setShifts(extractData(shiftsRes));
-      setCustomers(extractData(customersRes));
-      setSuppliers(extractData(suppliersRes));
       setProducts(extractData(productsRes));
     } catch (err: any) {
       alert(handleAPIError(err));
@@ -62,8 +56,6 @@ const Reports: React.FC = () => {
       setTransactions([]);
       setLogs([]);
       setShifts([]);
-      setCustomers([]);
-      setSuppliers([]);
       setProducts([]);
     } finally {
       setLoading(false);
@@ -74,36 +66,31 @@ const Reports: React.FC = () => {
   const [isPrintModalOpen, setIsPrintModalOpen] = useState(false);
   const [selectedShift, setSelectedShift] = useState<Shift | null>(null);
 
-  // Destructure Data
+  // Figures for the range, aggregated on the server
+  const { data: report, isLoading: reportLoading } = useDashboardReport(startDate, endDate);
   const {
-    chartData,
-    totalSales,
-    totalReturns,
-    netSales,
-    totalExpenses,
-    expenseBreakdown,
-    cogs,
-    grossProfit,
-    netIncome,
-    customersWithDebt,
-    totalReceivables,
-    suppliersWithCredit,
-    totalPayables,
-    totalInventoryCost,
-    totalInventoryValue,
-    potentialProfit,
-    topSelling,
-    topCustomers,
-    overdueInvoices,
-    totalCapital,
-    totalWithdrawals
-  } = useReportsData({
-    transactions,
-    filteredTransactions: transactions,
-    customers,
-    suppliers,
-    products
-  });
+    chart_data: chartData = [],
+    total_sales: totalSales = 0,
+    total_returns: totalReturns = 0,
+    net_sales: netSales = 0,
+    expense_breakdown: expenseBreakdown = {},
+    cogs = 0,
+    gross_profit: grossProfit = 0,
+    net_income: netIncome = 0,
+    customers_with_debt: customersWithDebt = [],
+    total_receivables: totalReceivables = 0,
+    suppliers_with_credit: suppliersWithCredit = [],
+    total_payables: totalPayables = 0,
+    total_inventory_cost: totalInventoryCost = 0,
+    total_inventory_value: totalInventoryValue = 0,
+    potential_profit: potentialProfit = 0,
+    top_selling: topSelling = [],
+    top_customers: topCustomers = [],
+    top_suppliers: topSuppliers = [],
+    overdue_invoices: overdueInvoices = [],
+    total_capital: totalCapital = 0,
+    total_withdrawals: totalWithdrawals = 0
+  }: Partial<DashboardReport> = report ?? {};
 
   const handleExportCSV = () => {
     const headers = ['ID', 'التاريخ', 'النوع', 'المبلغ', 'الوصف', 'طريقة الدفع'];
@@ -182,7 +169,7 @@ const Reports: React.FC = () => {
 
       {/* Content Area */}
       <div className="bg-dark-950 rounded-xl border border-dark-800 p-6 min-h-[500px]">
-        {loading ? (
+        {loading || reportLoading ? (
           <div className="flex items-center justify-center h-64">
             <div className="text-gray-400">جاري تحميل البيانات...</div>
           </div>
@@ -259,7 +246,7 @@ const Reports: React.FC = () => {
             totalReceivables={totalReceivables}
             suppliersWithCredit={suppliersWithCredit}
             totalPayables={totalPayables}
-            topSuppliers={[]}
+            topSuppliers={topSuppliers}
             overdueInvoices={overdueInvoices}
           />
         )}
@@ -10,6 +10,7 @@ import type {
   User,
   ActivityLogEntry,
   PaymentMethod,
+  PartyStatement,
 } from '../types';
 
 export const productsAPI = {
@@ -59,6 +60,41 @@ export const productsAPI = {
 
   adjustStock: (id: number, data: { quantity_diff: number; reason: string }) =>
     apiClient.post(`/products/${id}/adjust_stock/`, data),
+
+  labels: (data: {
+    category?: string;
+    ids?: number[];
+    missing_only?: boolean;
+    assign?: boolean;
+    layout?: '3x8' | '4x10' | '2x7';
+    show_price?: boolean;
+  }) =>
+    apiClient.post('/products/labels/', data, { responseType: 'blob' }),
+
+  bulkUpdate: (data: {
+    filters?: { category?: string; search?: string; ids?: number[] };
+    price?: {
+      field?: 'selling_price' | 'purchase_price' | 'both';
+      mode?: 'percent' | 'absolute' | 'set';
+      value: number;
+      rounding?: number;
+      rounding_mode?: 'nearest' | 'up' | 'down';
+    };
+    min_stock_level?: number;
+    is_active?: boolean;
+    dry_run?: boolean;
+  }) =>
+    apiClient.post('/products/bulk_update/', data),
+
+  importFile: (file: File, options?: { update_existing?: boolean; dry_run?: boolean }) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('update_existing', String(options?.update_existing ?? true));
+    formData.append('dry_run', String(options?.dry_run ?? false));
+    return apiClient.post('/products/import/', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+  },
 };
 
 export const customersAPI = {
@@ -101,6 +137,9 @@ export const customersAPI = {
 
     return apiClient.post(`/customers/${id}/settle_debt/`, data);
   },
+
+  statement: (id: number, params?: { from_date?: string; to_date?: string }) =>
+    apiClient.get<PartyStatement>(`/customers/${id}/statement/`, { params }),
 };
 
 export const suppliersAPI = {
@@ -143,6 +182,9 @@ export const suppliersAPI = {
 
     return apiClient.post(`/suppliers/${id}/settle_debt/`, data);
   },
+
+  statement: (id: number, params?: { from_date?: string; to_date?: string }) =>
+    apiClient.get<PartyStatement>(`/suppliers/${id}/statement/`, { params }),
 };
 
 interface SaleRequest {
@@ -200,6 +242,18 @@ export const transactionsAPI = {
   }) =>
     apiClient.get<Transaction[]>('/transactions/', { params }),
 
+  export: (params?: {
+    type?: string;
+    status?: string;
+    from_date?: string;
+    to_date?: string;
+    file_type?: ExportFileType;
+  }) =>
+    apiClient.get('/transactions/export/', { params, responseType: 'blob' }),
+
+  invoicePdf: (id: string) =>
+    apiClient.get(`/transactions/${id}/pdf/`, { responseType: 'blob' }),
+
   createSale: async (data: SaleRequest) => {
     const { offlineService } = await import('./offline');
 
@@ -353,6 +407,12 @@ export const quotationsAPI = {
   convert: (id: string, data: { payment_method: PaymentMethod }) =>
     apiClient.post<Transaction>(`/quotations/${id}/convert/`, data),
 
+  convertMany: (data: { ids: (string | number)[]; payment_method: PaymentMethod }) =>
+    apiClient.post('/quotations/convert_many/', data),
+
+  pdf: (id: string) =>
+    apiClient.get(`/quotations/${id}/pdf/`, { responseType: 'blob' }),
+
   delete: (id: string) =>
     apiClient.delete(`/quotations/${id}/`),
 };
@@ -398,6 +458,8 @@ export const activityLogAPI = {
     apiClient.get<ActivityLogEntry[]>('/activity-logs/', { params }),
 };
 
+type ExportFileType = 'csv' | 'xlsx';
+
 interface ReportParams {
   from_date?: string;
   to_date?: string;
@@ -416,8 +478,20 @@ export const reportsAPI = {
   debts: () =>
     apiClient.get('/reports/debts/'),
 
+  aging: (params?: { as_of?: string; entity_type?: 'customer' | 'supplier' }) =>
+    apiClient.get('/reports/aging/', { params }),
+
   profitLoss: (params?: ReportParams) =>
     apiClient.get('/reports/profit_loss/', { params }),
+
+  dashboard: (params?: ReportParams) =>
+    apiClient.get('/reports/dashboard/', { params }),
+
+  export: (
+    report: 'sales' | 'inventory' | 'treasury' | 'debts' | 'profit_loss' | 'dashboard',
+    params?: ReportParams & { file_type?: ExportFileType }
+  ) =>
+    apiClient.get(`/reports/${report}/export/`, { params, responseType: 'blob' }),
 };
 
 export const systemAPI = {
@@ -141,3 +141,67 @@ export interface ActivityLogEntry {
   action: string;
   details: string;
 }
+
+export interface DashboardNamedAmount {
+  id: number | string;
+  name: string;
+  amount: number;
+}
+
+export interface DashboardReport {
+  from_date: string | null;
+  to_date: string | null;
+  chart_data: { date: string; sales: number; expenses: number; purchases: number }[];
+  total_sales: number;
+  total_returns: number;
+  net_sales: number;
+  total_purchases: number;
+  total_expenses: number;
+  expense_breakdown: Record<string, number>;
+  cogs: number;
+  gross_profit: number;
+  net_income: number;
+  customers_with_debt: { id: number; name: string; balance: number }[];
+  total_receivables: number;
+  suppliers_with_credit: { id: number; name: string; balance: number }[];
+  total_payables: number;
+  overdue_invoices: {
+    id: string;
+    type: string;
+    amount: number;
+    dueDate: string;
+    date: string;
+    isSale: boolean;
+    relatedName: string | null;
+  }[];
+  total_inventory_cost: number;
+  total_inventory_value: number;
+  potential_profit: number;
+  low_stock_count: number;
+  top_selling: { id: string; name: string; qty: number; revenue: number }[];
+  top_customers: DashboardNamedAmount[];
+  top_suppliers: DashboardNamedAmount[];
+  total_capital: number;
+  total_withdrawals: number;
+}
+
+export interface PartyStatementEntry {
+  id: number;
+  date: string;
+  amount: number;
+  balance: number;
+  transactionId: string | null;
+  description: string;
+}
+
+export interface PartyStatement {
+  party_type: 'customer' | 'supplier';
+  party_id: number;
+  from_date: string | null;
+  to_date: string | null;
+  opening_balance: number;
+  total_increases: number;
+  total_decreases: number;
+  closing_balance: number;
+  entries: PartyStatementEntry[];
+}
@@ -0,0 +1,163 @@
+"""
+Buffered ActivityLog writer
+
+Activity records are queued in memory on the request path and written in
+batches with bulk_create from a background thread, either when the batch
+fills up or when the flush interval elapses. Pending records are flushed
+when the process exits.
+
+Configured through settings.ACTIVITY_LOG:
+    MODE            'async' (buffered, default) or 'sync' (one INSERT per call)
+    BATCH_SIZE      Records per bulk_create and size threshold for a flush
+    FLUSH_INTERVAL  Seconds between time-based flushes
+    MAX_QUEUE_SIZE  Queue bound; when full, the caller writes synchronously
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'MODE': 'async',
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_QUEUE_SIZE': 10000,
+}
+
+
+def get_config():
+    """Merge settings.ACTIVITY_LOG over the defaults"""
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'ACTIVITY_LOG', {}))
+    return config
+
+
+class ActivityLogWriter:
+    """Collects unsaved ActivityLog instances and writes them in batches"""
+
+    def __init__(self, batch_size=100, flush_interval=2.0, max_queue_size=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def enqueue(self, record):
+        """Queue an unsaved ActivityLog instance for writing"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            # Backpressure: the writer is falling behind, write inline
+            self._write([record])
+            return
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def flush(self):
+        """Write every queued record; safe to call from any thread"""
+        with self._flush_lock:
+            while True:
+                batch = self._drain(self.batch_size)
+                if not batch:
+                    break
+                self._write(batch)
+
+    def shutdown(self, timeout=10):
+        """Stop the background thread and flush whatever is left"""
+        self._stopped.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+    def pending(self):
+        """Number of records waiting to be written"""
+        return self._queue.qsize()
+
+    def _ensure_started(self):
+        # Start lazily and restart after a fork: threads do not survive fork(),
+        # so each gunicorn worker gets its own writer thread.
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == pid and self._thread.is_alive():
+                return
+            self._pid = pid
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='activity-log-writer', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                # Honour CONN_MAX_AGE / health checks for the writer's own connection
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception('Activity log flush failed')
+        # Release the writer thread's own database connection
+        from django.db import connections
+        connections.close_all()
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, records):
+        from .models import ActivityLog
+
+        try:
+            ActivityLog.objects.bulk_create(records, batch_size=self.batch_size)
+        except Exception:
+            logger.exception('Failed to write %d activity log records', len(records))
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_activity_log_writer():
+    """Process-wide writer, created on first use"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                config = get_config()
+                _writer = ActivityLogWriter(
+                    batch_size=config['BATCH_SIZE'],
+                    flush_interval=config['FLUSH_INTERVAL'],
+                    max_queue_size=config['MAX_QUEUE_SIZE'],
+                )
+    return _writer
+
+
+def shutdown_activity_log_writer():
+    """Flush pending records on interpreter exit"""
+    if _writer is not None:
+        _writer.shutdown()
+
+
+atexit.register(shutdown_activity_log_writer)
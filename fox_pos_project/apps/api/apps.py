@@ -5,3 +5,25 @@ class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.api'
     verbose_name = 'Fox ERP API'
+
+    def ready(self):
+        from django.db.models.signals import post_save, post_delete
+        from django.contrib.auth.models import User
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+        from apps.products.models import Product
+        from .authentication import shift_changed, user_changed
+        from .catalog import product_changed
+        from .live import product_deleted, product_saved, settings_saved
+        from .models import AppSettings, Shift
+        from .tokens import token_blacklisted
+
+        post_save.connect(product_changed, sender=Product, dispatch_uid='catalog_version_save')
+        post_delete.connect(product_changed, sender=Product, dispatch_uid='catalog_version_delete')
+        post_save.connect(product_saved, sender=Product, dispatch_uid='live_product_save')
+        post_delete.connect(product_deleted, sender=Product, dispatch_uid='live_product_delete')
+        post_save.connect(settings_saved, sender=AppSettings, dispatch_uid='live_settings_save')
+        post_save.connect(user_changed, sender=User, dispatch_uid='auth_version_user_save')
+        post_delete.connect(user_changed, sender=User, dispatch_uid='auth_version_user_delete')
+        post_save.connect(shift_changed, sender=Shift, dispatch_uid='auth_version_shift_save')
+        post_delete.connect(shift_changed, sender=Shift, dispatch_uid='auth_version_shift_delete')
+        post_save.connect(token_blacklisted, sender=BlacklistedToken, dispatch_uid='jwt_blacklist_save')
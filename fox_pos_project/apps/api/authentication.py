@@ -0,0 +1,154 @@
+"""
+JWT authentication without a user query per request
+
+CachedJWTAuthentication resolves the token's user from a small in-process
+cache instead of running a SELECT on auth_user for every API call, and
+get_open_shift() serves the user's open shift from the same entry (loaded
+on first use), so a typical authenticated request reaches the view without
+touching the database.
+
+Each entry is keyed on the user id and the user's auth version, a counter
+in the shared cache (see apps.api.catalog.get_version) that signals bump
+when the user is saved or deleted (password change, deactivation, role
+change) or one of their shifts is opened or closed, combined with a
+global auth version that a system reset moves on (it deletes shifts and
+users without signals, see invalidate_all_users). Every worker process
+checks the version on each request, so a change shows everywhere on the
+next request; AUTH_USER_CACHE['TIMEOUT'] bounds the age of an entry anyway.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .catalog import bump_version, get_version
+
+_NOT_LOADED = object()
+
+_entries = {}
+_lock = threading.Lock()
+
+
+def _config():
+    return {'TIMEOUT': 60, 'MAX_ENTRIES': 1000, **getattr(settings, 'AUTH_USER_CACHE', {})}
+
+
+AUTH_VERSION_KEY = 'auth:version'
+
+
+def _version_key(user_id):
+    return f'auth:user:{user_id}:version'
+
+
+def _auth_version(user_id):
+    return get_version(AUTH_VERSION_KEY), get_version(_version_key(user_id))
+
+
+class _Entry:
+    __slots__ = ('version', 'expires', 'user', 'shift')
+
+    def __init__(self, version, expires, user):
+        self.version = version
+        self.expires = expires
+        self.user = user
+        self.shift = _NOT_LOADED
+
+
+def _get_entry(user_id, load_user):
+    """
+    The current cache entry of a user, (re)built with load_user() when it is
+    missing, expired or from an older auth version
+    """
+    version = _auth_version(user_id)
+    now = time.monotonic()
+    entry = _entries.get(user_id)
+    if entry is not None and entry.version == version and entry.expires > now:
+        return entry
+
+    config = _config()
+    entry = _Entry(version, now + config['TIMEOUT'], load_user())
+    with _lock:
+        if len(_entries) >= config['MAX_ENTRIES']:
+            for key in [key for key, cached in _entries.items() if cached.expires <= now] or list(_entries):
+                del _entries[key]
+        _entries[user_id] = entry
+    return entry
+
+
+def get_open_shift(user):
+    """
+    The user's open shift, or None
+
+    Served from the user's auth cache entry once loaded; the instance
+    returned is a copy, so callers can modify it freely.
+    """
+    from .models import Shift
+
+    if not user or not user.is_authenticated:
+        return None
+
+    entry = _get_entry(user.pk, load_user=lambda: copy.copy(user))
+    if entry.shift is _NOT_LOADED:
+        entry.shift = Shift.objects.filter(user_id=user.pk, status='open').first()
+    return copy.copy(entry.shift)
+
+
+def invalidate_user(user_id):
+    """Move the user's auth version on once the current transaction commits"""
+    bump_version(_version_key(user_id))
+
+
+def invalidate_all_users():
+    """
+    Drop every cached user and open shift once the current transaction commits
+
+    For set-based writes that send no signals (ResetService clearing shifts).
+    """
+    bump_version(AUTH_VERSION_KEY)
+
+
+def user_changed(sender, instance, **kwargs):
+    """post_save / post_delete receiver for User"""
+    invalidate_user(instance.pk)
+
+
+def shift_changed(sender, instance, **kwargs):
+    """post_save / post_delete receiver for Shift"""
+    invalidate_user(instance.user_id)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the token's user through the auth cache"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user_model = get_user_model()
+
+        def load_user():
+            try:
+                return user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except user_model.DoesNotExist:
+                return None
+
+        user = _get_entry(user_id, load_user).user
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        # Each request gets its own instance; the cached one is never handed out
+        return copy.copy(user)
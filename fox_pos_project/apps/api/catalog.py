@@ -0,0 +1,74 @@
+"""
+Catalog version
+
+A counter that changes whenever products change, so anything that caches
+catalog data (product lists, POS lookups, dashboards) can key its cache on
+it instead of tracking individual rows. It lives in the shared cache, so
+every worker process sees the same value.
+
+ORM saves and deletes bump it through signals; set-based writes
+(update(), bulk_create(), bulk_update()) do not send signals and must
+call bump_catalog_version() themselves, which also tells the tills to
+refetch the catalog (a 'catalog' live event, see apps.api.live).
+
+get_version() / bump_version() are the same counter for any key; the
+dashboard KPIs (apps.reports.kpis) version their cached fragments with them.
+A bump writes a new random value rather than incrementing: the file cache
+has no atomic incr (it is a get and a set), and readers only compare the
+value with the one they saw, so two concurrent bumps must not be able to
+land on the same value. Every write passes timeout=None, as a plain set()
+would fall back to the cache's default timeout.
+"""
+import secrets
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def _new_version():
+    # Time-based with a random tail: a cleared cache never goes back to an
+    # old value and two processes never write the same one
+    return time.time_ns() << 20 | secrets.randbits(20)
+
+
+def get_version(key):
+    """Current value of a version counter in the shared cache (created on first use)"""
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def set_new_version(key):
+    """Move a version counter on now; returns the new value"""
+    version = _new_version()
+    cache.set(key, version, timeout=None)
+    return version
+
+
+def bump_version(key):
+    """Move a version counter on once the current transaction commits"""
+    transaction.on_commit(lambda: set_new_version(key))
+
+
+def get_catalog_version():
+    """Current catalog version (created on first use)"""
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Move to a new catalog version once the current transaction commits"""
+    from .live import publish
+
+    bump_version(CATALOG_VERSION_KEY)
+    publish('catalog', {})
+
+
+def product_changed(sender, **kwargs):
+    """post_save / post_delete receiver for Product (the live event is per product)"""
+    bump_version(CATALOG_VERSION_KEY)
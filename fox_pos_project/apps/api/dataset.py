@@ -0,0 +1,400 @@
+"""
+Synthetic benchmark data
+
+Generators behind the `generate_dataset` command. Every value comes from a
+random.Random seeded with the dataset seed plus a scope ('catalog' or a day
+number), so a day's rows are the same whichever worker process generates
+them and in whatever order: the same arguments always give the same
+database.
+
+Amounts are carried as integer piastres and turned into Decimal only when
+a row is built, so totals add up exactly.
+"""
+import csv
+import io
+import json
+import random
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.db import connection, transaction
+
+SALE = 'بيع'
+PURCHASE = 'شراء'
+RETURN = 'مرتجع'
+EXPENSE = 'مصروف'
+CAPITAL = 'إيداع رأس مال'
+SETTLEMENT = 'تسوية دين'
+DEFERRED = 'آجل'
+
+# (code prefix, category, unit, cost range in EGP, product kinds)
+PRODUCT_FAMILIES = [
+    ('CRN', 'كرانيش', 'متر', (30, 180), ['كرنيشة']),
+    ('PNL', 'بانوهات', 'قطعة', (20, 260), ['بانوه حائط', 'بانوه سقف']),
+    ('RZT', 'روزيت', 'قطعة', (80, 450), ['روزيت سقف']),
+    ('SKR', 'سكرتنج', 'متر', (40, 140), ['سكرتنج']),
+    ('TRM', 'حلويات ديكور', 'قطعة', (50, 200), ['حلية زاوية', 'حلية جدار', 'كابيتال عمود']),
+    ('LGT', 'إضاءة', 'قطعة', (90, 900), ['أباليك', 'نجفة', 'سبوت']),
+    ('GLU', 'لوازم', 'كرتونة', (15, 90), ['معجون لاصق', 'سيليكون', 'غراء']),
+]
+MATERIALS = ['فوم', 'فيوتك', 'بولي يوريثان', 'جبس', 'خشب', 'نحاسي']
+STYLES = ['مودرن', 'كلاسيك', 'سادة', 'مزخرف', 'إيطالي', 'تركي']
+SIZES = ['4سم', '6سم', '8سم', '10سم', '12سم', '15سم', '50x50', '60سم']
+
+FIRST_NAMES = [
+    'محمد', 'أحمد', 'محمود', 'مصطفى', 'علي', 'حسن', 'حسين', 'إبراهيم', 'يوسف', 'عمر',
+    'خالد', 'طارق', 'سامي', 'كريم', 'هشام', 'ياسر', 'عادل', 'وليد', 'شريف', 'أيمن',
+]
+FAMILY_NAMES = [
+    'عبد الله', 'السيد', 'حسنين', 'الشافعي', 'المصري', 'عبد الرحمن', 'النجار', 'الحداد',
+    'سليمان', 'منصور', 'رمضان', 'عثمان', 'فتحي', 'الجمال', 'زكي',
+]
+TRADES = ['للمقاولات', 'للديكور', 'للتشطيبات', 'للتجارة', 'للإنشاءات']
+SUPPLIER_KINDS = ['مصنع', 'شركة', 'مؤسسة']
+SUPPLIER_NAMES = ['فيوتك', 'النيل', 'الأهرام', 'الدلتا', 'القاهرة', 'الإسكندرية', 'المستقبل', 'الشرق', 'الصفوة']
+SUPPLIER_TRADES = ['للتصنيع', 'للإضاءة', 'لمواد الديكور', 'للتجارة والتوريدات', 'للبلاستيك']
+CITIES = ['القاهرة', 'الجيزة', 'الإسكندرية', 'المنصورة', 'طنطا', 'الزقازيق', 'أسيوط']
+
+# (category, daily probability or None for the 1st of each month, amount range in EGP)
+EXPENSES = [
+    ('إيجار', None, (8000, 15000)),
+    ('رواتب', None, (15000, 40000)),
+    ('كهرباء ومياه', 0.1, (300, 900)),
+    ('نقل', 0.4, (100, 600)),
+    ('مصروفات تشغيلية', 0.5, (50, 400)),
+]
+PAYMENT_METHODS = ['كاش', 'محفظة', 'Instapay', DEFERRED]
+PAYMENT_WEIGHTS = [60, 12, 10, 18]
+ITEM_COUNTS = [1, 2, 3, 4, 5]
+ITEM_COUNT_WEIGHTS = [40, 30, 15, 10, 5]
+QUANTITIES = [1, 1, 1, 2, 2, 3, 4, 5, 10]
+
+RETURN_RATE = 0.01
+SETTLEMENT_RATE = 0.8      # share of deferred invoices paid later
+SETTLEMENT_DAYS = (5, 45)  # paid this many days after the invoice
+OPENING_CAPITAL = 100000 * 100
+
+TRANSACTION_FIELDS = [
+    'transaction_id', 'type', 'date', 'amount', 'payment_method', 'description', 'category',
+    'related_customer_id', 'related_supplier_id', 'items', 'status', 'due_date',
+    'is_direct_sale', 'shift_id', 'created_by_id',
+]
+
+
+def money(piastres):
+    return Decimal(piastres) / 100
+
+
+def settlement_id(transaction_id):
+    """Id of the transaction that settles a deferred invoice"""
+    return f'SET-{transaction_id}'
+
+
+def settlement_description(party_type):
+    # As the customers / suppliers settle_debt actions word it
+    return 'تحصيل دين - كاش' if party_type == 'customer' else 'سداد دين - كاش'
+
+
+def build_catalog(seed, products, customers, suppliers):
+    """
+    Products, customers and suppliers as field dicts
+
+    Customer 0 is the walk-in cash customer.
+    """
+    rng = random.Random(f'{seed}:catalog')
+
+    product_rows = []
+    for index in range(products):
+        prefix, category, unit, (low, high), kinds = PRODUCT_FAMILIES[index % len(PRODUCT_FAMILIES)]
+        cost = rng.randint(low * 100, high * 100)
+        product_rows.append({
+            'product_code': f'{prefix}-{index + 1:06d}',
+            'product_name': f'{rng.choice(kinds)} {rng.choice(MATERIALS)} {rng.choice(STYLES)} {rng.choice(SIZES)}',
+            'category': category,
+            'unit': unit,
+            'purchase_price': money(cost),
+            'selling_price': money(int(cost * rng.uniform(1.25, 1.8))),
+            'min_stock_level': rng.choice((10, 20, 50, 100)),
+            'current_stock': rng.randint(0, 500),
+        })
+
+    customer_rows = [{
+        'customer_code': 'C000001',
+        'customer_name': 'عميل نقدي',
+        'customer_type': 'consumer',
+        'phone': '0000000000',
+        'credit_limit': 0,
+    }]
+    for index in range(1, customers):
+        if rng.random() < 0.3:
+            name = f'{rng.choice(FAMILY_NAMES)} {rng.choice(TRADES)}'
+        else:
+            name = f'{rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(FAMILY_NAMES)}'
+        customer_rows.append({
+            'customer_code': f'C{index + 1:06d}',
+            'customer_name': name,
+            'customer_type': 'regular',
+            'phone': f'01{rng.choice("0125")}{rng.randrange(10 ** 8):08d}',
+            'city': rng.choice(CITIES),
+            'credit_limit': rng.choice((0, 5000, 10000, 20000, 50000)),
+        })
+
+    supplier_rows = [
+        {
+            'supplier_code': f'S{index + 1:06d}',
+            'supplier_name': f'{rng.choice(SUPPLIER_KINDS)} {rng.choice(SUPPLIER_NAMES)} {rng.choice(SUPPLIER_TRADES)}',
+            'phone': f'02{rng.randrange(10 ** 8):08d}',
+            'city': rng.choice(CITIES),
+        }
+        for index in range(suppliers)
+    ]
+    return product_rows, customer_rows, supplier_rows
+
+
+class DayContext:
+    """
+    What every worker needs to generate a day, sent once per process
+
+    Products are (id, name, cost, price) with prices in piastres; sales pick
+    them with a skewed popularity so a few products sell most.
+    """
+
+    def __init__(self, seed, start, days, sales_per_day, products, customer_ids, supplier_ids,
+                 first_shift_id, user_id, tz):
+        self.seed = seed
+        self.start = start
+        self.days = days
+        self.sales_per_day = sales_per_day
+        self.products = products
+        self.customer_ids = customer_ids
+        self.supplier_ids = supplier_ids
+        self.first_shift_id = first_shift_id
+        self.user_id = user_id
+        self.tz = tz
+
+        popularity = [1 / (rank + 1) ** 0.8 for rank in range(len(products))]
+        random.Random(f'{seed}:popularity').shuffle(popularity)
+        self.cum_weights = list(accumulate(popularity))
+
+    def at(self, day_index, seconds):
+        """Aware local datetime `seconds` after midnight of a history day"""
+        day = self.start + timedelta(days=day_index)
+        return datetime.combine(day, time.min, tzinfo=self.tz) + timedelta(seconds=seconds)
+
+
+def generate_day(ctx, day_index):
+    """
+    Every transaction of one day of history
+
+    Returns:
+        dict with
+            'transactions': Transaction field dicts, including the cash
+                settlement (dated on its own day, in that day's shift) of
+                each deferred invoice that gets paid
+            'shift': totals of the day's shift
+            'deferred': one tuple per deferred invoice, (date, transaction_id,
+                party_type, party_id, piastres, due_date, settled_at or None)
+    """
+    rng = random.Random(f'{ctx.seed}:{day_index}')
+    day = ctx.start + timedelta(days=day_index)
+    shift_id = ctx.first_shift_id + day_index
+    stamp = day.strftime('%y%m%d')
+
+    transactions = []
+    deferred = []
+    sales_by_method = dict.fromkeys(PAYMENT_METHODS, 0)
+
+    def add(transaction_id, type_, seconds, piastres, payment_method, on_day=day_index, **fields):
+        transactions.append({
+            'transaction_id': transaction_id,
+            'type': type_,
+            'date': ctx.at(on_day, seconds),
+            'amount': money(piastres),
+            'payment_method': payment_method,
+            'description': fields.pop('description', ''),
+            'category': fields.pop('category', None),
+            'related_customer_id': fields.pop('customer_id', None),
+            'related_supplier_id': fields.pop('supplier_id', None),
+            'items': json.dumps(fields.pop('items', []), ensure_ascii=False),
+            'status': 'completed',
+            'due_date': fields.pop('due_date', None),
+            'is_direct_sale': False,
+            'shift_id': ctx.first_shift_id + on_day,
+            'created_by_id': ctx.user_id,
+        })
+
+    def defer(seconds, transaction_id, party_type, party_id, piastres, due_date):
+        """
+        Queue a deferred invoice for the ledger; when it gets paid within the
+        generated history, add its settlement on the settlement day
+        """
+        settled_at = None
+        if rng.random() < SETTLEMENT_RATE:
+            settle_day = day_index + rng.randint(*SETTLEMENT_DAYS)
+            settle_seconds = rng.randint(10 * 3600, 22 * 3600)
+            if settle_day < ctx.days:
+                settled_at = ctx.at(settle_day, settle_seconds)
+                add(settlement_id(transaction_id), SETTLEMENT, settle_seconds, piastres, 'كاش', on_day=settle_day,
+                    description=settlement_description(party_type), **{f'{party_type}_id': party_id})
+        deferred.append((ctx.at(day_index, seconds), transaction_id, party_type, party_id,
+                         piastres, due_date, settled_at))
+
+    if day_index == 0:
+        add(f'CAP-{stamp}-000001', CAPITAL, 9 * 3600, OPENING_CAPITAL, 'كاش', description='رأس مال افتتاحي')
+
+    # Sales, fewer on Fridays, spread over opening hours (10:00 - 22:00)
+    volume = ctx.sales_per_day * (0.6 if day.weekday() == 4 else 1.0)
+    count = max(0, round(rng.gauss(volume, volume * 0.15)))
+    for number, seconds in enumerate(sorted(rng.randint(10 * 3600, 22 * 3600) for _ in range(count)), 1):
+        lines = rng.choices(ctx.products, cum_weights=ctx.cum_weights, k=rng.choices(ITEM_COUNTS, ITEM_COUNT_WEIGHTS)[0])
+        items, total = [], 0
+        for product_id, name, cost, price in lines:
+            quantity = rng.choice(QUANTITIES)
+            total += quantity * price
+            items.append({
+                'id': product_id, 'name': name, 'quantity': quantity,
+                'price': price / 100, 'costPrice': cost / 100, 'sellPrice': price / 100, 'discount': 0.0,
+            })
+
+        payment_method = rng.choices(PAYMENT_METHODS, PAYMENT_WEIGHTS)[0]
+        if payment_method == DEFERRED or rng.random() < 0.4:
+            customer_id = rng.choice(ctx.customer_ids[1:] or ctx.customer_ids)
+        else:
+            customer_id = ctx.customer_ids[0]
+        if payment_method == DEFERRED and customer_id == ctx.customer_ids[0]:
+            payment_method = 'كاش'
+
+        transaction_id = f'INV-{stamp}-{number:06d}'
+        due_date = None
+        if payment_method == DEFERRED:
+            due_date = day + timedelta(days=rng.choice((14, 30)))
+            defer(seconds, transaction_id, 'customer', customer_id, total, due_date)
+        add(transaction_id, SALE, seconds, total, payment_method,
+            customer_id=customer_id, items=items, due_date=due_date)
+        sales_by_method[payment_method] += total
+
+        # Paid-up sales are occasionally returned (one line) later the same day
+        if payment_method != DEFERRED and rng.random() < RETURN_RATE and seconds < 22 * 3600:
+            line = rng.choice(items)
+            refund = round(line['quantity'] * line['price'] * 100)
+            add(f'RET-{stamp}-{number:06d}', RETURN, rng.randint(seconds + 1, 22 * 3600), refund, payment_method,
+                customer_id=customer_id, items=[line], description=f'مرتجع من الفاتورة {transaction_id}')
+
+    # Purchases
+    for number in range(1, max(1, round(rng.gauss(ctx.sales_per_day / 20, 1))) + 1):
+        seconds = rng.randint(10 * 3600, 18 * 3600)
+        supplier_id = rng.choice(ctx.supplier_ids)
+        items, total = [], 0
+        for product_id, name, cost, _ in rng.sample(ctx.products, min(len(ctx.products), rng.randint(2, 6))):
+            quantity = rng.choice((10, 20, 50, 100))
+            total += quantity * cost
+            items.append({'id': product_id, 'name': name, 'quantity': quantity, 'cost_price': cost / 100})
+
+        payment_method = DEFERRED if rng.random() < 0.3 else 'كاش'
+        transaction_id = f'PUR-{stamp}-{number:06d}'
+        due_date = None
+        if payment_method == DEFERRED:
+            due_date = day + timedelta(days=30)
+            defer(seconds, transaction_id, 'supplier', supplier_id, total, due_date)
+        add(transaction_id, PURCHASE, seconds, total, payment_method,
+            supplier_id=supplier_id, items=items, due_date=due_date)
+
+    # Expenses
+    number = 0
+    for category, probability, (low, high) in EXPENSES:
+        if (day.day == 1) if probability is None else (rng.random() < probability):
+            number += 1
+            add(f'EXP-{stamp}-{number:06d}', EXPENSE, rng.randint(10 * 3600, 20 * 3600),
+                rng.randint(low * 100, high * 100), 'كاش', category=category, description=category)
+
+    start_cash = rng.randint(20, 100) * 100 * 100
+    paid_sales = sum(amount for method, amount in sales_by_method.items() if method != DEFERRED)
+    return {
+        'transactions': transactions,
+        'deferred': deferred,
+        'shift': {
+            'shift_id': shift_id,
+            'start_cash': money(start_cash),
+            'total_sales': money(sum(sales_by_method.values())),
+            'sales_by_method': {method: float(money(amount)) for method, amount in sales_by_method.items()},
+            'expected_cash': money(start_cash + paid_sales),
+            'end_cash': money(start_cash + paid_sales),
+        },
+    }
+
+
+def _copy_value(value):
+    if value is None:
+        return r'\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def write_rows(model, fields, rows):
+    """
+    Insert rows (tuples in `fields` order) with COPY on PostgreSQL
+
+    Raw inserts keep the generated timestamps, which auto_now_add fields
+    would overwrite through the ORM. Other backends get executemany.
+    """
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow([_copy_value(value) for value in row])
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+        else:
+            placeholders = ', '.join(['%s'] * len(fields))
+            cursor.executemany(
+                f'INSERT INTO {table} ({columns}) VALUES ({placeholders})',
+                [
+                    [
+                        connection.ops.adapt_datetimefield_value(value) if isinstance(value, datetime) else value
+                        for value in row
+                    ]
+                    for row in rows
+                ]
+            )
+
+
+_worker_context = None
+
+
+def init_worker(ctx):
+    """Pool initializer: keep the day context (each process opens its own connection)"""
+    global _worker_context
+    import django
+    django.setup()
+    _worker_context = ctx
+
+
+def generate_chunk(day_indices):
+    """
+    Generate and insert the transactions of consecutive days
+
+    Returns:
+        [(shift totals, deferred invoices, transaction count)] per day
+    """
+    from .models import Transaction
+
+    results, rows = [], []
+    for day_index in day_indices:
+        day = generate_day(_worker_context, day_index)
+        rows.extend(tuple(row[name] for name in TRANSACTION_FIELDS) for row in day['transactions'])
+        results.append((day['shift'], day['deferred'], len(day['transactions'])))
+
+    with transaction.atomic():
+        write_rows(Transaction, TRANSACTION_FIELDS, rows)
+    return results
@@ -0,0 +1,173 @@
+"""
+Streaming CSV / XLSX exports
+
+Rows are pulled from querysets with `.iterator()` so an export never holds
+the whole result set in memory. The row sources bind each queryset to its
+database when they are called, in the view: a CSV is only read while the
+response streams, after the request's replica routing (fox_pos.db_router)
+has been reset.
+
+* CSV is written row by row into a StreamingHttpResponse, so the first
+  bytes leave the server as soon as the first chunk is read.
+* XLSX uses openpyxl's write-only mode, which spills rows to a temporary
+  file instead of keeping cell objects around; the finished workbook is
+  then streamed back from disk.
+"""
+import csv
+import itertools
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+CHUNK_SIZE = 2000
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class Echo:
+    """File-like object whose write() hands the line back to the csv writer"""
+
+    def write(self, value):
+        return value
+
+
+def get_export_format(request):
+    """
+    Read the requested file type (?file_type=csv|xlsx, default csv).
+
+    `format` itself is reserved by DRF for renderer negotiation.
+    """
+    file_type = request.query_params.get('file_type', 'csv').lower()
+    if file_type not in EXPORT_FORMATS:
+        raise ValidationError({'file_type': 'صيغة التصدير غير مدعومة (csv أو xlsx)'})
+    return file_type
+
+
+def _cell(value):
+    """Convert DB values into something both csv and openpyxl accept"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        # Excel has no time zones: export local wall-clock time
+        return timezone.localtime(value).replace(tzinfo=None)
+    return value
+
+
+def stream_csv(headers, rows, filename):
+    """Stream rows as a UTF-8 CSV (with BOM so Excel shows Arabic correctly)"""
+    writer = csv.writer(Echo())
+
+    def generate():
+        yield '\ufeff' + writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow([_cell(value) for value in row])
+
+    response = StreamingHttpResponse(generate(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def build_xlsx(headers, rows, filename, sheet_title='Sheet'):
+    """Write rows into a write-only workbook on disk and stream the file back"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title[:31])
+    sheet.sheet_view.rightToLeft = True
+    sheet.append(headers)
+    for row in rows:
+        sheet.append([_cell(value) for value in row])
+
+    # Deleted automatically once the response closes it
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f'{filename}.xlsx',
+        content_type=XLSX_CONTENT_TYPE
+    )
+
+
+def export_response(request, headers, rows, filename, sheet_title='Sheet'):
+    """Return a CSV or XLSX download depending on ?file_type="""
+    if get_export_format(request) == 'xlsx':
+        return build_xlsx(headers, rows, filename, sheet_title)
+    return stream_csv(headers, rows, filename)
+
+
+def iterate(queryset, *fields):
+    """values_list() iterator in bounded chunks, on the database routed to now"""
+    return queryset.using(queryset.db).values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+# ============================================================================
+# Row sources
+# ============================================================================
+
+TRANSACTION_HEADERS = [
+    'رقم المعاملة', 'النوع', 'التاريخ', 'المبلغ', 'طريقة الدفع', 'الحالة',
+    'التصنيف', 'العميل', 'المورد', 'تاريخ الاستحقاق', 'الوصف', 'المستخدم',
+]
+
+
+def transaction_rows(queryset):
+    return iterate(
+        queryset,
+        'transaction_id', 'type', 'date', 'amount', 'payment_method', 'status',
+        'category', 'related_customer__customer_name', 'related_supplier__supplier_name',
+        'due_date', 'description', 'created_by__username',
+    )
+
+
+PRODUCT_HEADERS = [
+    'الكود', 'الصنف', 'التصنيف', 'الرصيد', 'حد الطلب', 'سعر الشراء',
+    'سعر البيع', 'قيمة المخزون', 'منخفض',
+]
+
+
+def product_rows(queryset):
+    rows = iterate(
+        queryset,
+        'product_code', 'product_name', 'category', 'current_stock',
+        'min_stock_level', 'purchase_price', 'selling_price',
+    )
+    return (
+        (
+            code, name, category, stock, min_stock, cost, price,
+            stock * cost, 'نعم' if stock <= min_stock else '',
+        )
+        for code, name, category, stock, min_stock, cost, price in rows
+    )
+
+
+DEBT_HEADERS = ['الجهة', 'الرقم', 'الاسم', 'المديونية']
+
+
+def debt_rows(customers, suppliers):
+    customers = iterate(customers, 'customer_id', 'customer_name', 'current_balance')
+    suppliers = iterate(suppliers, 'supplier_id', 'supplier_name', 'current_balance')
+    return itertools.chain(
+        (('عميل', customer_id, name, abs(balance)) for customer_id, name, balance in customers),
+        (('مورد', supplier_id, name, balance) for supplier_id, name, balance in suppliers),
+    )
+
+
+SUMMARY_HEADERS = ['البند', 'القيمة']
+
+
+def summary_rows(data, prefix=''):
+    """Flatten a report dict into (key, value) rows, skipping nested lists"""
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield from summary_rows(value, f'{prefix}{key} / ')
+        elif not isinstance(value, (list, tuple)):
+            yield (f'{prefix}{key}', value)
+
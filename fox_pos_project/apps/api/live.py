@@ -0,0 +1,359 @@
+"""
+Live product and settings events for the tills (server-sent events)
+
+    GET /api/events/?token=<access token>
+    Last-Event-ID: 1234                  (sent by EventSource on reconnect)
+
+    id: 1235
+    event: product
+    data: {"id": 17, "stock": 42.0, "price": 55.0, "active": true}
+
+Events are written to live_events by publish() in the transaction that
+made the change, and announced with NOTIFY, which PostgreSQL only delivers
+once that transaction commits. Kinds:
+
+    product   {id, stock, price, active} or {id, deleted: true}
+    catalog   {} - many products changed at once (import, bulk update, reset): refetch
+    settings  {id} - application settings changed: refetch
+    reset     {} - the requested resume point is gone: refetch everything
+    unavailable {} - this server cannot stream (see events_unavailable): stop listening
+
+The stream is served by the ASGI application (fox_pos/asgi.py routes
+EVENTS_PATH here without going through Django's request handling), so an
+idle connection is one coroutine and one small queue. Each process has a
+single EventHub: one thread LISTENs on a dedicated connection (other
+backends poll the table) and fans events out to the connections'
+queues. A connection that falls QUEUE_SIZE events behind is closed; the
+browser reconnects with Last-Event-ID and resumes from the table, which
+keeps RETENTION_HOURS of events. Under a WSGI server (waitress, gunicorn's
+default workers) the path is a plain Django view that answers
+'unavailable' once, so the tills stop asking.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PATH = '/api/events/'
+CHANNEL = 'fox_live_events'
+PRUNE_INTERVAL = 3600
+# Reconnect delay for a browser that ignores 'unavailable' (ms)
+UNAVAILABLE_RETRY = 3600 * 1000
+
+_OVERFLOW = object()
+
+
+def live_settings():
+    return {
+        'QUEUE_SIZE': 100,
+        'HEARTBEAT': 20,
+        'RETENTION_HOURS': 24,
+        'BACKLOG_LIMIT': 1000,
+        'POLL_INTERVAL': 1.0,
+        **getattr(settings, 'LIVE_EVENTS', {}),
+    }
+
+
+def _as_message(event):
+    return {'id': event.event_id, 'kind': event.kind, 'data': event.payload}
+
+
+def publish(kind, payload):
+    """Record an event in the current transaction; it is pushed once that commits"""
+    from .models import LiveEvent
+
+    event = LiveEvent.objects.create(kind=kind, payload=payload)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, json.dumps(_as_message(event))])
+    return event
+
+
+def product_payload(product):
+    return {
+        'id': product.product_id,
+        'stock': float(product.current_stock),
+        'price': float(product.selling_price),
+        'active': product.is_active,
+    }
+
+
+def product_saved(sender, instance, **kwargs):
+    """post_save receiver for Product"""
+    publish('product', product_payload(instance))
+
+
+def product_deleted(sender, instance, **kwargs):
+    """post_delete receiver for Product"""
+    publish('product', {'id': instance.product_id, 'deleted': True})
+
+
+def settings_saved(sender, instance, **kwargs):
+    """post_save receiver for AppSettings"""
+    publish('settings', {'id': instance.pk})
+
+
+def latest_event_id():
+    from .models import LiveEvent
+
+    return LiveEvent.objects.order_by('-event_id').values_list('event_id', flat=True).first() or 0
+
+
+def events_since(last_id, limit=None):
+    """
+    Events after last_id, oldest first, or None when they cannot all be
+    replayed (pruned already, or more than BACKLOG_LIMIT)
+    """
+    from .models import LiveEvent
+
+    limit = limit or live_settings()['BACKLOG_LIMIT']
+    events = list(LiveEvent.objects.filter(event_id__gt=last_id).order_by('event_id')[:limit + 1])
+    if len(events) > limit:
+        return None
+    if last_id and not LiveEvent.objects.filter(event_id__lte=last_id).exists():
+        # Nothing at or before the resume point is left: it may have been pruned
+        oldest = events[0].event_id if events else None
+        if oldest is None or oldest > last_id + 1:
+            return None
+    return [_as_message(event) for event in events]
+
+
+def prune_events():
+    from .models import LiveEvent
+
+    cutoff = timezone.now() - timedelta(hours=live_settings()['RETENTION_HOURS'])
+    return LiveEvent.objects.filter(created_at__lt=cutoff).delete()[0]
+
+
+class Subscriber:
+    """One open event stream: a bounded queue the hub fills"""
+
+    def __init__(self, size):
+        self.queue = asyncio.Queue(maxsize=size)
+        self.overflowed = False
+
+    def offer(self, message):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop the backlog and close; it resumes from the table
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_OVERFLOW)
+
+
+class EventHub:
+    """Per-process fan-out of live events to the open streams"""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def subscribe(self):
+        subscriber = Subscriber(live_settings()['QUEUE_SIZE'])
+        with self.lock:
+            self.loop = asyncio.get_running_loop()
+            self.subscribers.add(subscriber)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='live-events', daemon=True)
+                self.thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def _deliver(self, messages):
+        """Runs on the event loop"""
+        for subscriber in list(self.subscribers):
+            for message in messages:
+                subscriber.offer(message)
+
+    def publish_local(self, messages):
+        if messages and self.loop is not None:
+            self.loop.call_soon_threadsafe(self._deliver, messages)
+
+    def _run(self):
+        from .services.token_service import TokenMaintenanceService
+
+        config = live_settings()
+        last_id, last_prune = None, 0.0
+        while True:
+            try:
+                close_old_connections()
+                if last_id is None:
+                    last_id = latest_event_id()
+                else:
+                    # Catch up on whatever happened while not listening
+                    missed = events_since(last_id)
+                    if missed is None:
+                        missed = [{'id': latest_event_id(), 'kind': 'reset', 'data': {}}]
+                    if missed:
+                        last_id = missed[-1]['id']
+                        self.publish_local(missed)
+
+                if connection.vendor == 'postgresql':
+                    last_id = self._listen(last_id, config)
+                else:
+                    time.sleep(config['POLL_INTERVAL'])
+
+                if time.monotonic() - last_prune > PRUNE_INTERVAL:
+                    prune_events()
+                    # Long-running servers: expired tokens go on the same schedule
+                    TokenMaintenanceService.prune_expired()
+                    last_prune = time.monotonic()
+            except Exception:
+                logger.exception('Live event listener failed, retrying')
+                time.sleep(5)
+
+    def _listen(self, last_id, config):
+        """LISTEN until the prune interval is due (or the connection drops)"""
+        listener = connections.create_connection('default')
+        try:
+            listener.ensure_connection()
+            with listener.cursor() as cursor:
+                cursor.execute(f'LISTEN {CHANNEL}')
+            raw = listener.connection
+            deadline = time.monotonic() + PRUNE_INTERVAL
+            while time.monotonic() < deadline:
+                if not select.select([raw], [], [], config['HEARTBEAT'])[0]:
+                    continue
+                raw.poll()
+                # In commit order, which is not always id order
+                messages = [json.loads(raw.notifies.pop(0).payload) for _ in range(len(raw.notifies))]
+                if messages:
+                    last_id = max(last_id, *(message['id'] for message in messages))
+                    self.publish_local(messages)
+            return last_id
+        finally:
+            listener.close()
+
+
+hub = EventHub()
+
+
+def _authenticate(token):
+    """The active user of an access token, or None"""
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+    from .authentication import CachedJWTAuthentication
+
+    authentication = CachedJWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(token))
+    except (AuthenticationFailed, InvalidToken):
+        return None
+
+
+def _sse(message):
+    data = json.dumps(message['data'], ensure_ascii=False, separators=(',', ':'))
+    return f"id: {message['id']}\nevent: {message['kind']}\ndata: {data}\n\n".encode()
+
+
+def events_unavailable(request):
+    """
+    EVENTS_PATH when the request reached Django, i.e. under a WSGI server
+
+    Only the ASGI application (fox_pos/asgi.py) serves the stream. A 404
+    here would make EventSource retry every few seconds, token and all.
+    """
+    from django.http import HttpResponse
+
+    return HttpResponse(
+        f'retry: {UNAVAILABLE_RETRY}\nevent: unavailable\ndata: {{}}\n\n',
+        content_type='text/event-stream; charset=utf-8',
+        headers={'Cache-Control': 'no-cache'}
+    )
+
+
+async def _plain_response(send, status, text):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'text/plain; charset=utf-8')]})
+    await send({'type': 'http.response.body', 'body': text.encode()})
+
+
+async def _wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def events_app(scope, receive, send):
+    """ASGI application serving EVENTS_PATH"""
+    if scope['method'] != 'GET':
+        await _plain_response(send, 405, 'Method not allowed')
+        return
+
+    query = parse_qs(scope.get('query_string', b'').decode())
+    headers = {name.decode().lower(): value.decode() for name, value in scope['headers']}
+    token = query.get('token', [''])[0]
+    if not token and headers.get('authorization', '').startswith('Bearer '):
+        token = headers['authorization'][len('Bearer '):]
+    user = await sync_to_async(_authenticate)(token) if token else None
+    if user is None:
+        await _plain_response(send, 401, 'Authentication required')
+        return
+
+    try:
+        last_id = int(headers.get('last-event-id') or query.get('last_event_id', [''])[0])
+    except ValueError:
+        last_id = None
+
+    config = live_settings()
+    # Subscribe before reading the backlog so nothing falls in between
+    subscriber = hub.subscribe()
+    disconnect = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        if last_id is None:
+            backlog = [{'id': await sync_to_async(latest_event_id)(), 'kind': 'ready', 'data': {}}]
+        else:
+            backlog = await sync_to_async(events_since)(last_id)
+            if backlog is None:
+                backlog = [{'id': await sync_to_async(latest_event_id)(), 'kind': 'reset', 'data': {}}]
+
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ]})
+        body = b'retry: 3000\n\n' + b''.join(_sse(message) for message in backlog)
+        await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+        # The queue may repeat what the backlog already had
+        replayed = {message['id'] for message in backlog}
+
+        while True:
+            receiving = asyncio.ensure_future(subscriber.queue.get())
+            done, _ = await asyncio.wait({receiving, disconnect}, timeout=config['HEARTBEAT'],
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if disconnect in done:
+                receiving.cancel()
+                return
+            if receiving not in done:
+                receiving.cancel()
+                await send({'type': 'http.response.body', 'body': b': ping\n\n', 'more_body': True})
+                continue
+
+            message = receiving.result()
+            if message is _OVERFLOW:
+                break
+            if message['id'] not in replayed:
+                await send({'type': 'http.response.body', 'body': _sse(message), 'more_body': True})
+
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnect.cancel()
+        hub.unsubscribe(subscriber)
@@ -0,0 +1,127 @@
+"""
+Time the hot transaction queries with and without the access-path indexes
+
+    python manage.py generate_dataset --days 730 --sales-per-day 13700 --workers 8 --reset
+    python manage.py benchmark_transaction_indexes
+    python manage.py benchmark_transaction_indexes --repeat 10 --day 2025-06-15
+
+Each query is built with the same ORM calls as the views and services and
+run with EXPLAIN ANALYZE; the median of --repeat runs (after one warm-up)
+is reported. "Before" is measured inside a transaction that drops the
+indexes of api 0010 and is then rolled back, so the database is left as
+it was - but until then the DROP holds an exclusive lock on transactions:
+run it against a benchmark database, not a shop's.
+"""
+import statistics
+from collections import Counter
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.api import partitioning
+from apps.api.models import Shift, Transaction
+from apps.api.query_plans import Plan, explain, table_of
+from apps.api.utils import filter_date_range
+
+SALE = 'بيع'
+PAGE_SIZE = 50
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the hot transaction queries before and after the api 0010 indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query (default 5)')
+        parser.add_argument('--day', help='Day for the date-range queries, YYYY-MM-DD '
+                                          '(default: the day of the latest transaction)')
+
+    def handle(self, *args, **options):
+        if not partitioning.is_postgresql():
+            raise CommandError('The benchmark needs PostgreSQL')
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+
+        names = [index.name for index in Transaction._meta.indexes]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT indexname FROM pg_indexes WHERE schemaname = %s AND indexname = ANY(%s)',
+                [partitioning.SCHEMA, names]
+            )
+            missing = set(names) - {row[0] for row in cursor.fetchall()}
+        if missing:
+            raise CommandError(f"Missing indexes (run migrate first): {', '.join(sorted(missing))}")
+
+        queries = self.queries(options['day'])
+        total = Transaction.objects.count()
+        self.stdout.write(f'{total} transactions, {len(queries)} queries, median of {options["repeat"]} runs\n')
+
+        after = {label: self.measure(queryset, options['repeat']) for label, queryset in queries}
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for name in names:
+                    cursor.execute(f'DROP INDEX {partitioning.qualified(name)}')
+            before = {label: self.measure(queryset, options['repeat']) for label, queryset in queries}
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{"Query":<28}{"Before ms":>12}{"After ms":>12}{"Speed-up":>10}  Access path')
+        for label, _ in queries:
+            (before_ms, before_path), (after_ms, after_path) = before[label], after[label]
+            self.stdout.write(
+                f'{label:<28}{before_ms:>12.2f}{after_ms:>12.2f}{before_ms / max(after_ms, 0.001):>9.1f}x'
+                f'  {before_path} -> {after_path}'
+            )
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark finished; the indexes are unchanged'))
+
+    def queries(self, day):
+        """[(label, queryset)] mirroring TransactionViewSet, ReportsViewSet and the services"""
+        latest = Transaction.objects.aggregate(last=Max('date'))['last']
+        if latest is None:
+            raise CommandError('No transactions to benchmark; run generate_dataset first')
+        try:
+            day = date.fromisoformat(day) if day else timezone.localtime(latest).date()
+        except ValueError:
+            raise CommandError('--day must look like YYYY-MM-DD')
+        first_of_month = day.replace(day=1)
+
+        transactions = Transaction.objects.all()
+        sales = transactions.filter(type=SALE)
+        recent = transactions.order_by('-date')
+        customer_id = recent.filter(related_customer__isnull=False).values_list('related_customer', flat=True).first()
+        supplier_id = recent.filter(related_supplier__isnull=False).values_list('related_supplier', flat=True).first()
+        shift_id = Shift.objects.order_by('-shift_id').values_list('shift_id', flat=True).first()
+
+        queries = [
+            ('List, first page', recent[:PAGE_SIZE]),
+            ('List, one day', filter_date_range(recent, day, day)[:PAGE_SIZE]),
+            ('Sales report, one day',
+             filter_date_range(sales, day, day).values_list('payment_method', 'amount')),
+            ('Sales report, one month',
+             filter_date_range(sales, first_of_month, day).values_list('payment_method', 'amount')),
+            ('Pending approvals', recent.filter(status='pending')[:PAGE_SIZE]),
+        ]
+        if customer_id:
+            queries.append(('Customer history', recent.filter(related_customer=customer_id)[:PAGE_SIZE]))
+        if supplier_id:
+            queries.append(('Supplier history', recent.filter(related_supplier=supplier_id)[:PAGE_SIZE]))
+        if shift_id:
+            queries.append(('Shift transactions', recent.filter(shift=shift_id)))
+        return queries
+
+    def measure(self, queryset, repeat):
+        """(median ms, access path) of EXPLAIN ANALYZE runs, planning included"""
+        sql, params = queryset.query.sql_with_params()
+        explain(sql, params, analyze=True)
+        timings = []
+        for _ in range(repeat):
+            result = explain(sql, params, analyze=True)
+            timings.append(result['Planning Time'] + result['Execution Time'])
+        return statistics.median(timings), access_path(Plan(sql, result['Plan']))
+
+
+def access_path(plan):
+    """How the plan reads transactions, e.g. 'Index Scan x2, Seq Scan x1'"""
+    scans = Counter(node['Node Type'] for _, node in plan.nodes() if table_of(node) == 'transactions')
+    return ', '.join(f'{node_type} x{count}' for node_type, count in scans.most_common()) or '-'
@@ -1,9 +1,5 @@
 from django.core.management.base import BaseCommand
-from apps.api.models import Transaction, Shift, ActivityLog
-from apps.quotations.models import Quotation
-from apps.customers.models import Customer
-from apps.suppliers.models import Supplier
-from apps.products.models import Product
+from apps.api.services.reset_service import ResetService
 
 
 class Command(BaseCommand):
@@ -11,27 +7,13 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         self.stdout.write('جاري مسح البيانات...')
-        
-        # Delete all data (order matters due to foreign keys)
-        Transaction.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS('✓ تم مسح المعاملات'))
-        
-        Quotation.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS('✓ تم مسح عروض الأسعار'))
-        
-        Shift.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS('✓ تم مسح الورديات'))
-        
-        ActivityLog.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS('✓ تم مسح سجل الأنشطة'))
-        
-        Product.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS('✓ تم مسح المنتجات'))
-        
-        Customer.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS('✓ تم مسح العملاء'))
-        
-        Supplier.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS('✓ تم مسح الموردين'))
-        
-        self.stdout.write(self.style.SUCCESS('\n[OK] تم مسح جميع البيانات بنجاح!'))
+
+        report = ResetService.clear_all_data()
+        for row in report:
+            rows = '' if row['rows'] is None else f" ({row['rows']} صف)"
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {row['table']}: {row['method']}{rows} - {row['seconds']:.3f}s"
+            ))
+
+        total = sum(row['seconds'] for row in report)
+        self.stdout.write(self.style.SUCCESS(f'\n[OK] تم مسح جميع البيانات بنجاح! ({total:.3f}s)'))
@@ -0,0 +1,56 @@
+"""
+Write pre-compressed .gz copies of text assets in STATIC_ROOT
+
+    python manage.py collectstatic --noinput
+    python manage.py compress_static
+
+fox_pos/static_files.py sends the .gz copy to clients that accept gzip.
+Files whose .gz copy is already up to date are skipped, so running it on
+every start is cheap.
+"""
+import gzip
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from fox_pos.static_files import COMPRESSIBLE_EXTENSIONS
+
+MIN_SIZE = 1024
+
+
+class Command(BaseCommand):
+    help = 'Pre-compress static text assets (JS, CSS, HTML, SVG, JSON) with gzip'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', default=str(settings.STATIC_ROOT),
+                            help='Directory to compress (default STATIC_ROOT)')
+
+    def handle(self, *args, **options):
+        compressed = skipped = 0
+        for directory, _, filenames in os.walk(options['root']):
+            for filename in filenames:
+                if not filename.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                    continue
+                path = os.path.join(directory, filename)
+                if os.path.getsize(path) < MIN_SIZE:
+                    continue
+                target = path + '.gz'
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    skipped += 1
+                    continue
+
+                temp_target = f'{target}.tmp'
+                with open(path, 'rb') as source, open(temp_target, 'wb') as raw:
+                    # mtime=0 keeps the output identical between runs
+                    with gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=9, mtime=0) as output:
+                        shutil.copyfileobj(source, output)
+
+                # Keep the copy only when it actually saves bytes
+                if os.path.getsize(temp_target) < os.path.getsize(path) * 0.9:
+                    os.replace(temp_target, target)
+                    compressed += 1
+                else:
+                    os.remove(temp_target)
+
+        self.stdout.write(self.style.SUCCESS(f'Compressed {compressed} files, {skipped} already up to date'))
@@ -0,0 +1,276 @@
+"""
+Generate a synthetic benchmark database
+
+    python manage.py generate_dataset                               # ~73k transactions
+    python manage.py generate_dataset --days 730 --sales-per-day 13700 --workers 8 --reset
+                                                                    # ~10M transactions
+    python manage.py generate_dataset --seed 7 --end-date 2025-12-31   # reproducible
+
+Products, customers and suppliers are bulk-created; a year of shifts,
+sales, returns, purchases and expenses is generated in parallel worker
+processes, each COPYing its own days. Deferred invoices get ledger entries
+and a debt; one settled later also gets a cash settlement transaction in
+that day's shift (customer collections count in its cash), a payment entry
+and a debt payment, while an unsettled one stays an open debt, so customer /
+supplier balances end up equal to the open debts.
+
+The same --seed and --end-date always give the same rows. Needs users to
+own the shifts (create_test_users) and an empty database (or --reset).
+"""
+import os
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from multiprocessing import Pool
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.api import dataset, partitioning
+from apps.api.catalog import bump_catalog_version
+from apps.api.models import PartyLedgerEntry, Shift, Transaction
+from apps.api.services.debt_service import DEBT_TYPES
+from apps.api.services.reset_service import ResetService
+from apps.customers.models import Customer
+from apps.products.models import Product
+from apps.suppliers.models import Supplier
+from apps.treasury.models import Debt, DebtPayment
+
+LEDGER_FIELDS = ['party_type', 'party_id', 'date', 'amount', 'balance', 'transaction_id', 'description', 'created_by']
+DEBT_FIELDS = [
+    'debt_id', 'debt_type', 'entity_type', 'entity_id', 'reference_type', 'transaction_id', 'original_amount',
+    'paid_amount', 'remaining_amount', 'due_date', 'status', 'created_at', 'updated_at',
+]
+PAYMENT_FIELDS = ['debt', 'payment_amount', 'payment_date', 'payment_method', 'created_by', 'created_at']
+SHIFT_FIELDS = ['shift_id', 'user', 'start_time', 'end_time', 'start_cash', 'sales_by_method', 'status']
+FLUSH_ROWS = 50000
+CHUNK_SALES = 50000  # Sales per worker task, rounded to whole days
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic dataset for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000)
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument('--suppliers', type=int, default=50)
+        parser.add_argument('--days', type=int, default=365, help='Days of history (default 365)')
+        parser.add_argument('--sales-per-day', type=int, default=200, help='Average sales per day (default 200)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--end-date', help='Last day of history, YYYY-MM-DD (default today)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Generator processes (default: one per CPU)')
+        parser.add_argument('--reset', action='store_true', help='Clear existing business data first')
+
+    def handle(self, *args, **options):
+        if options['products'] < 1 or options['customers'] < 1 or options['suppliers'] < 1 or options['days'] < 1:
+            raise CommandError('--products, --customers, --suppliers and --days must be at least 1')
+        try:
+            end = date.fromisoformat(options['end_date']) if options['end_date'] else timezone.localdate()
+        except ValueError:
+            raise CommandError('--end-date must look like YYYY-MM-DD')
+        start = end - timedelta(days=options['days'] - 1)
+
+        user = User.objects.filter(is_superuser=True).order_by('id').first() or User.objects.order_by('id').first()
+        if user is None:
+            raise CommandError('No users to own the shifts; run create_test_users first')
+
+        if options['reset']:
+            ResetService.clear_all_data()
+        elif Product.objects.exists() or Customer.objects.exists() or Supplier.objects.exists() \
+                or Transaction.objects.exists():
+            raise CommandError('Data already exists; run with --reset to replace it')
+
+        started = time.perf_counter()
+
+        # 1. Catalog
+        product_rows, customer_rows, supplier_rows = dataset.build_catalog(
+            options['seed'], options['products'], options['customers'], options['suppliers']
+        )
+        products = Product.objects.bulk_create([Product(**row) for row in product_rows], batch_size=5000)
+        customers = Customer.objects.bulk_create([Customer(**row) for row in customer_rows], batch_size=5000)
+        suppliers = Supplier.objects.bulk_create([Supplier(**row) for row in supplier_rows], batch_size=5000)
+        bump_catalog_version()
+        self.step(started, f'{len(products)} products, {len(customers)} customers, {len(suppliers)} suppliers')
+
+        # 2. One closed shift per day; totals are filled in once the day is generated
+        tz = ZoneInfo(settings.TIME_ZONE)
+        first_shift_id = (Shift.objects.aggregate(last=Max('shift_id'))['last'] or 0) + 1
+        opening, closing = timedelta(hours=9, minutes=30), timedelta(hours=22, minutes=30)
+        shifts = []
+        for day_index in range(options['days']):
+            midnight = datetime.combine(start + timedelta(days=day_index), datetime.min.time(), tzinfo=tz)
+            shifts.append((first_shift_id + day_index, user.id, midnight + opening, midnight + closing, 0, '{}', 'closed'))
+        dataset.write_rows(Shift, SHIFT_FIELDS, shifts)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Shift]):
+                cursor.execute(sql)
+
+        if partitioning.is_postgresql() and partitioning.is_partitioned('transactions'):
+            month = (start.year, start.month)
+            while month <= (end.year, end.month):
+                partitioning.create_month_partition('transactions', *month)
+                month = partitioning.add_months(*month, 1)
+        self.step(started, f'{len(shifts)} shifts')
+
+        # 3. Transactions, generated and COPYed by the workers; the ledger is
+        # written here in date order so running balances and ids are stable
+        ctx = dataset.DayContext(
+            seed=options['seed'], start=start, days=options['days'], sales_per_day=options['sales_per_day'],
+            products=[
+                (p.product_id, p.product_name, int(p.purchase_price * 100), int(p.selling_price * 100))
+                for p in products
+            ],
+            customer_ids=[c.customer_id for c in customers],
+            supplier_ids=[s.supplier_id for s in suppliers],
+            first_shift_id=first_shift_id, user_id=user.id, tz=tz,
+        )
+        days_per_chunk = max(1, CHUNK_SALES // max(1, options['sales_per_day']))
+        chunks = [
+            range(first, min(first + days_per_chunk, options['days']))
+            for first in range(0, options['days'], days_per_chunk)
+        ]
+        workers = max(1, min(options['workers'], len(chunks)))
+        if connection.vendor != 'postgresql':
+            workers = 1
+
+        first_debt_id = (Debt.objects.aggregate(last=Max('debt_id'))['last'] or 0) + 1
+        writer = LedgerWriter(user.id, first_debt_id)
+        shift_totals = []
+        transaction_count = 0
+        if workers > 1:
+            # Children must not share the parent's connection
+            connections.close_all()
+            with Pool(workers, initializer=dataset.init_worker, initargs=(ctx,)) as pool:
+                for results in pool.imap(dataset.generate_chunk, chunks):
+                    transaction_count += self.collect(results, writer, shift_totals)
+        else:
+            dataset.init_worker(ctx)
+            for chunk in chunks:
+                transaction_count += self.collect(dataset.generate_chunk(chunk), writer, shift_totals)
+        writer.finish(options['days'])
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Debt, DebtPayment]):
+                cursor.execute(sql)
+        self.step(started, f'{transaction_count} transactions with {workers} worker(s)')
+
+        # 4. Shift totals and balances
+        Shift.objects.bulk_update(
+            [Shift(**totals) for totals in shift_totals],
+            ['start_cash', 'total_sales', 'sales_by_method', 'expected_cash', 'end_cash'],
+            batch_size=500
+        )
+        for model, party_type in ((Customer, 'customer'), (Supplier, 'supplier')):
+            pk = model._meta.pk.attname
+            model.objects.bulk_update(
+                [
+                    model(**{pk: party_id, 'current_balance': dataset.money(balance)})
+                    for (kind, party_id), balance in writer.balances.items()
+                    if kind == party_type and balance
+                ],
+                ['current_balance'],
+                batch_size=1000
+            )
+        self.step(started, f'{writer.entries} ledger entries, {writer.debts} debts ({writer.payments} paid)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'[OK] {start} .. {end} generated in {time.perf_counter() - started:.1f}s (seed {options["seed"]})'
+        ))
+
+    def step(self, started, message):
+        self.stdout.write(self.style.SUCCESS(f'✓ {message} ({time.perf_counter() - started:.1f}s)'))
+
+    def collect(self, results, writer, shift_totals):
+        count = 0
+        for shift, deferred, transactions in results:
+            # Debts collected today, from invoices of earlier days, are in the drawer
+            collected = dataset.money(writer.collected.pop(writer.day_index, 0))
+            shift_totals.append({
+                **shift,
+                'expected_cash': shift['expected_cash'] + collected,
+                'end_cash': shift['end_cash'] + collected,
+            })
+            writer.add_day(deferred)
+            count += transactions
+        return count
+
+
+class LedgerWriter:
+    """
+    Ledger entries, debts and debt payments of the deferred invoices, day by day
+
+    Days must arrive in order. A settled invoice's ledger payment is queued
+    for its settlement day and its debt is written paid, with its payment;
+    an unsettled one becomes an open debt. `collected` holds the customer
+    cash collected per day, for that day's shift.
+    """
+
+    def __init__(self, user_id, first_debt_id):
+        self.user_id = user_id
+        self.next_debt_id = first_debt_id
+        self.day_index = 0
+        self.balances = defaultdict(int)
+        self.pending = defaultdict(list)
+        self.collected = defaultdict(int)
+        self.ledger_rows, self.debt_rows, self.payment_rows = [], [], []
+        self.entries = self.debts = self.payments = 0
+
+    def add_day(self, deferred):
+        events = self.pending.pop(self.day_index, [])
+        for issued_at, transaction_id, party_type, party_id, piastres, due_date, settled_at in deferred:
+            # Customers owe us (negative), we owe suppliers (positive)
+            sign = -1 if party_type == 'customer' else 1
+            kind = 'بيع' if party_type == 'customer' else 'شراء'
+            events.append((issued_at, transaction_id, party_type, party_id, sign * piastres,
+                           f'فاتورة {kind} آجل {transaction_id}'))
+            debt_id = self.next_debt_id
+            self.next_debt_id += 1
+            amount = dataset.money(piastres)
+            if settled_at:
+                settle_day = (settled_at.date() - issued_at.date()).days + self.day_index
+                self.pending[settle_day].append((settled_at, dataset.settlement_id(transaction_id), party_type,
+                                                 party_id, -sign * piastres, dataset.settlement_description(party_type)))
+                if party_type == 'customer':
+                    self.collected[settle_day] += piastres
+                self.debt_rows.append((
+                    debt_id, DEBT_TYPES[party_type], party_type, party_id, 'transaction', transaction_id,
+                    amount, amount, 0, due_date, 'paid', issued_at, settled_at,
+                ))
+                self.payment_rows.append((debt_id, amount, settled_at.date(), 'كاش', self.user_id, settled_at))
+            else:
+                self.debt_rows.append((
+                    debt_id, DEBT_TYPES[party_type], party_type, party_id, 'transaction', transaction_id,
+                    amount, 0, amount, due_date, 'pending', issued_at, issued_at,
+                ))
+
+        for at, transaction_id, party_type, party_id, piastres, description in sorted(events):
+            self.balances[party_type, party_id] += piastres
+            self.ledger_rows.append((
+                party_type, party_id, at, dataset.money(piastres),
+                dataset.money(self.balances[party_type, party_id]), transaction_id, description, self.user_id,
+            ))
+
+        self.day_index += 1
+        if len(self.ledger_rows) >= FLUSH_ROWS:
+            self.flush()
+
+    def finish(self, days):
+        while self.day_index < days or self.pending:
+            self.add_day([])
+        self.flush()
+
+    def flush(self):
+        with transaction.atomic():
+            dataset.write_rows(PartyLedgerEntry, LEDGER_FIELDS, self.ledger_rows)
+            dataset.write_rows(Debt, DEBT_FIELDS, self.debt_rows)
+            dataset.write_rows(DebtPayment, PAYMENT_FIELDS, self.payment_rows)
+        self.entries += len(self.ledger_rows)
+        self.debts += len(self.debt_rows)
+        self.payments += len(self.payment_rows)
+        self.ledger_rows, self.debt_rows, self.payment_rows = [], [], []
@@ -0,0 +1,51 @@
+"""
+Bulk import products from an XLSX or CSV file
+
+    python manage.py import_products catalog.xlsx
+    python manage.py import_products catalog.csv --no-update
+    python manage.py import_products catalog.csv --dry-run --errors errors.csv
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.api.exceptions import BusinessRuleViolation
+from apps.api.services.import_service import ProductImportService, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Import or update products in bulk from an XLSX/CSV sheet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='XLSX or CSV file')
+        parser.add_argument('--no-update', action='store_true',
+                            help='Report existing SKUs as errors instead of updating them')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f'Rows per chunk (default {DEFAULT_CHUNK_SIZE})')
+        parser.add_argument('--errors', metavar='CSV', help='Write the error report to this file')
+
+    def handle(self, *args, **options):
+        try:
+            report = ProductImportService.import_file(
+                options['path'],
+                options['path'],
+                update_existing=not options['no_update'],
+                dry_run=options['dry_run'],
+                chunk_size=options['chunk_size']
+            )
+        except (BusinessRuleViolation, OSError) as e:
+            raise CommandError(getattr(e, 'message', str(e)))
+
+        if options['errors'] and report['errors']:
+            with open(options['errors'], 'w', encoding='utf-8-sig', newline='') as handle:
+                writer = csv.DictWriter(handle, fieldnames=['row', 'sku', 'message'])
+                writer.writeheader()
+                writer.writerows(report['errors'])
+
+        prefix = '[dry run] ' if report['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{report['total_rows']} rows: {report['created']} created, "
+            f"{report['updated']} updated, {report['failed']} failed"
+        ))
+        for error in report['errors'][:20]:
+            self.stdout.write(f"  row {error['row']} ({error['sku']}): {error['message']}")
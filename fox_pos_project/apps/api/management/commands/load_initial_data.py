@@ -8,6 +8,7 @@ from apps.customers.models import Customer
 from apps.suppliers.models import Supplier
 from apps.api.models import AppSettings, Transaction, Shift, ActivityLog
 from apps.quotations.models import Quotation, QuotationItem
+from apps.api.services.ledger_service import LedgerService
 from django.utils import timezone
 
 
@@ -175,7 +176,10 @@ class Command(BaseCommand):
         ]
         
         for customer_data in customers_data:
-            Customer.objects.create(**customer_data)
+            opening_balance = customer_data.pop('current_balance')
+            customer = Customer.objects.create(**customer_data)
+            if opening_balance:
+                LedgerService.post(customer, opening_balance, description='رصيد افتتاحي')
         
         self.stdout.write(self.style.SUCCESS(f'Created {len(customers_data)} customers'))
         
@@ -203,7 +207,10 @@ class Command(BaseCommand):
         ]
         
         for supplier_data in suppliers_data:
-            Supplier.objects.create(**supplier_data)
+            opening_balance = supplier_data.pop('current_balance')
+            supplier = Supplier.objects.create(**supplier_data)
+            if opening_balance:
+                LedgerService.post(supplier, opening_balance, description='رصيد افتتاحي')
         
         self.stdout.write(self.style.SUCCESS(f'Created {len(suppliers_data)} suppliers'))
         
@@ -0,0 +1,77 @@
+"""
+Maintain monthly partitions of transactions and activity_logs
+
+    python manage.py manage_partitions                      # create the next 3 months
+    python manage.py manage_partitions --ahead 6
+    python manage.py manage_partitions --convert            # one-time conversion
+    python manage.py manage_partitions --detach-before 2023-01
+    python manage.py manage_partitions --detach-before 2023-01 --drop
+
+Schedule the default invocation (e.g. daily from cron or Task Scheduler);
+rows outside the created months still land in the DEFAULT partition and
+are moved out when their month's partition is created.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.api import partitioning
+
+
+class Command(BaseCommand):
+    help = 'Create, convert and archive monthly partitions of transactions and activity_logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--table', choices=list(partitioning.PARTITIONED_TABLES),
+                            help='Only maintain this table')
+        parser.add_argument('--ahead', type=int, default=3,
+                            help='Months ahead of the current one to create (default 3)')
+        parser.add_argument('--convert', action='store_true',
+                            help='Convert unpartitioned tables first')
+        parser.add_argument('--detach-before', metavar='YYYY-MM',
+                            help='Detach partitions older than this month')
+        parser.add_argument('--archive-schema', default=partitioning.ARCHIVE_SCHEMA,
+                            help='Schema that receives detached partitions')
+        parser.add_argument('--drop', action='store_true',
+                            help='Drop detached partitions instead of archiving them')
+
+    def handle(self, *args, **options):
+        if not partitioning.is_postgresql():
+            raise CommandError('Partitioning requires PostgreSQL')
+
+        cutoff = None
+        if options['detach_before']:
+            try:
+                year, month = (int(part) for part in options['detach_before'].split('-'))
+                if not 1 <= month <= 12:
+                    raise ValueError
+            except ValueError:
+                raise CommandError('--detach-before must look like YYYY-MM')
+            cutoff = (year, month)
+
+        tables = [options['table']] if options['table'] else list(partitioning.PARTITIONED_TABLES)
+
+        for table in tables:
+            if options['convert']:
+                if partitioning.convert_table(table, options['ahead']):
+                    self.stdout.write(self.style.SUCCESS(f'✓ {table}: converted to monthly partitions'))
+                else:
+                    self.stdout.write(f'{table}: already partitioned')
+            elif not partitioning.is_partitioned(table):
+                self.stdout.write(self.style.WARNING(
+                    f'⚠️  {table} is not partitioned yet, run with --convert'
+                ))
+                continue
+
+            created = partitioning.ensure_future_partitions(table, options['ahead'])
+            for name in created:
+                self.stdout.write(self.style.SUCCESS(f'✓ created {name}'))
+
+            if cutoff:
+                detached = partitioning.detach_partitions_before(
+                    table, *cutoff,
+                    archive_schema=options['archive_schema'],
+                    drop=options['drop']
+                )
+                for name in detached:
+                    action = 'dropped' if options['drop'] else f'archived to {options["archive_schema"]}'
+                    self.stdout.write(self.style.SUCCESS(f'✓ {name} {action}'))
+
+        self.stdout.write(self.style.SUCCESS('[OK] Partition maintenance finished'))
@@ -0,0 +1,47 @@
+"""
+Assign missing barcodes and write printable label sheets
+
+    python manage.py print_labels --missing -o labels.pdf
+    python manage.py print_labels --category "أدوات" --layout 4x10 -o tools.pdf
+    python manage.py print_labels --ids 10 11 12 --no-assign -o reprint.pdf
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.api.exceptions import BusinessRuleViolation
+from apps.api.services.barcode_service import BarcodeService, SHEET_LAYOUTS
+
+
+class Command(BaseCommand):
+    help = 'Assign barcodes in bulk and render label sheets (PDF)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-o', '--output', default='labels.pdf',
+                            help='Output PDF path (default labels.pdf)')
+        parser.add_argument('--category', help='Only products in this category')
+        parser.add_argument('--ids', nargs='+', type=int, help='Only these product ids')
+        parser.add_argument('--missing', action='store_true',
+                            help='Only products without a barcode')
+        parser.add_argument('--no-assign', action='store_true',
+                            help='Do not generate barcodes for products without one')
+        parser.add_argument('--layout', choices=list(SHEET_LAYOUTS), default='3x8',
+                            help='Labels per sheet, columns x rows (default 3x8)')
+        parser.add_argument('--no-price', action='store_true', help='Do not print prices')
+
+    def handle(self, *args, **options):
+        try:
+            content, assigned = BarcodeService.print_labels(
+                category=options['category'],
+                ids=options['ids'],
+                missing_only=options['missing'],
+                assign=not options['no_assign'],
+                layout=options['layout'],
+                show_price=not options['no_price']
+            )
+        except BusinessRuleViolation as e:
+            raise CommandError(e.message)
+
+        with open(options['output'], 'wb') as handle:
+            handle.write(content)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Assigned {assigned} barcodes, labels written to {options['output']}"
+        ))
@@ -0,0 +1,31 @@
+"""
+Remove expired JWT refresh tokens from the blacklist tables
+
+    python manage.py prune_tokens
+    python manage.py prune_tokens --batch-size 1000
+
+Every login and token refresh adds rows to token_blacklist_outstandingtoken
+and token_blacklist_blacklistedtoken. run_production.py runs this at startup
+and the live event hub (ASGI workers) hourly; under a WSGI server that is
+not restarted, schedule it (e.g. daily from cron or Task Scheduler) too.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.api.services.token_service import TokenMaintenanceService
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding and blacklisted JWT tokens in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            help="Rows per batch (default TOKEN_BLACKLIST['PRUNE_BATCH_SIZE'])")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        result = TokenMaintenanceService.prune_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {result['outstanding']} outstanding and {result['blacklisted']} blacklisted tokens removed "
+            f"in {result['batches']} batch(es) ({result['seconds']:.3f}s)"
+        ))
@@ -0,0 +1,36 @@
+"""
+Pre-render the sale invoice PDFs of a day into the PDF cache
+
+    python manage.py render_invoices                    # today
+    python manage.py render_invoices --date 2024-05-01
+    python manage.py render_invoices --workers 4
+
+Invoices whose content did not change since the last render are skipped,
+so re-running the command is cheap.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from apps.api.services.pdf_service import PDFService
+
+
+class Command(BaseCommand):
+    help = 'Render the sale invoices of a day to PDF in parallel worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', metavar='YYYY-MM-DD',
+                            help='Day to render (default today)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default one per CPU core)')
+
+    def handle(self, *args, **options):
+        day = timezone.localdate()
+        if options['date']:
+            day = parse_date(options['date'])
+            if day is None:
+                raise CommandError('--date must look like YYYY-MM-DD')
+
+        result = PDFService.render_day(day, workers=options['workers'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{day}: rendered {result['rendered']}, already cached {result['cached']}"
+        ))
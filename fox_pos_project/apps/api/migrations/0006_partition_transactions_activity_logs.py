@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def partition_tables(apps, schema_editor):
+    """Convert transactions and activity_logs to monthly range partitions"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    from apps.api.partitioning import PARTITIONED_TABLES, convert_table
+
+    for table in PARTITIONED_TABLES:
+        convert_table(table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_activitylog_date_default'),
+    ]
+
+    operations = [
+        # Django's model state is unchanged: the partitioned parent keeps the
+        # original table name and columns. Reversing leaves the partitions in place.
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
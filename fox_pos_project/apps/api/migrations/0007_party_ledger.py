@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def seed_opening_balances(apps, schema_editor):
+    """Existing balances predate the ledger: record them as opening entries"""
+    PartyLedgerEntry = apps.get_model('api', 'PartyLedgerEntry')
+    Customer = apps.get_model('customers', 'Customer')
+    Supplier = apps.get_model('suppliers', 'Supplier')
+
+    entries = []
+    parties = (
+        ('customer', Customer, 'customer_id', 'customers'),
+        ('supplier', Supplier, 'supplier_id', 'suppliers'),
+    )
+    for party_type, model, pk, table in parties:
+        # Unmanaged: the table comes with the database dump, not migrations
+        if schema_editor.connection.vendor == 'postgresql':
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute("SELECT to_regclass(%s)", [f'fox_system.{table}'])
+                if cursor.fetchone()[0] is None:
+                    continue
+        entries += [
+            PartyLedgerEntry(party_type=party_type, party_id=party_id, amount=balance,
+                             balance=balance, description='رصيد افتتاحي')
+            for party_id, balance in model.objects.exclude(current_balance=0)
+            .values_list(pk, 'current_balance').iterator()
+        ]
+    PartyLedgerEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0006_partition_transactions_activity_logs'),
+        ('customers', '0001_initial'),
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartyLedgerEntry',
+            fields=[
+                ('entry_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('party_type', models.CharField(choices=[('customer', 'عميل'), ('supplier', 'مورد')], max_length=10)),
+                ('party_id', models.IntegerField()),
+                ('date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('transaction_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('created_by', models.ForeignKey(blank=True, db_column='created_by_id', null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'حركة حساب',
+                'verbose_name_plural': 'كشف الحساب',
+                'db_table': 'fox_system"."party_ledger',
+                'ordering': ['date', 'entry_id'],
+                'indexes': [models.Index(fields=['party_type', 'party_id', 'date', 'entry_id'], name='party_ledger_party_date_idx')],
+            },
+        ),
+        migrations.RunPython(seed_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+# Expired-token pruning (prune_tokens) and the blacklist bloom filter rebuild
+# select token_blacklist_outstandingtoken by expires_at, which simplejwt
+# does not index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_party_ledger'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS idx_outstandingtoken_expires_at '
+            'ON token_blacklist_outstandingtoken (expires_at)',
+            'DROP INDEX IF EXISTS idx_outstandingtoken_expires_at',
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:07
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_outstandingtoken_expires_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LiveEvent',
+            fields=[
+                ('event_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('product', 'منتج'), ('catalog', 'الكتالوج'), ('settings', 'الإعدادات')], max_length=20)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'حدث مباشر',
+                'verbose_name_plural': 'الأحداث المباشرة',
+                'db_table': 'fox_system"."live_events',
+                'ordering': ['event_id'],
+                'indexes': [models.Index(fields=['created_at'], name='live_events_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Django cannot find these by introspection on the schema-qualified table
+FK_COLUMNS = ['related_customer_id', 'related_supplier_id', 'shift_id']
+
+SINGLE_COLUMN_INDEXES_SQL = """
+SELECT i.relname FROM pg_index x
+JOIN pg_class i ON i.oid = x.indexrelid
+JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = x.indkey[0]
+WHERE x.indrelid = 'fox_system.transactions'::regclass
+AND x.indnatts = 1 AND NOT x.indisunique AND x.indpred IS NULL
+AND a.attname = ANY(%s)
+"""
+
+
+def drop_fk_indexes(apps, schema_editor):
+    """Drop the single-column FK indexes (on every partition with the parent's)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(SINGLE_COLUMN_INDEXES_SQL, [FK_COLUMNS])
+        for (name,) in cursor.fetchall():
+            cursor.execute(f'DROP INDEX fox_system.{schema_editor.quote_name(name)}')
+
+
+def create_fk_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for column in FK_COLUMNS:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS transactions_{column} ON fox_system.transactions ({column})')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_live_events'),
+    ]
+
+    operations = [
+        # The (fk, date) indexes below lead with the FK: the single-column
+        # FK indexes would only slow down every insert
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='transaction',
+                    name='related_customer',
+                    field=models.ForeignKey(blank=True, db_column='related_customer_id', db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='customers.customer'),
+                ),
+                migrations.AlterField(
+                    model_name='transaction',
+                    name='related_supplier',
+                    field=models.ForeignKey(blank=True, db_column='related_supplier_id', db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='suppliers.supplier'),
+                ),
+                migrations.AlterField(
+                    model_name='transaction',
+                    name='shift',
+                    field=models.ForeignKey(blank=True, db_column='shift_id', db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transactions', to='api.shift'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(drop_fk_indexes, create_fk_indexes),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['date'], name='transactions_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['type', 'date'], name='transactions_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['related_customer', 'date'], name='transactions_customer_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['related_supplier', 'date'], name='transactions_supplier_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['shift', 'date'], name='transactions_shift_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['date'], name='transactions_pending_idx'),
+        ),
+    ]
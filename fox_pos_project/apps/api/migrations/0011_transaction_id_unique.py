@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def enforce_unique_ids(apps, schema_editor):
+    """transaction_id is unique again on the partitioned transactions table"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    from apps.api.partitioning import PARTITIONED_TABLES, enforce_unique_id, is_partitioned
+
+    for table in PARTITIONED_TABLES:
+        if is_partitioned(table):
+            enforce_unique_id(table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_transaction_indexes'),
+    ]
+
+    operations = [
+        # Tables converted by 0006 before the id lookup existed; new
+        # conversions set it up themselves. Reversing leaves it in place.
+        migrations.RunPython(enforce_unique_ids, migrations.RunPython.noop),
+    ]
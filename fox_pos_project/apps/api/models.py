@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from apps.customers.models import Customer
 from apps.suppliers.models import Supplier
 
@@ -35,13 +36,14 @@ class Transaction(models.Model):
     payment_method = models.CharField(max_length=50, choices=PAYMENT_CHOICES)
     description = models.TextField(blank=True)
     category = models.CharField(max_length=100, blank=True, null=True)
-    related_customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, blank=True, db_column='related_customer_id')
-    related_supplier = models.ForeignKey(Supplier, on_delete=models.SET_NULL, null=True, blank=True, db_column='related_supplier_id')
+    # The FKs are indexed by the (fk, date) indexes below
+    related_customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, blank=True, db_column='related_customer_id', db_index=False)
+    related_supplier = models.ForeignKey(Supplier, on_delete=models.SET_NULL, null=True, blank=True, db_column='related_supplier_id', db_index=False)
     items = models.JSONField(default=list, blank=True)  # CartItem[]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='completed')
     due_date = models.DateField(null=True, blank=True)
     is_direct_sale = models.BooleanField(default=False)
-    shift = models.ForeignKey('Shift', on_delete=models.SET_NULL, null=True, blank=True, related_name='transactions', db_column='shift_id')
+    shift = models.ForeignKey('Shift', on_delete=models.SET_NULL, null=True, blank=True, related_name='transactions', db_column='shift_id', db_index=False)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, db_column='created_by_id')
     
     class Meta:
@@ -49,7 +51,22 @@ class Transaction(models.Model):
         verbose_name = 'معاملة'
         verbose_name_plural = 'المعاملات'
         ordering = ['-date']
-    
+        # One per access path; on the partitioned table each is created on
+        # every monthly partition (and on partitions attached later)
+        indexes = [
+            # The list (newest first) and date ranges across all types
+            models.Index(fields=['date'], name='transactions_date_idx'),
+            # Reports and the list filtered by type over a date range
+            models.Index(fields=['type', 'date'], name='transactions_type_date_idx'),
+            # Customer / supplier history, newest first
+            models.Index(fields=['related_customer', 'date'], name='transactions_customer_date_idx'),
+            models.Index(fields=['related_supplier', 'date'], name='transactions_supplier_date_idx'),
+            # A shift's transactions, in order
+            models.Index(fields=['shift', 'date'], name='transactions_shift_date_idx'),
+            # Expenses awaiting approval: a handful of rows out of millions
+            models.Index(fields=['date'], condition=models.Q(status='pending'), name='transactions_pending_idx'),
+        ]
+
     def __str__(self):
         return f"{self.transaction_id} - {self.type} - {self.amount}"
 
@@ -122,7 +139,8 @@ class AppSettings(models.Model):
 class ActivityLog(models.Model):
     """Model for activity logging"""
     log_id = models.AutoField(primary_key=True)
-    date = models.DateTimeField(auto_now_add=True)
+    # Set when the activity happens, not when the buffered writer flushes it
+    date = models.DateTimeField(default=timezone.now)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='activity_logs', db_column='user_id')
     user_name = models.CharField(max_length=200)
     action = models.CharField(max_length=100)
@@ -136,3 +154,73 @@ class ActivityLog(models.Model):
     
     def __str__(self):
         return f"{self.user_name} - {self.action} - {self.date}"
+
+
+class PartyLedgerEntry(models.Model):
+    """
+    One row per change of a customer or supplier balance
+
+    `balance` is the party's running balance after the entry, so the balance
+    at any date is the last entry before it (one index seek on
+    party/date) and a statement is a range scan of the same index.
+    Written only through LedgerService.post().
+    """
+    PARTY_CHOICES = [
+        ('customer', 'عميل'),
+        ('supplier', 'مورد'),
+    ]
+
+    entry_id = models.BigAutoField(primary_key=True)
+    party_type = models.CharField(max_length=10, choices=PARTY_CHOICES)
+    party_id = models.IntegerField()
+    date = models.DateTimeField(default=timezone.now)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)  # Signed change
+    balance = models.DecimalField(max_digits=14, decimal_places=2)  # Balance after this entry
+    # Not a foreign key: transactions are partitioned and may be cleared independently
+    transaction_id = models.CharField(max_length=50, null=True, blank=True)
+    description = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, db_column='created_by_id')
+
+    class Meta:
+        db_table = 'fox_system"."party_ledger'
+        verbose_name = 'حركة حساب'
+        verbose_name_plural = 'كشف الحساب'
+        ordering = ['date', 'entry_id']
+        indexes = [
+            models.Index(fields=['party_type', 'party_id', 'date', 'entry_id'], name='party_ledger_party_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.party_type} {self.party_id} - {self.amount} - {self.balance}"
+
+
+class LiveEvent(models.Model):
+    """
+    A product / settings change pushed to the tills (see apps/api/live.py)
+
+    Written in the transaction that made the change, so an event exists
+    exactly when the change committed; kept for a short while so a
+    reconnecting till can resume from the last event id it saw.
+    """
+    KIND_CHOICES = [
+        ('product', 'منتج'),
+        ('catalog', 'الكتالوج'),
+        ('settings', 'الإعدادات'),
+    ]
+
+    event_id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'fox_system"."live_events'
+        verbose_name = 'حدث مباشر'
+        verbose_name_plural = 'الأحداث المباشرة'
+        ordering = ['event_id']
+        indexes = [
+            models.Index(fields=['created_at'], name='live_events_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} - {self.kind}"
@@ -0,0 +1,364 @@
+"""
+Monthly range partitioning for fox_system.transactions and fox_system.activity_logs
+
+Both tables are converted to PostgreSQL declarative partitions on `date`
+(one partition per calendar month in settings.TIME_ZONE, plus a DEFAULT
+partition that catches anything outside the created ranges). The Django
+models are unchanged: the parent keeps the original table name, so ORM
+queries keep working, and queries bounded on the raw `date` column only
+touch the partitions for the requested months.
+
+The (id, date) primary key no longer makes an id unique on its own, so a
+table with an application-chosen id (transactions) also gets a lookup
+table of its ids, kept in step by triggers: inserting an id that already
+exists in any month fails with an IntegrityError, as before partitioning.
+
+Used by migration 0006 and by the `manage_partitions` management command.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from zoneinfo import ZoneInfo
+
+SCHEMA = 'fox_system'
+ARCHIVE_SCHEMA = 'fox_archive'
+
+# PostgreSQL requires the partition key in every unique constraint, so the
+# primary keys become (id, date). Serial ids get a sequence owned by the parent;
+# `unique` ids are kept unique through a lookup table (see enforce_unique_id)
+PARTITIONED_TABLES = {
+    'transactions': {
+        'key': 'date',
+        'primary_key': ['transaction_id', 'date'],
+        'serial': None,
+        'unique': 'transaction_id',
+    },
+    'activity_logs': {
+        'key': 'date',
+        'primary_key': ['log_id', 'date'],
+        'serial': 'log_id',
+        'unique': None,  # Only ever taken from the sequence
+    },
+}
+
+
+def qualified(table, schema=SCHEMA):
+    return f'{connection.ops.quote_name(schema)}.{connection.ops.quote_name(table)}'
+
+
+def month_start(year, month):
+    """Start of a month in the business time zone"""
+    return datetime(year, month, 1, tzinfo=ZoneInfo(settings.TIME_ZONE))
+
+
+def add_months(year, month, count):
+    index = year * 12 + (month - 1) + count
+    return index // 12, index % 12 + 1
+
+
+def partition_name(table, year, month):
+    return f'{table}_p{year:04d}_{month:02d}'
+
+
+def id_table(table):
+    """Name of the lookup table holding the ids of a partitioned table"""
+    return f'{table}_ids'
+
+
+def is_postgresql():
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned(table):
+    """True if the table is already a partitioned parent"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relkind FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relname = %s
+            """,
+            [SCHEMA, table]
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def list_partitions(table):
+    """Return [(year, month, name)] of the monthly partitions attached to a table"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            JOIN pg_namespace n ON n.oid = parent.relnamespace
+            WHERE n.nspname = %s AND parent.relname = %s
+            ORDER BY child.relname
+            """,
+            [SCHEMA, table]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    prefix = f'{table}_p'
+    partitions = []
+    for name in names:
+        suffix = name[len(prefix):] if name.startswith(prefix) else ''
+        try:
+            year, month = (int(part) for part in suffix.split('_'))
+        except ValueError:
+            continue  # DEFAULT partition or foreign table
+        partitions.append((year, month, name))
+    return partitions
+
+
+def create_month_partition(table, year, month):
+    """
+    Create and attach the partition for one month if it does not exist.
+
+    Rows that already landed in the DEFAULT partition for that month are
+    moved into the new partition first, otherwise ATTACH would fail. The
+    move bypasses the parent, so their ids are registered again afterwards.
+
+    Returns:
+        The partition name if it was created, otherwise None
+    """
+    name = partition_name(table, year, month)
+    if any(existing == name for _, _, existing in list_partitions(table)):
+        return None
+
+    key = connection.ops.quote_name(PARTITIONED_TABLES[table]['key'])
+    start = month_start(year, month)
+    end = month_start(*add_months(year, month, 1))
+    parent = qualified(table)
+    child = qualified(name)
+    default = qualified(f'{table}_default')
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE {child} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {default} WHERE {key} >= %s AND {key} < %s RETURNING *) '
+            f'INSERT INTO {child} SELECT * FROM moved',
+            [start, end]
+        )
+        moved = cursor.rowcount
+        cursor.execute(
+            f'ALTER TABLE {parent} ATTACH PARTITION {child} FOR VALUES FROM (%s) TO (%s)',
+            [start, end]
+        )
+        unique = PARTITIONED_TABLES[table]['unique']
+        if unique and moved:
+            column = connection.ops.quote_name(unique)
+            cursor.execute(f'INSERT INTO {qualified(id_table(table))} SELECT {column} FROM {child}')
+    return name
+
+
+def ensure_future_partitions(table, months_ahead=3, today=None):
+    """Create partitions from the current month up to `months_ahead` months ahead"""
+    today = today or datetime.now(ZoneInfo(settings.TIME_ZONE))
+    created = []
+    for offset in range(months_ahead + 1):
+        year, month = add_months(today.year, today.month, offset)
+        name = create_month_partition(table, year, month)
+        if name:
+            created.append(name)
+    return created
+
+
+def detach_partitions_before(table, year, month, archive_schema=ARCHIVE_SCHEMA, drop=False):
+    """
+    Detach every monthly partition older than the given month.
+
+    Detached partitions are moved to `archive_schema` (kept queryable for
+    audits, their ids stay taken) or dropped when `drop` is True (their ids
+    are released).
+
+    Returns:
+        List of detached partition names
+    """
+    cutoff = (year, month)
+    parent = qualified(table)
+    unique = PARTITIONED_TABLES[table]['unique']
+    detached = []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not drop:
+            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {connection.ops.quote_name(archive_schema)}')
+
+        for part_year, part_month, name in list_partitions(table):
+            if (part_year, part_month) >= cutoff:
+                continue
+            child = qualified(name)
+            cursor.execute(f'ALTER TABLE {parent} DETACH PARTITION {child}')
+            if drop:
+                if unique:
+                    column = connection.ops.quote_name(unique)
+                    cursor.execute(
+                        f'DELETE FROM {qualified(id_table(table))} WHERE {column} IN (SELECT {column} FROM {child})'
+                    )
+                cursor.execute(f'DROP TABLE {child}')
+            else:
+                cursor.execute(f'ALTER TABLE {child} SET SCHEMA {connection.ops.quote_name(archive_schema)}')
+            detached.append(name)
+
+    return detached
+
+
+def convert_table(table, months_ahead=3):
+    """
+    Convert an ordinary table into a monthly-partitioned one, keeping its name,
+    data, secondary indexes, foreign keys and id sequence.
+
+    Returns:
+        False if the table was already partitioned, True otherwise
+    """
+    if is_partitioned(table):
+        return False
+
+    spec = PARTITIONED_TABLES[table]
+    quote = connection.ops.quote_name
+    old_name = f'{table}_unpartitioned'
+    parent = qualified(table)
+    old = qualified(old_name)
+    key = quote(spec['key'])
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Remember secondary indexes and foreign keys before the rename
+        cursor.execute(
+            """
+            SELECT indexname, indexdef FROM pg_indexes
+            WHERE schemaname = %s AND tablename = %s
+            AND indexname NOT IN (
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = %s::regclass AND contype IN ('p', 'u')
+            )
+            """,
+            [SCHEMA, table, f'{SCHEMA}.{table}']
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype = 'f'
+            """,
+            [f'{SCHEMA}.{table}']
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(f'SELECT min({key}), max({key}) FROM {parent}')
+        first_date, last_date = cursor.fetchone()
+
+        cursor.execute(f'ALTER TABLE {parent} RENAME TO {quote(old_name)}')
+        cursor.execute(
+            f'CREATE TABLE {parent} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+            f'INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE ({key})'
+        )
+        columns = ', '.join(quote(column) for column in spec['primary_key'])
+        cursor.execute(f'ALTER TABLE {parent} ADD PRIMARY KEY ({columns})')
+        cursor.execute(
+            f'CREATE TABLE {qualified(table + "_default")} PARTITION OF {parent} DEFAULT'
+        )
+
+        # One partition per month that already has data, plus the months ahead
+        if first_date is not None:
+            tz = ZoneInfo(settings.TIME_ZONE)
+            first_date = first_date.astimezone(tz)
+            last_date = last_date.astimezone(tz)
+            year, month = first_date.year, first_date.month
+            while (year, month) <= (last_date.year, last_date.month):
+                create_month_partition(table, year, month)
+                year, month = add_months(year, month, 1)
+        ensure_future_partitions(table, months_ahead)
+
+        cursor.execute(f'INSERT INTO {parent} SELECT * FROM {old}')
+
+        serial = spec['serial']
+        if serial:
+            # A fresh name: the old serial/identity sequence goes away with the old table
+            sequence = f'{table}_{serial}_pseq'
+            cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS {qualified(sequence)}')
+            cursor.execute(
+                f"ALTER TABLE {parent} ALTER COLUMN {quote(serial)} "
+                f"SET DEFAULT nextval('{SCHEMA}.{sequence}')"
+            )
+            cursor.execute(
+                f'SELECT setval(%s, COALESCE((SELECT max({quote(serial)}) FROM {parent}), 0) + 1, false)',
+                [f'{SCHEMA}.{sequence}']
+            )
+
+        cursor.execute(f'DROP TABLE {old}')
+        enforce_unique_id(table)
+        if serial:
+            cursor.execute(
+                f'ALTER SEQUENCE {qualified(sequence)} OWNED BY {parent}.{quote(serial)}'
+            )
+
+        # Definitions were read before the rename, so they target the new parent
+        # and cascade to every partition
+        for index_name, index_def in indexes:
+            cursor.execute(index_def)
+        for constraint_name, definition in foreign_keys:
+            cursor.execute(
+                f'ALTER TABLE {parent} ADD CONSTRAINT {quote(constraint_name)} {definition}'
+            )
+
+    return True
+
+
+def enforce_unique_id(table):
+    """
+    Make the table's `unique` id column unique across all partitions
+
+    The ids are copied into a lookup table with the id as primary key and
+    row triggers on the parent (inherited by every partition, present and
+    future) keep it in step with inserts, deletes, id changes and TRUNCATE.
+    A duplicate id - already in the table, or inserted later into any
+    month - raises a unique violation on the lookup table. Safe to run again.
+
+    Returns:
+        False if the table has no `unique` id column, True otherwise
+    """
+    column = PARTITIONED_TABLES[table]['unique']
+    if column is None:
+        return False
+
+    quote = connection.ops.quote_name
+    parent = qualified(table)
+    ids = qualified(id_table(table))
+    function = qualified(f'{table}_ids_sync')
+    column = quote(column)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s)', [f'{SCHEMA}.{id_table(table)}'])
+        if cursor.fetchone()[0] is None:
+            cursor.execute(f'CREATE TABLE {ids} AS SELECT {column} FROM {parent}')
+            cursor.execute(f'ALTER TABLE {ids} ADD PRIMARY KEY ({column})')
+
+        cursor.execute(f"""
+            CREATE OR REPLACE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'TRUNCATE' THEN
+                    TRUNCATE {ids};
+                    RETURN NULL;
+                END IF;
+                IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.{column} IS DISTINCT FROM NEW.{column}) THEN
+                    DELETE FROM {ids} WHERE {column} = OLD.{column};
+                END IF;
+                IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND OLD.{column} IS DISTINCT FROM NEW.{column}) THEN
+                    INSERT INTO {ids} VALUES (NEW.{column});
+                END IF;
+                RETURN NULL;
+            END
+            $$
+        """)
+        # A row moved to another month is a DELETE then an INSERT on the partitions
+        for trigger, event in (
+            (f'{table}_ids_sync', f'AFTER INSERT OR DELETE OR UPDATE OF {column} ON {parent} FOR EACH ROW'),
+            (f'{table}_ids_truncate', f'AFTER TRUNCATE ON {parent} FOR EACH STATEMENT'),
+        ):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {quote(trigger)} ON {parent}')
+            cursor.execute(f'CREATE TRIGGER {quote(trigger)} {event} EXECUTE FUNCTION {function}()')
+    return True
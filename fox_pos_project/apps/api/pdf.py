@@ -0,0 +1,178 @@
+"""
+PDF rendering for invoices and quotations (reportlab)
+
+This module only turns a plain document dict into PDF bytes: it does not
+touch the ORM, so batch rendering can run it in worker processes. Building
+the document from the database and caching the output is done by
+services/pdf_service.py.
+
+Arabic text is reshaped (joined letter forms) and reordered for RTL with
+arabic-reshaper and python-bidi; reportlab itself draws glyphs strictly
+left to right. A TTF font with Arabic glyphs is needed - set PDF_FONT_PATH
+or install one of the fonts in FONT_CANDIDATES.
+"""
+import os
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+try:
+    import arabic_reshaper
+    from bidi.algorithm import get_display
+except ImportError:  # Text is still printed, just not joined/reordered
+    arabic_reshaper = None
+
+FONT_NAME = 'FoxArabic'
+FALLBACK_FONT = 'Helvetica'
+
+FONT_CANDIDATES = [
+    r'C:\Windows\Fonts\tahoma.ttf',
+    r'C:\Windows\Fonts\arial.ttf',
+    '/usr/share/fonts/truetype/noto/NotoNaskhArabic-Regular.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSans.ttf',
+    '/Library/Fonts/Arial Unicode.ttf',
+]
+
+TITLES = {
+    'invoice': 'فاتورة بيع',
+    'quotation': 'عرض سعر',
+}
+
+
+def find_font(font_path=None):
+    """First existing font file from the configured path or the candidates"""
+    for path in [font_path] + FONT_CANDIDATES:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+def register_font(font_path=None):
+    """Register the Arabic font once per process and return its name"""
+    if FONT_NAME in pdfmetrics.getRegisteredFontNames():
+        return FONT_NAME
+    path = find_font(font_path)
+    if not path:
+        return FALLBACK_FONT
+    pdfmetrics.registerFont(TTFont(FONT_NAME, path))
+    return FONT_NAME
+
+
+def shape(text):
+    """Reshape and reorder Arabic text for left-to-right drawing"""
+    text = '' if text is None else str(text)
+    if not text or arabic_reshaper is None:
+        return text
+    return get_display(arabic_reshaper.reshape(text))
+
+
+def money(value):
+    return f'{float(value or 0):,.2f}'
+
+
+def render(document, font_path=None):
+    """
+    Render an invoice/quotation document dict to PDF bytes
+
+    Expected keys: kind, number, date, company{name, phone, address},
+    party{name, phone, address}, items[{name, quantity, price, discount, total}],
+    totals[(label, value)], notes, terms, extra[(label, value)]
+    """
+    from io import BytesIO
+
+    font = register_font(font_path)
+    base = ParagraphStyle('base', fontName=font, fontSize=10, leading=14, alignment=TA_RIGHT)
+    title = ParagraphStyle('title', parent=base, fontSize=18, leading=24, alignment=TA_CENTER)
+    heading = ParagraphStyle('heading', parent=base, fontSize=14, leading=20, alignment=TA_CENTER)
+    cell = ParagraphStyle('cell', parent=base, fontSize=9, leading=12)
+
+    def para(text, style=base):
+        # Paragraph parses markup, so escape before shaping
+        escaped = str(text or '').replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        return Paragraph('<br/>'.join(shape(line) for line in escaped.splitlines()) or '', style)
+
+    company = document.get('company', {})
+    party = document.get('party', {})
+    story = [
+        para(company.get('name'), title),
+        para(' - '.join(filter(None, [company.get('address'), company.get('phone')])), heading),
+        Spacer(1, 4 * mm),
+        para(TITLES.get(document['kind'], document['kind']), heading),
+        Spacer(1, 4 * mm),
+    ]
+
+    # Header block: document details on the right, party on the left (RTL)
+    details = [f"رقم: {document['number']}", f"التاريخ: {document['date']}"]
+    details += [f'{label}: {value}' for label, value in document.get('extra', [])]
+    party_lines = [f"الاسم: {party.get('name') or '-'}"]
+    if party.get('phone'):
+        party_lines.append(f"الهاتف: {party['phone']}")
+    if party.get('address'):
+        party_lines.append(f"العنوان: {party['address']}")
+    header = Table(
+        [[para('\n'.join(party_lines)), para('\n'.join(details))]],
+        colWidths=[90 * mm, 90 * mm]
+    )
+    header.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'TOP')]))
+    story += [header, Spacer(1, 6 * mm)]
+
+    # Items table, columns reversed so the first column sits on the right
+    columns = ['#', 'الصنف', 'الكمية', 'السعر', 'الخصم', 'الإجمالي']
+    rows = [[para(label, cell) for label in reversed(columns)]]
+    for index, item in enumerate(document.get('items', []), start=1):
+        values = [
+            index, item.get('name'), item.get('quantity'),
+            money(item.get('price')), money(item.get('discount')), money(item.get('total')),
+        ]
+        rows.append([para(value, cell) for value in reversed(values)])
+    items_table = Table(
+        rows,
+        colWidths=[28 * mm, 22 * mm, 25 * mm, 20 * mm, 75 * mm, 10 * mm],
+        repeatRows=1
+    )
+    items_table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f1f3f5')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]))
+    story += [items_table, Spacer(1, 4 * mm)]
+
+    totals = Table(
+        [[para(money(value)), para(label)] for label, value in document.get('totals', [])],
+        colWidths=[40 * mm, 50 * mm],
+        hAlign='LEFT'
+    )
+    totals.setStyle(TableStyle([('LINEABOVE', (0, -1), (-1, -1), 0.8, colors.black)]))
+    story += [totals, Spacer(1, 6 * mm)]
+
+    if document.get('notes'):
+        story += [para(f"ملاحظات: {document['notes']}"), Spacer(1, 3 * mm)]
+    if document.get('terms'):
+        story += [para(document['terms'], cell)]
+
+    output = BytesIO()
+    SimpleDocTemplate(
+        output, pagesize=A4,
+        leftMargin=15 * mm, rightMargin=15 * mm, topMargin=15 * mm, bottomMargin=15 * mm,
+        title=f"{document['kind']} {document['number']}"
+    ).build(story)
+    return output.getvalue()
+
+
+def render_to_file(document, path, font_path=None):
+    """Render into `path` atomically (used directly by batch worker processes)"""
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as handle:
+        handle.write(render(document, font_path))
+    os.replace(temp_path, path)
+    return path
@@ -0,0 +1,183 @@
+"""
+EXPLAIN-based checks of the queries an endpoint issues
+
+    with capture_plans() as plans:
+        client.get('/api/reports/sales/?from_date=2025-06-01&to_date=2025-06-01')
+    problems = check_plans(plans, large_tables={'transactions'}, date_columns={'transactions': 'date'},
+                           max_cost=1000)
+    if problems:
+        print(format_report(problems))
+
+Every SELECT / INSERT / UPDATE / DELETE captured on the default connection
+is planned again with EXPLAIN (FORMAT JSON), which does not execute it, and
+the plan tree is checked for:
+
+    a Seq Scan on a large table (a monthly partition counts as its table;
+    one that is still nearly empty does not)
+    a scan bounded on a date column whose bound is not an index condition
+    an estimated total cost above the ceiling
+
+format_report() prints each offending plan as an indented tree, diff style:
+the nodes at fault are marked '-' and followed by what was expected ('+').
+PostgreSQL only.
+"""
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+PLANNED_STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+# A Seq Scan cheaper than this reads a handful of pages (an empty or new
+# month partition), where an index would not help
+SMALL_SCAN_COST = 10.0
+
+# transactions_p2025_06, transactions_default (see apps.api.partitioning)
+PARTITION_SUFFIX = re.compile(r'_(p\d{4}_\d{2}|default)$')
+
+
+class Plan:
+    """One captured statement and its EXPLAIN plan tree"""
+
+    def __init__(self, sql, tree):
+        self.sql = sql
+        self.tree = tree
+
+    @property
+    def cost(self):
+        return self.tree['Total Cost']
+
+    def nodes(self):
+        """(depth, node) pairs, depth first"""
+        stack = [(0, self.tree)]
+        while stack:
+            depth, node = stack.pop()
+            yield depth, node
+            stack.extend((depth + 1, child) for child in reversed(node.get('Plans', [])))
+
+
+def explain(sql, params=None, analyze=False):
+    """
+    The plan tree of a statement, without running it
+
+    With analyze=True the statement is run (EXPLAIN ANALYZE) and the whole
+    result is returned, including 'Planning Time' and 'Execution Time' in ms.
+    """
+    options = 'ANALYZE, FORMAT JSON' if analyze else 'FORMAT JSON'
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN ({options}) {sql}', params)
+        result = cursor.fetchone()[0]
+    return result[0] if analyze else result[0]['Plan']
+
+
+class capture_plans(CaptureQueriesContext):
+    """
+    Collect the plans of the statements run inside the block
+
+    The block's queries are explained on exit and the Plan objects are
+    available by iterating the context.
+    """
+
+    def __init__(self):
+        super().__init__(connection)
+        self.plans = []
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.plans = [
+                Plan(query['sql'], explain(query['sql']))
+                for query in self.captured_queries
+                if query['sql'].lstrip().upper().startswith(PLANNED_STATEMENTS)
+            ]
+
+    def __iter__(self):
+        return iter(self.plans)
+
+    def __len__(self):
+        return len(self.plans)
+
+
+def table_of(node):
+    """The table a scan node reads, partitions resolved to their parent"""
+    relation = node.get('Relation Name')
+    return PARTITION_SUFFIX.sub('', relation) if relation else None
+
+
+def _conditions(node, *keys):
+    return ' '.join(node.get(key, '') for key in keys)
+
+
+def check_plan(plan, large_tables=(), date_columns=None, max_cost=None):
+    """
+    Args:
+        plan: Plan to check
+        large_tables: Table names that must never be read with a Seq Scan
+        date_columns: {table: column} - a scan of the table bounded on the
+            column must have the bound in its index condition
+        max_cost: Ceiling for the statement's estimated total cost
+
+    Returns:
+        {id(node): expectation} for the offending nodes (empty when fine)
+    """
+    problems = {}
+    for _, node in plan.nodes():
+        table = table_of(node)
+        if table is None:
+            continue
+        if node['Node Type'] == 'Seq Scan' and table in large_tables and node['Total Cost'] > SMALL_SCAN_COST:
+            problems[id(node)] = f'an index scan: {table} is a large table'
+            continue
+
+        column = (date_columns or {}).get(table)
+        if column is None:
+            continue
+        pattern = re.compile(rf'(?<!\w)"?{re.escape(column)}"?\s*[<>]')
+        indexed = _conditions(node, 'Index Cond', 'Recheck Cond')
+        if pattern.search(node.get('Filter', '')) and not pattern.search(indexed):
+            problems[id(node)] = f'the {column} range on {table} as an index condition'
+
+    if max_cost is not None and plan.cost > max_cost:
+        problems.setdefault(id(plan.tree), f'estimated cost at most {max_cost}')
+    return problems
+
+
+def check_plans(plans, large_tables=(), date_columns=None, max_cost=None):
+    """[(plan, problems)] for the plans that break a rule; see check_plan()"""
+    results = []
+    for plan in plans:
+        problems = check_plan(plan, large_tables, date_columns, max_cost)
+        if problems:
+            results.append((plan, problems))
+    return results
+
+
+def describe(node):
+    """One line per plan node, in the spirit of EXPLAIN's text format"""
+    text = node['Node Type']
+    if node.get('Index Name'):
+        text += f" using {node['Index Name']}"
+    if node.get('Relation Name'):
+        text += f" on {node['Relation Name']}"
+    text += f"  (cost={node['Startup Cost']:.2f}..{node['Total Cost']:.2f} rows={node['Plan Rows']})"
+    for key in ('Index Cond', 'Recheck Cond', 'Filter'):
+        if node.get(key):
+            text += f'  {key}: {node[key]}'
+    return text
+
+
+def format_report(results, sql_width=300):
+    """Readable, diff-style rendering of check_plans() results"""
+    sections = []
+    for plan, problems in results:
+        sql = ' '.join(plan.sql.split())
+        lines = [sql if len(sql) <= sql_width else sql[:sql_width] + ' ...']
+        for depth, node in plan.nodes():
+            indent = '  ' * depth
+            if id(node) in problems:
+                lines.append(f'- {indent}{describe(node)}')
+                lines.append(f'+ {indent}  expected {problems[id(node)]}')
+            else:
+                lines.append(f'  {indent}{describe(node)}')
+        sections.append('\n'.join(lines))
+    return '\n\n'.join(sections)
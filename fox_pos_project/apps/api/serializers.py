@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from apps.products.models import Product
+from apps.products.models import Product, StockAlert
 from apps.customers.models import Customer
 from apps.suppliers.models import Supplier
 from apps.quotations.models import Quotation, QuotationItem
@@ -207,7 +207,7 @@ class ProductSerializer(serializers.ModelSerializer):
     
     def get_is_low_stock(self, obj):
         """Check if product is low on stock"""
-        return obj.current_stock <= obj.min_stock_level
+        return obj.is_low_stock
     
     def validate_sku(self, value):
         """Validate SKU is unique"""
@@ -252,7 +252,8 @@ class ProductSerializer(serializers.ModelSerializer):
 
 class QuotationItemSerializer(serializers.ModelSerializer):
     """Serializer for QuotationItem model"""
-    id = serializers.IntegerField(source='product.product_id', read_only=True)
+    # product_id is the FK column itself: no join needed for the id
+    id = serializers.IntegerField(source='product_id', read_only=True)
     name = serializers.CharField(source='product.product_name', read_only=True)
     price = serializers.DecimalField(source='unit_price', max_digits=12, decimal_places=2)
     
@@ -279,6 +280,29 @@ class QuotationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date', 'customer_name', 'items']
 
 
+class QuotationSummarySerializer(serializers.ModelSerializer):
+    """
+    Quotation list row without nested items
+    
+    itemCount / itemsTotal come from annotations on the queryset
+    (see QuotationViewSet.get_queryset).
+    """
+    id = serializers.IntegerField(source='quotation_id', read_only=True)
+    date = serializers.DateField(source='quotation_date', read_only=True)
+    customer_name = serializers.CharField(source='customer.customer_name', read_only=True)
+    totalAmount = serializers.DecimalField(source='total_amount', max_digits=12, decimal_places=2, read_only=True)
+    itemCount = serializers.IntegerField(source='item_count', read_only=True)
+    itemsTotal = serializers.DecimalField(source='items_total', max_digits=14, decimal_places=2, read_only=True)
+    
+    class Meta:
+        model = Quotation
+        fields = [
+            'id', 'date', 'customer', 'customer_name', 'totalAmount',
+            'status', 'itemCount', 'itemsTotal'
+        ]
+        read_only_fields = fields
+
+
 
 class AppSettingsSerializer(serializers.ModelSerializer):
     """Serializer for AppSettings model"""
@@ -353,6 +377,21 @@ class ChangePasswordSerializer(serializers.Serializer):
 
 
 
+class StockAlertSerializer(serializers.ModelSerializer):
+    """Serializer for StockAlert model"""
+    id = serializers.IntegerField(source='alert_id', read_only=True)
+    productId = serializers.IntegerField(source='product_id', read_only=True)
+    productName = serializers.CharField(source='product.product_name', read_only=True)
+    type = serializers.CharField(source='alert_type', read_only=True)
+    quantity = serializers.DecimalField(source='current_stock', max_digits=10, decimal_places=2, read_only=True)
+    minStockAlert = serializers.DecimalField(source='min_stock_level', max_digits=10, decimal_places=2, read_only=True)
+    date = serializers.DateTimeField(source='created_at', read_only=True)
+    
+    class Meta:
+        model = StockAlert
+        fields = ['id', 'productId', 'productName', 'type', 'quantity', 'minStockAlert', 'date']
+
+
 class ActivityLogSerializer(serializers.ModelSerializer):
     """Serializer for ActivityLog model"""
     id = serializers.IntegerField(source='log_id', read_only=True)
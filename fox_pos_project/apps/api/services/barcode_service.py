@@ -0,0 +1,254 @@
+import os
+from functools import lru_cache
+from io import BytesIO
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from apps.products.models import Product
+from ..catalog import bump_catalog_version
+from ..exceptions import BusinessRuleViolation
+from .. import pdf
+
+# In-store EAN-13 range: prefixes 20-29 are reserved for internal use, so
+# generated codes can never clash with a manufacturer's barcode.
+INTERNAL_PREFIXES = [str(prefix) for prefix in range(20, 30)]
+
+# Label sheet layout (A4, in mm)
+SHEET_LAYOUTS = {
+    '3x8': {'columns': 3, 'rows': 8, 'width': 70, 'height': 37},
+    '4x10': {'columns': 4, 'rows': 10, 'width': 52.5, 'height': 29.7},
+    '2x7': {'columns': 2, 'rows': 7, 'width': 99, 'height': 42},
+}
+
+
+def get_cache_dir():
+    return str(getattr(settings, 'BARCODE_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'barcodes')))
+
+
+def ean13_checksum(digits):
+    """Check digit of a 12 digit EAN-13 body"""
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return str((10 - total % 10) % 10)
+
+
+def internal_ean13(product_id, prefix='20'):
+    body = f'{prefix}{product_id:010d}'
+    return body + ean13_checksum(body)
+
+
+@lru_cache(maxsize=20000)
+def encode(code):
+    """
+    Bar pattern ('1' = bar, '0' = space) of a code, cached per code.
+
+    Valid EAN-13 codes use EAN-13, anything else Code 128.
+    """
+    import barcode
+
+    code = str(code)
+    if len(code) == 13 and code.isdigit() and ean13_checksum(code[:12]) == code[12]:
+        symbol = barcode.get_barcode_class('ean13')(code[:12])
+    else:
+        symbol = barcode.get_barcode_class('code128')(code)
+    return ''.join(symbol.build())
+
+
+class BarcodeService:
+    """Bulk barcode assignment, barcode images and printable label sheets"""
+
+    @staticmethod
+    def select_products(category=None, ids=None, missing_only=False):
+        """
+        Product selection shared by the endpoint and the management command
+
+        Args:
+            category: Only this category
+            ids: Only these product ids
+            missing_only: Only products without a barcode
+        """
+        products = Product.objects.filter(is_active=True)
+        if category:
+            products = products.filter(category=category)
+        if ids:
+            products = products.filter(product_id__in=ids)
+        if missing_only:
+            products = products.filter(Q(barcode__isnull=True) | Q(barcode=''))
+        return products.order_by('product_name')
+
+    @staticmethod
+    @transaction.atomic
+    def assign_barcodes(products, batch_size=1000):
+        """
+        Give every selected product without a barcode an internal EAN-13
+
+        Codes are derived from product_id, so they are unique among
+        themselves; one set query finds codes already used by manually
+        entered barcodes and those products move to the next prefix.
+
+        Returns:
+            Number of products that received a barcode
+        """
+        missing = list(
+            products.filter(Q(barcode__isnull=True) | Q(barcode='')).values_list('product_id', flat=True)
+        )
+        if not missing:
+            return 0
+
+        assigned = {}
+        remaining = missing
+        for prefix in INTERNAL_PREFIXES:
+            candidates = {internal_ean13(product_id, prefix): product_id for product_id in remaining}
+            taken = set(
+                Product.objects.filter(barcode__in=list(candidates)).values_list('barcode', flat=True)
+            )
+            remaining = []
+            for code, product_id in candidates.items():
+                if code in taken:
+                    remaining.append(product_id)
+                else:
+                    assigned[product_id] = code
+            if not remaining:
+                break
+
+        if remaining:
+            raise BusinessRuleViolation('تعذر توليد باركود فريد لبعض المنتجات')
+
+        Product.objects.bulk_update(
+            [Product(product_id=product_id, barcode=code) for product_id, code in assigned.items()],
+            ['barcode'],
+            batch_size=batch_size
+        )
+        bump_catalog_version()
+        return len(assigned)
+
+    @staticmethod
+    def print_labels(category=None, ids=None, missing_only=False, assign=True,
+                     layout='3x8', show_price=True):
+        """
+        Select products, optionally assign missing barcodes, and render labels
+
+        Returns:
+            (pdf_bytes, number_of_barcodes_assigned)
+        """
+        products = BarcodeService.select_products(category, ids, missing_only)
+        # Freeze the selection: 'missing only' would be empty once barcodes are assigned
+        selected_ids = list(products.values_list('product_id', flat=True))
+        if not selected_ids:
+            raise BusinessRuleViolation('لا توجد منتجات مطابقة للاختيار')
+
+        selection = Product.objects.filter(product_id__in=selected_ids).order_by('product_name')
+        assigned = BarcodeService.assign_barcodes(selection) if assign else 0
+        return BarcodeService.render_label_sheet(selection, layout, show_price), assigned
+
+    @staticmethod
+    def barcode_image(code):
+        """
+        PNG of a barcode, rendered once and cached on disk by code
+
+        Returns:
+            Path of the PNG file
+        """
+        import barcode
+        from barcode.writer import ImageWriter
+
+        code = str(code)
+        safe_code = ''.join(c if c.isalnum() or c in '-_' else '_' for c in code)
+        path = os.path.join(get_cache_dir(), f'{safe_code}.png')
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(get_cache_dir(), exist_ok=True)
+        if len(code) == 13 and code.isdigit() and ean13_checksum(code[:12]) == code[12]:
+            symbol = barcode.get_barcode_class('ean13')(code[:12], writer=ImageWriter())
+        else:
+            symbol = barcode.get_barcode_class('code128')(code, writer=ImageWriter())
+
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as handle:
+            symbol.write(handle)
+        os.replace(temp_path, path)
+        return path
+
+    @staticmethod
+    def render_label_sheet(products, layout='3x8', show_price=True):
+        """
+        Compose printable A4 label sheets: name, barcode and price per label
+
+        Bars are drawn as vector rectangles from the cached pattern of each
+        code, which is much faster than embedding one raster image per label
+        and stays sharp on label printers.
+
+        Returns:
+            PDF bytes
+        """
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+        from reportlab.pdfgen import canvas
+
+        if layout not in SHEET_LAYOUTS:
+            raise BusinessRuleViolation('تنسيق الملصقات غير مدعوم')
+        spec = SHEET_LAYOUTS[layout]
+        label_width, label_height = spec['width'] * mm, spec['height'] * mm
+        page_width, page_height = A4
+        margin_x = (page_width - spec['columns'] * label_width) / 2
+        margin_y = (page_height - spec['rows'] * label_height) / 2
+        per_page = spec['columns'] * spec['rows']
+
+        font = pdf.register_font(getattr(settings, 'PDF_FONT_PATH', None))
+        output = BytesIO()
+        sheet = canvas.Canvas(output, pagesize=A4)
+
+        rows = products.exclude(barcode__isnull=True).exclude(barcode='').values_list(
+            'product_name', 'barcode', 'selling_price'
+        )
+        index = 0
+        for name, code, price in rows.iterator(chunk_size=2000):
+            if index and index % per_page == 0:
+                sheet.showPage()
+            slot = index % per_page
+            column, row = slot % spec['columns'], slot // spec['columns']
+            # RTL sheet: the first label is at the top right
+            x = page_width - margin_x - (column + 1) * label_width
+            y = page_height - margin_y - (row + 1) * label_height
+            BarcodeService._draw_label(sheet, font, x, y, label_width, label_height,
+                                       name, code, price if show_price else None)
+            index += 1
+
+        if index == 0:
+            raise BusinessRuleViolation('لا توجد منتجات لها باركود للطباعة')
+
+        sheet.save()
+        return output.getvalue()
+
+    @staticmethod
+    def _draw_label(sheet, font, x, y, width, height, name, code, price):
+        from reportlab.lib.units import mm
+
+        padding = 2 * mm
+        # Product name (shaped, truncated to the label width)
+        sheet.setFont(font, 8)
+        text = pdf.shape(name)
+        while text and sheet.stringWidth(text, font, 8) > width - 2 * padding:
+            text = text[1:] if pdf.arabic_reshaper else text[:-1]
+        sheet.drawCentredString(x + width / 2, y + height - padding - 7, text)
+
+        # Bars
+        pattern = encode(code)
+        bar_height = height * 0.45
+        module = (width - 4 * padding) / len(pattern)
+        bars_x = x + 2 * padding
+        bars_y = y + height * 0.22
+        start = None
+        for position, bit in enumerate(pattern + '0'):
+            if bit == '1' and start is None:
+                start = position
+            elif bit != '1' and start is not None:
+                sheet.rect(bars_x + start * module, bars_y, (position - start) * module,
+                           bar_height, stroke=0, fill=1)
+                start = None
+
+        sheet.setFont(font, 7)
+        sheet.drawCentredString(x + width / 2, bars_y - 8, str(code))
+        if price is not None:
+            sheet.setFont(font, 9)
+            sheet.drawCentredString(x + width / 2, y + padding, f'{float(price):,.2f}')
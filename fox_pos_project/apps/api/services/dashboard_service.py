@@ -0,0 +1,258 @@
+from django.db import connections
+from django.db.models import Sum, Count, F, Q, Value, DecimalField, ExpressionWrapper
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from fox_pos.db_router import read_alias
+from apps.products.models import LOW_STOCK, Product
+from apps.customers.models import Customer
+from apps.suppliers.models import Supplier
+from apps.treasury.models import Debt
+from ..models import Transaction
+from ..utils import filter_date_range
+
+
+# Expense category used for direct-sale COGS; kept out of operating expenses
+DIRECT_COGS_CATEGORY = 'تكلفة بضاعة مباعة (Direct)'
+
+SALE = 'بيع'
+RETURN = 'مرتجع'
+PURCHASE = 'شراء'
+EXPENSE = 'مصروف'
+CAPITAL = 'إيداع رأس مال'
+WITHDRAWAL = 'مسحوبات شخصية'
+
+ZERO = Value(0, output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def _sum(condition):
+    return Coalesce(Sum('amount', filter=condition), ZERO)
+
+
+def _float(value):
+    return float(value or 0)
+
+
+class DashboardService:
+    """Pre-aggregated dashboard KPIs computed with SQL aggregates"""
+
+    @staticmethod
+    def get_kpis(from_date=None, to_date=None, top_limit=5, overdue_limit=100):
+        """
+        Compute every dashboard KPI for a date range in a handful of queries
+
+        Args:
+            from_date: First day (YYYY-MM-DD, optional)
+            to_date: Last day, inclusive (YYYY-MM-DD, optional)
+            top_limit: Length of the top products/customers/suppliers lists
+            overdue_limit: Most overdue debts listed (the oldest first)
+
+        Returns:
+            dict ready to be returned by the API
+        """
+        transactions = filter_date_range(Transaction.objects.all(), from_date, to_date).order_by()
+        # A return tied to a customer is a sales return (purchase returns carry a supplier)
+        sales_return = Q(type=RETURN, related_customer__isnull=False)
+
+        # 1. Headline totals - one aggregate over the range
+        totals = transactions.aggregate(
+            total_sales=_sum(Q(type=SALE)),
+            total_returns=_sum(sales_return),
+            total_purchases=_sum(Q(type=PURCHASE)),
+            total_expenses=_sum(Q(type=EXPENSE) & ~Q(category=DIRECT_COGS_CATEGORY)),
+            total_capital=_sum(Q(type=CAPITAL)),
+            total_withdrawals=_sum(Q(type=WITHDRAWAL)),
+        )
+
+        # 2. Daily chart data
+        daily = (
+            transactions
+            .annotate(day=TruncDate('date', tzinfo=timezone.get_current_timezone()))
+            .values('day')
+            .annotate(
+                sales=_sum(Q(type=SALE)),
+                expenses=_sum(Q(type=EXPENSE)),
+                purchases=_sum(Q(type=PURCHASE)),
+            )
+            .order_by('day')
+        )
+        chart_data = [
+            {
+                'date': row['day'].isoformat(),
+                'sales': _float(row['sales']),
+                'expenses': _float(row['expenses']),
+                'purchases': _float(row['purchases']),
+            }
+            for row in daily
+        ]
+
+        # 3. Expense breakdown by category
+        expense_rows = (
+            transactions.filter(type=EXPENSE)
+            .values(category_name=Coalesce('category', Value('غير مصنف')))
+            .annotate(total=Sum('amount'))
+        )
+        expense_breakdown = {row['category_name']: _float(row['total']) for row in expense_rows}
+
+        # 4. COGS and top-selling products come from the JSON items of sales
+        cogs, top_selling = DashboardService._item_aggregates(transactions, sales_return, top_limit)
+
+        # 5. Top customers / suppliers
+        top_customers = [
+            {'id': row['related_customer'], 'name': row['related_customer__customer_name'], 'amount': _float(row['amount'])}
+            for row in transactions.filter(type=SALE, related_customer__isnull=False)
+            .values('related_customer', 'related_customer__customer_name')
+            .annotate(amount=Sum('amount'))
+            .order_by('-amount')[:top_limit]
+        ]
+        top_suppliers = [
+            {'id': row['related_supplier'], 'name': row['related_supplier__supplier_name'], 'amount': _float(row['amount'])}
+            for row in transactions.filter(type=PURCHASE, related_supplier__isnull=False)
+            .values('related_supplier', 'related_supplier__supplier_name')
+            .annotate(amount=Sum('amount'))
+            .order_by('-amount')[:top_limit]
+        ]
+
+        # 6. Debts (current balances, not range-bound)
+        customers_with_debt = list(
+            Customer.objects.filter(current_balance__lt=0)
+            .values('customer_id', 'customer_name', 'current_balance')
+        )
+        suppliers_with_credit = list(
+            Supplier.objects.filter(current_balance__gt=0)
+            .values('supplier_id', 'supplier_name', 'current_balance')
+        )
+        # Open debts past their due date, oldest first; settled invoices are
+        # paid debts, so they drop out
+        overdue = list(
+            Debt.objects.exclude(status='paid')
+            .filter(due_date__lt=timezone.localdate(), remaining_amount__gt=0)
+            .order_by('due_date', 'debt_id')
+            .values('debt_id', 'debt_type', 'entity_type', 'entity_id', 'transaction_id',
+                    'remaining_amount', 'due_date', 'created_at')[:overdue_limit]
+        )
+        party_names = {
+            'customer': dict(Customer.objects.filter(
+                customer_id__in=[row['entity_id'] for row in overdue if row['entity_type'] == 'customer']
+            ).values_list('customer_id', 'customer_name')),
+            'supplier': dict(Supplier.objects.filter(
+                supplier_id__in=[row['entity_id'] for row in overdue if row['entity_type'] == 'supplier']
+            ).values_list('supplier_id', 'supplier_name')),
+        }
+        overdue_invoices = [
+            {
+                'id': row['transaction_id'] or str(row['debt_id']),
+                'type': SALE if row['debt_type'] == 'receivable' else PURCHASE,
+                'amount': _float(row['remaining_amount']),
+                'dueDate': row['due_date'].isoformat(),
+                'date': row['created_at'].isoformat(),
+                'isSale': row['debt_type'] == 'receivable',
+                'relatedName': party_names.get(row['entity_type'], {}).get(row['entity_id']),
+            }
+            for row in overdue
+        ]
+
+        # 7. Inventory valuation
+        inventory = Product.objects.aggregate(
+            total_inventory_cost=Coalesce(Sum(ExpressionWrapper(
+                F('current_stock') * F('purchase_price'),
+                output_field=DecimalField(max_digits=20, decimal_places=2)
+            )), ZERO),
+            total_inventory_value=Coalesce(Sum(ExpressionWrapper(
+                F('current_stock') * F('selling_price'),
+                output_field=DecimalField(max_digits=20, decimal_places=2)
+            )), ZERO),
+            low_stock_count=Count('product_id', filter=LOW_STOCK),
+        )
+
+        total_sales = _float(totals['total_sales'])
+        total_returns = _float(totals['total_returns'])
+        net_sales = total_sales - total_returns
+        total_expenses = _float(totals['total_expenses'])
+        gross_profit = net_sales - cogs
+        total_inventory_cost = _float(inventory['total_inventory_cost'])
+        total_inventory_value = _float(inventory['total_inventory_value'])
+
+        return {
+            'from_date': from_date,
+            'to_date': to_date,
+            'chart_data': chart_data,
+            'total_sales': total_sales,
+            'total_returns': total_returns,
+            'net_sales': net_sales,
+            'total_purchases': _float(totals['total_purchases']),
+            'total_expenses': total_expenses,
+            'expense_breakdown': expense_breakdown,
+            'cogs': cogs,
+            'gross_profit': gross_profit,
+            'net_income': gross_profit - total_expenses,
+            'customers_with_debt': [
+                {'id': c['customer_id'], 'name': c['customer_name'], 'balance': _float(c['current_balance'])}
+                for c in customers_with_debt
+            ],
+            'total_receivables': sum(abs(_float(c['current_balance'])) for c in customers_with_debt),
+            'suppliers_with_credit': [
+                {'id': s['supplier_id'], 'name': s['supplier_name'], 'balance': _float(s['current_balance'])}
+                for s in suppliers_with_credit
+            ],
+            'total_payables': sum(_float(s['current_balance']) for s in suppliers_with_credit),
+            'overdue_invoices': overdue_invoices,
+            'total_inventory_cost': total_inventory_cost,
+            'total_inventory_value': total_inventory_value,
+            'potential_profit': total_inventory_value - total_inventory_cost,
+            'low_stock_count': inventory['low_stock_count'],
+            'top_selling': top_selling,
+            'top_customers': top_customers,
+            'top_suppliers': top_suppliers,
+            'total_capital': _float(totals['total_capital']),
+            'total_withdrawals': _float(totals['total_withdrawals']),
+        }
+
+    @staticmethod
+    def _item_aggregates(transactions, sales_return, top_limit):
+        """
+        COGS (sales minus customer returns) and top-selling products, computed
+        in PostgreSQL by unnesting the JSON `items` of the filtered transactions
+        """
+        scoped = transactions.filter(Q(type=SALE) | sales_return).values('type', 'items')
+        sql, params = scoped.query.sql_with_params()
+
+        # Items are stored either enriched by SaleService (quantity/costPrice/price)
+        # or in the frontend cart shape (cartQuantity/costPrice/sellPrice)
+        quantity = "COALESCE(item->>'quantity', item->>'cartQuantity', '0')::numeric"
+        cost = "COALESCE(item->>'costPrice', item->>'cost_price', '0')::numeric"
+        price = "COALESCE(item->>'price', item->>'sellPrice', '0')::numeric"
+
+        # Raw SQL bypasses the router: pick the alias it would use
+        with connections[read_alias(Transaction)].cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT COALESCE(SUM(CASE WHEN t.type = %s THEN 1 ELSE -1 END * {cost} * {quantity}), 0)
+                FROM ({sql}) t
+                CROSS JOIN LATERAL jsonb_array_elements(
+                    CASE WHEN jsonb_typeof(t.items) = 'array' THEN t.items ELSE '[]'::jsonb END
+                ) item
+                """,
+                [SALE, *params]
+            )
+            cogs = _float(cursor.fetchone()[0])
+
+            cursor.execute(
+                f"""
+                SELECT item->>'id', MAX(item->>'name'), SUM({quantity}), SUM({quantity} * {price})
+                FROM ({sql}) t
+                CROSS JOIN LATERAL jsonb_array_elements(
+                    CASE WHEN jsonb_typeof(t.items) = 'array' THEN t.items ELSE '[]'::jsonb END
+                ) item
+                WHERE t.type = %s
+                GROUP BY item->>'id'
+                ORDER BY 3 DESC
+                LIMIT %s
+                """,
+                [*params, SALE, top_limit]
+            )
+            top_selling = [
+                {'id': product_id, 'name': name, 'qty': _float(qty), 'revenue': _float(revenue)}
+                for product_id, name, qty, revenue in cursor.fetchall()
+            ]
+
+        return cogs, top_selling
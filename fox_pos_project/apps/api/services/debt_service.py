@@ -0,0 +1,163 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from apps.treasury.models import Debt, DebtPayment
+from .ledger_service import party_type_of
+
+DEBT_TYPES = {'customer': 'receivable', 'supplier': 'payable'}
+# (name, first day overdue, last day overdue)
+AGING_BUCKETS = [
+    ('current', None, 0),
+    ('days_1_30', 1, 30),
+    ('days_31_60', 31, 60),
+    ('days_61_90', 61, 90),
+    ('over_90', 91, None),
+]
+ALLOCATION_BATCH = 100
+
+ZERO = Value(Decimal('0'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+class DebtService:
+    """Per-invoice debts for deferred sales / purchases, FIFO settlement and aging"""
+
+    @staticmethod
+    def open_debt(party, amount, transaction_id=None, due_date=None):
+        """Record a deferred invoice as an open debt (due today unless a due date is given)"""
+        party_type = party_type_of(party)
+        amount = Decimal(str(amount))
+        return Debt.objects.create(
+            debt_type=DEBT_TYPES[party_type],
+            entity_type=party_type,
+            entity_id=party.pk,
+            reference_type='transaction',
+            transaction_id=transaction_id,
+            original_amount=amount,
+            paid_amount=Decimal('0'),
+            remaining_amount=amount,
+            due_date=due_date or timezone.localdate(),
+            status='pending',
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def allocate(party, amount, payment_method=None, user=None, notes=None, transaction_id=None):
+        """
+        Settle a party's open debts oldest-due first
+
+        Open debts are read in small locked batches from the
+        (entity_type, entity_id, status, due_date) index, so a payment only
+        touches the debts it actually settles.
+
+        Args:
+            amount: Payment (or credit) to distribute
+            transaction_id: Debt to settle before the FIFO order, e.g. a
+                return settles its own invoice first
+
+        Returns:
+            dict with the allocations and any unallocated (advance) amount
+        """
+        remaining = Decimal(str(amount))
+        allocations = []
+        open_debts = Debt.objects.filter(
+            entity_type=party_type_of(party),
+            entity_id=party.pk,
+            status__in=Debt.OPEN_STATUSES,
+        )
+
+        def settle(debts):
+            nonlocal remaining
+            changed, payments = [], []
+            now = timezone.now()
+            for debt in debts:
+                if debt.remaining_amount <= 0:
+                    # Nothing left to pay (an adjusted debt): close it without a
+                    # payment, which chk_payment_amount requires to be positive
+                    debt.status = 'paid'
+                    debt.updated_at = now
+                    changed.append(debt)
+                    continue
+                if remaining <= 0:
+                    break
+                paid = min(remaining, debt.remaining_amount)
+                remaining -= paid
+                debt.paid_amount += paid
+                debt.remaining_amount -= paid
+                debt.status = 'paid' if debt.remaining_amount <= 0 else 'partial'
+                debt.updated_at = now
+                changed.append(debt)
+                payments.append(DebtPayment(
+                    debt=debt,
+                    payment_amount=paid,
+                    payment_method=payment_method,
+                    created_by=user.id if user else None,
+                    notes=notes,
+                ))
+                allocations.append({
+                    'debt_id': debt.debt_id,
+                    'transaction_id': debt.transaction_id,
+                    'amount': float(paid),
+                    'remaining': float(debt.remaining_amount),
+                    'status': debt.status,
+                })
+            Debt.objects.bulk_update(changed, ['paid_amount', 'remaining_amount', 'status', 'updated_at'])
+            DebtPayment.objects.bulk_create(payments)
+            return len(changed)
+
+        if transaction_id:
+            settle(open_debts.filter(transaction_id=transaction_id).select_for_update())
+
+        while remaining > 0:
+            batch = list(open_debts.select_for_update().order_by('due_date', 'debt_id')[:ALLOCATION_BATCH])
+            if not batch or not settle(batch):
+                break
+
+        return {'allocations': allocations, 'unallocated': float(remaining)}
+
+    @staticmethod
+    def aging(as_of=None, entity_type=None):
+        """
+        Open receivables / payables by days overdue
+
+        One aggregate over open debts; the filter matches the partial
+        index on due_date, which also covers the summed columns.
+        """
+        as_of = as_of or timezone.localdate()
+        debts = Debt.objects.exclude(status='paid')
+        if entity_type:
+            debts = debts.filter(entity_type=entity_type)
+
+        buckets = {}
+        for name, first_day, last_day in AGING_BUCKETS:
+            if first_day is None:
+                # Not due yet (debts without a due date count as current)
+                condition = Q(due_date__gte=as_of) | Q(due_date__isnull=True)
+            else:
+                condition = Q(due_date__lte=as_of - timedelta(days=first_day))
+                if last_day is not None:
+                    condition &= Q(due_date__gte=as_of - timedelta(days=last_day))
+            buckets[name] = Coalesce(Sum('remaining_amount', filter=condition), ZERO)
+
+        rows = debts.values('debt_type').annotate(
+            **buckets,
+            count=Count('*'),
+            total=Coalesce(Sum('remaining_amount'), ZERO)
+        )
+
+        result = {
+            'as_of': as_of.isoformat(),
+            'buckets': [name for name, _, _ in AGING_BUCKETS],
+        }
+        for debt_type in DEBT_TYPES.values():
+            result[debt_type] = {name: 0.0 for name, _, _ in AGING_BUCKETS}
+            result[debt_type].update(count=0, total=0.0)
+        for row in rows:
+            summary = result.setdefault(row['debt_type'], {})
+            for name, _, _ in AGING_BUCKETS:
+                summary[name] = float(row[name])
+            summary['count'] = row['count']
+            summary['total'] = float(row['total'])
+        return result
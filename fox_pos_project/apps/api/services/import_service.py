@@ -0,0 +1,258 @@
+import os
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from apps.products.models import Product
+from ..catalog import bump_catalog_version
+from ..exceptions import BusinessRuleViolation
+from .stock_alert_service import StockAlertService
+
+# Accepted column headers -> Product field. Covers the API field names, the
+# model field names and the Arabic headers of the inventory export, so an
+# exported sheet can be edited and imported back.
+COLUMN_ALIASES = {
+    'product_code': ['sku', 'product_code', 'code', 'الكود', 'كود المنتج'],
+    'product_name': ['name', 'product_name', 'الصنف', 'اسم المنتج'],
+    'barcode': ['barcode', 'الباركود'],
+    'category': ['category', 'التصنيف'],
+    'unit': ['unit', 'الوحدة'],
+    'current_stock': ['quantity', 'current_stock', 'الرصيد', 'الكمية'],
+    'purchase_price': ['costPrice', 'purchase_price', 'سعر الشراء'],
+    'selling_price': ['sellPrice', 'selling_price', 'سعر البيع'],
+    'min_stock_level': ['minStockAlert', 'min_stock_level', 'حد الطلب'],
+    'description': ['description', 'الوصف'],
+}
+
+REQUIRED_FIELDS = ['product_code', 'product_name']
+NUMERIC_FIELDS = ['current_stock', 'purchase_price', 'selling_price', 'min_stock_level']
+TEXT_LIMITS = {'product_code': 100, 'product_name': 300, 'barcode': 100, 'category': 100, 'unit': 50}
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+
+def normalize_columns(columns):
+    """Map file headers to Product fields; unknown columns are ignored"""
+    lookup = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            lookup[alias.strip().lower()] = field
+    return {column: lookup[str(column).strip().lower()]
+            for column in columns if str(column).strip().lower() in lookup}
+
+
+def read_chunks(path_or_file, filename, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield DataFrames of at most `chunk_size` rows, all values as strings
+
+    CSV is read by pandas in chunks; XLSX is streamed with openpyxl's
+    read-only mode because pandas.read_excel cannot chunk.
+    """
+    import pandas as pd
+
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        yield from pd.read_csv(
+            path_or_file, chunksize=chunk_size, dtype=str, keep_default_na=False,
+            encoding='utf-8-sig', skip_blank_lines=True
+        )
+        return
+
+    if extension not in ('.xlsx', '.xlsm'):
+        raise BusinessRuleViolation('صيغة الملف غير مدعومة (xlsx أو csv)')
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path_or_file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [str(value).strip() if value is not None else '' for value in next(rows, [])]
+        buffer = []
+        for row in rows:
+            if all(value is None or str(value).strip() == '' for value in row):
+                continue
+            buffer.append(['' if value is None else str(value) for value in row[:len(headers)]])
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=headers)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=headers)
+    finally:
+        workbook.close()
+
+
+class ProductImportService:
+    """Bulk product import from XLSX/CSV with a per-row error report"""
+
+    @staticmethod
+    def import_file(path_or_file, filename, update_existing=True, dry_run=False,
+                    chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Validate and upsert products chunk by chunk
+
+        Args:
+            path_or_file: Path or file object of the sheet
+            filename: Original file name (its extension selects the reader)
+            update_existing: Update products whose SKU already exists,
+                otherwise report them as errors
+            dry_run: Validate only, write nothing
+
+        Returns:
+            dict with total_rows, created, updated, failed and errors
+            (row numbers match the spreadsheet, header = row 1)
+        """
+        report = {'total_rows': 0, 'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+        seen_skus = set()
+        seen_barcodes = set()
+        first_row = 2
+
+        for chunk in read_chunks(path_or_file, filename, chunk_size):
+            chunk.index = range(first_row, first_row + len(chunk))
+            first_row += len(chunk)
+            report['total_rows'] += len(chunk)
+
+            ProductImportService._import_chunk(
+                chunk, report, seen_skus, seen_barcodes, update_existing, dry_run
+            )
+
+        report['errors_truncated'] = len(report['errors']) > MAX_REPORTED_ERRORS
+        report['errors'] = report['errors'][:MAX_REPORTED_ERRORS]
+        report['dry_run'] = dry_run
+        return report
+
+    @staticmethod
+    def _import_chunk(chunk, report, seen_skus, seen_barcodes, update_existing, dry_run):
+        import pandas as pd
+
+        mapping = normalize_columns(chunk.columns)
+        missing = [field for field in REQUIRED_FIELDS if field not in mapping.values()]
+        if missing:
+            raise BusinessRuleViolation(
+                f"أعمدة مطلوبة غير موجودة: {', '.join(COLUMN_ALIASES[field][0] for field in missing)}"
+            )
+
+        frame = chunk[list(mapping)].rename(columns=mapping)
+        frame = frame.loc[:, ~frame.columns.duplicated()]
+        frame = frame.apply(lambda column: column.astype(str).str.strip())
+
+        errors = pd.Series('', index=frame.index)
+
+        def flag(mask, message):
+            mask = mask & (errors == '')
+            errors[mask] = message
+
+        # Vectorised column checks
+        flag(frame['product_code'] == '', 'كود المنتج (SKU) مطلوب')
+        flag(frame['product_name'] == '', 'اسم المنتج مطلوب')
+        for field, limit in TEXT_LIMITS.items():
+            if field in frame:
+                flag(frame[field].str.len() > limit, f'{field}: الحد الأقصى {limit} حرف')
+
+        numbers = {}
+        for field in NUMERIC_FIELDS:
+            if field not in frame:
+                continue
+            blank = frame[field] == ''
+            values = pd.to_numeric(frame[field].str.replace(',', '', regex=False), errors='coerce')
+            flag(values.isna() & ~blank, f'{field}: قيمة رقمية غير صحيحة')
+            flag(values < 0, f'{field}: لا يمكن أن تكون القيمة سالبة')
+            numbers[field] = values.fillna(0).round(2)
+
+        # Duplicates inside the file (this chunk and earlier chunks)
+        flag(frame['product_code'].duplicated(keep='first'), 'كود المنتج مكرر في الملف')
+        flag(frame['product_code'].isin(seen_skus), 'كود المنتج مكرر في الملف')
+        if 'barcode' in frame:
+            has_barcode = frame['barcode'] != ''
+            flag(has_barcode & frame['barcode'].duplicated(keep='first'), 'الباركود مكرر في الملف')
+            flag(has_barcode & frame['barcode'].isin(seen_barcodes), 'الباركود مكرر في الملف')
+
+        # Duplicates against the database: one set query for the whole chunk
+        skus = set(frame['product_code']) - {''}
+        barcodes = set(frame['barcode']) - {''} if 'barcode' in frame else set()
+        existing_skus = set()
+        barcode_owner = {}
+        for code, barcode in Product.objects.filter(
+            Q(product_code__in=skus) | Q(barcode__in=barcodes)
+        ).values_list('product_code', 'barcode'):
+            if code in skus:
+                existing_skus.add(code)
+            if barcode:
+                barcode_owner[barcode] = code
+
+        exists = frame['product_code'].isin(existing_skus)
+        if not update_existing:
+            flag(exists, 'كود المنتج (SKU) موجود مسبقاً')
+        if 'barcode' in frame:
+            owner = frame['barcode'].map(barcode_owner)
+            flag(owner.notna() & (owner != frame['product_code']), 'الباركود مستخدم لمنتج آخر')
+
+        failed = errors != ''
+        for row_number, message in errors[failed].items():
+            report['errors'].append({
+                'row': int(row_number),
+                'sku': frame.at[row_number, 'product_code'],
+                'message': message,
+            })
+        report['failed'] += int(failed.sum())
+
+        valid = frame[~failed]
+        seen_skus.update(valid['product_code'])
+        if 'barcode' in valid:
+            seen_barcodes.update(set(valid['barcode']) - {''})
+        if valid.empty:
+            return
+
+        report['updated'] += int(exists[~failed].sum())
+        report['created'] += int((~exists[~failed]).sum())
+        if dry_run:
+            return
+
+        with transaction.atomic():
+            ProductImportService._write(valid, numbers)
+            bump_catalog_version()
+
+    @staticmethod
+    def _write(valid, numbers):
+        """
+        Create the new SKUs and update the existing ones
+
+        A blank cell is a value the sheet does not set: new products get the
+        model default, existing products keep what they have. Stock changes
+        go through StockAlertService like any other.
+        """
+        existing = {
+            product.product_code: product
+            for product in Product.objects.select_for_update().filter(
+                product_code__in=list(valid['product_code'])
+            ).only('product_id', 'product_code', 'current_stock', 'min_stock_level')
+        }
+
+        created = []
+        updated = {}  # updated fields -> products
+        stock_changes = []
+        now = timezone.now()
+        for row_number, row in valid.to_dict('index').items():
+            values = {field: value for field, value in row.items() if value != ''}
+            for field in numbers.keys() & values.keys():
+                values[field] = Decimal(str(numbers[field][row_number]))
+
+            product = existing.get(values['product_code'])
+            if product is None:
+                created.append(Product(**values))
+                continue
+
+            previous_stock = product.current_stock
+            for field, value in values.items():
+                setattr(product, field, value)
+            product.updated_at = now
+            fields = tuple(sorted(set(values) - {'product_code'}))
+            updated.setdefault(fields, []).append(product)
+            if {'current_stock', 'min_stock_level'} & values.keys():
+                stock_changes.append((product, previous_stock))
+
+        Product.objects.bulk_create(created, batch_size=1000)
+        for fields, products in updated.items():
+            Product.objects.bulk_update(products, [*fields, 'updated_at'], batch_size=1000)
+        for product, previous_stock in stock_changes:
+            StockAlertService.record(product, previous_stock)
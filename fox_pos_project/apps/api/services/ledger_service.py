@@ -0,0 +1,113 @@
+from datetime import datetime, time
+from decimal import Decimal
+from django.db import transaction
+from django.utils import timezone
+from apps.customers.models import Customer
+from apps.suppliers.models import Supplier
+from ..models import PartyLedgerEntry
+from ..utils import filter_date_range, parse_query_date
+
+
+def party_type_of(party):
+    if isinstance(party, Customer):
+        return 'customer'
+    if isinstance(party, Supplier):
+        return 'supplier'
+    raise TypeError(f'Not a customer or supplier: {party!r}')
+
+
+class LedgerService:
+    """Customer / supplier balance changes and account statements"""
+
+    @staticmethod
+    @transaction.atomic
+    def post(party, amount, transaction_id=None, description='', user=None):
+        """
+        Change a party's balance and record the entry
+
+        Every current_balance change goes through here. The party row is
+        locked while the running balance is computed, so concurrent postings
+        for the same party serialise and the ledger stays consistent.
+
+        Args:
+            party: Customer or Supplier
+            amount: Signed change (customer: negative = owes us more;
+                supplier: positive = we owe more)
+            transaction_id: Related transaction, if any
+
+        Returns:
+            The PartyLedgerEntry
+        """
+        amount = Decimal(str(amount))
+        locked = type(party).objects.select_for_update().get(pk=party.pk)
+        locked.current_balance += amount
+        locked.save()
+        # Keep the caller's instance in sync (it is usually serialised next)
+        party.current_balance = locked.current_balance
+
+        return PartyLedgerEntry.objects.create(
+            party_type=party_type_of(party),
+            party_id=party.pk,
+            amount=amount,
+            balance=locked.current_balance,
+            transaction_id=transaction_id,
+            description=description[:255],
+            created_by=user,
+        )
+
+    @staticmethod
+    def statement(party, from_date=None, to_date=None):
+        """
+        Opening balance, period entries and closing balance
+
+        Both queries are seeks on (party_type, party_id, date): the opening
+        balance is the last entry before the period, the rows are the
+        period's range.
+        """
+        entries = PartyLedgerEntry.objects.filter(party_type=party_type_of(party), party_id=party.pk)
+
+        opening_balance = Decimal('0')
+        if from_date:
+            start = timezone.make_aware(
+                datetime.combine(parse_query_date(from_date, 'from_date'), time.min),
+                timezone.get_current_timezone()
+            )
+            last = (
+                entries.filter(date__lt=start)
+                .order_by('-date', '-entry_id')
+                .values_list('balance', flat=True)
+                .first()
+            )
+            if last is not None:
+                opening_balance = last
+
+        rows = list(
+            filter_date_range(entries, from_date, to_date)
+            .order_by('date', 'entry_id')
+            .values('entry_id', 'date', 'amount', 'balance', 'transaction_id', 'description')
+        )
+
+        increases = sum((row['amount'] for row in rows if row['amount'] > 0), Decimal('0'))
+        decreases = sum((-row['amount'] for row in rows if row['amount'] < 0), Decimal('0'))
+
+        return {
+            'party_type': party_type_of(party),
+            'party_id': party.pk,
+            'from_date': from_date,
+            'to_date': to_date,
+            'opening_balance': float(opening_balance),
+            'total_increases': float(increases),
+            'total_decreases': float(decreases),
+            'closing_balance': float(rows[-1]['balance'] if rows else opening_balance),
+            'entries': [
+                {
+                    'id': row['entry_id'],
+                    'date': row['date'].isoformat(),
+                    'amount': float(row['amount']),
+                    'balance': float(row['balance']),
+                    'transactionId': row['transaction_id'],
+                    'description': row['description'],
+                }
+                for row in rows
+            ],
+        }
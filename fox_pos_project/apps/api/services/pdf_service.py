@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from apps.quotations.models import Quotation
+from ..models import Transaction, AppSettings
+from ..exceptions import BusinessRuleViolation
+from .. import pdf
+
+
+def get_cache_dir():
+    return str(getattr(settings, 'PDF_CACHE_DIR', os.path.join(settings.BASE_DIR, 'pdf_cache')))
+
+
+def get_font_path():
+    return getattr(settings, 'PDF_FONT_PATH', None)
+
+
+class PDFService:
+    """Render invoices and quotations to PDF, cached on disk by content hash"""
+
+    @staticmethod
+    def company_header(app_settings=None):
+        app_settings = app_settings or AppSettings.get_settings()
+        return {
+            'name': app_settings.company_name,
+            'phone': app_settings.company_phone,
+            'address': app_settings.company_address,
+        }, app_settings.invoice_terms
+
+    @staticmethod
+    def invoice_document(sale, app_settings=None):
+        """
+        Build the printable document of a sale transaction
+
+        Args:
+            sale: Transaction of type 'بيع' (related_customer preferably selected)
+        """
+        if sale.type != 'بيع':
+            raise BusinessRuleViolation('يمكن طباعة فواتير البيع فقط')
+
+        company, terms = PDFService.company_header(app_settings)
+        customer = sale.related_customer
+
+        items = []
+        discount_total = 0
+        for item in sale.items or []:
+            quantity = float(item.get('quantity', item.get('cartQuantity', 0)) or 0)
+            price = float(item.get('price', item.get('sellPrice', 0)) or 0)
+            discount = float(item.get('discount', 0) or 0)  # Per unit
+            discount_total += discount * quantity
+            items.append({
+                'name': item.get('name', ''),
+                'quantity': quantity,
+                'price': price,
+                'discount': discount,
+                'total': (price - discount) * quantity,
+            })
+
+        extra = [('طريقة الدفع', sale.payment_method)]
+        if sale.due_date:
+            extra.append(('تاريخ الاستحقاق', sale.due_date.isoformat()))
+
+        totals = []
+        if discount_total:
+            totals.append(('إجمالي الخصم', discount_total))
+        totals.append(('الإجمالي', float(sale.amount)))
+
+        return {
+            'kind': 'invoice',
+            'number': sale.transaction_id,
+            'date': timezone.localtime(sale.date).strftime('%Y-%m-%d %H:%M'),
+            'company': company,
+            'party': {
+                'name': customer.customer_name if customer else 'عميل نقدي',
+                'phone': customer.phone if customer else '',
+                'address': customer.address if customer else '',
+            },
+            'items': items,
+            'totals': totals,
+            'extra': extra,
+            'notes': sale.description,
+            'terms': terms,
+        }
+
+    @staticmethod
+    def quotation_document(quotation, app_settings=None):
+        """Build the printable document of a quotation"""
+        company, terms = PDFService.company_header(app_settings)
+        customer = quotation.customer
+
+        items = []
+        for item in quotation.quotationitem_set.select_related('product'):
+            items.append({
+                'name': item.product_description or item.product.product_name,
+                'quantity': float(item.quantity),
+                'price': float(item.unit_price),
+                'discount': float(item.unit_price) * float(item.discount_percentage) / 100,
+                'total': float(item.total),
+            })
+
+        totals = [('الإجمالي قبل الخصم', float(quotation.subtotal))]
+        if quotation.discount_amount:
+            totals.append(('الخصم', float(quotation.discount_amount)))
+        if quotation.tax_amount:
+            totals.append(('الضريبة', float(quotation.tax_amount)))
+        totals.append(('الإجمالي', float(quotation.total_amount)))
+
+        return {
+            'kind': 'quotation',
+            'number': quotation.quotation_number,
+            'date': quotation.quotation_date.isoformat() if quotation.quotation_date else '',
+            'company': company,
+            'party': {
+                'name': quotation.company_name or customer.customer_name,
+                'phone': quotation.phone or customer.phone,
+                'address': customer.address,
+            },
+            'items': items,
+            'totals': totals,
+            'extra': [('ساري حتى', quotation.valid_until.isoformat() if quotation.valid_until else 'غير محدد')],
+            'notes': quotation.notes,
+            'terms': terms,
+        }
+
+    @staticmethod
+    def cache_path(document):
+        """
+        Cache file for a document: `<cache>/<kind>/<number>-<hash>.pdf`
+
+        The hash covers everything printed (items, totals, company header,
+        terms), so any change produces a new file and old versions are
+        never served.
+        """
+        payload = json.dumps(document, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:20]
+        safe_number = ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(document['number']))
+        return os.path.join(get_cache_dir(), document['kind'], f'{safe_number}-{digest}.pdf')
+
+    @staticmethod
+    def render_cached(document):
+        """Return the cached PDF path, rendering it first if the content changed"""
+        path = PDFService.cache_path(document)
+        if os.path.exists(path):
+            return path
+
+        pdf.render_to_file(document, path, get_font_path())
+        PDFService._remove_stale_versions(path)
+        return path
+
+    @staticmethod
+    def _remove_stale_versions(path):
+        """Delete older renders of the same document number"""
+        directory, filename = os.path.split(path)
+        stem = filename.rsplit('-', 1)[0]
+        for name in os.listdir(directory):
+            if name != filename and name.endswith('.pdf') and name.rsplit('-', 1)[0] == stem:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def get_invoice_pdf(transaction_id):
+        """Path of the PDF for a sale invoice"""
+        try:
+            sale = Transaction.objects.select_related('related_customer').get(transaction_id=transaction_id)
+        except Transaction.DoesNotExist:
+            raise NotFound('الفاتورة غير موجودة')
+        return PDFService.render_cached(PDFService.invoice_document(sale))
+
+    @staticmethod
+    def get_quotation_pdf(quotation_id):
+        """Path of the PDF for a quotation"""
+        try:
+            quotation = Quotation.objects.select_related('customer').get(quotation_id=quotation_id)
+        except Quotation.DoesNotExist:
+            raise NotFound('عرض السعر غير موجود')
+        return PDFService.render_cached(PDFService.quotation_document(quotation))
+
+    @staticmethod
+    def render_day(day, workers=None):
+        """
+        Render every sale invoice of a (local) day in parallel processes
+
+        Documents are built here with a single query; the workers only run
+        reportlab, so they never open database connections.
+
+        Returns:
+            dict with counts of rendered and already cached invoices
+        """
+        tz = timezone.get_current_timezone()
+        start = timezone.make_aware(datetime.combine(day, time.min), tz)
+        sales = (
+            Transaction.objects
+            .filter(type='بيع', date__gte=start, date__lt=start + timedelta(days=1))
+            .select_related('related_customer')
+            .order_by('date')
+        )
+
+        app_settings = AppSettings.get_settings()
+        pending = []
+        cached = 0
+        for sale in sales.iterator(chunk_size=500):
+            document = PDFService.invoice_document(sale, app_settings)
+            path = PDFService.cache_path(document)
+            if os.path.exists(path):
+                cached += 1
+            else:
+                pending.append((document, path))
+
+        if pending:
+            font_path = get_font_path()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(pdf.render_to_file, document, path, font_path)
+                    for document, path in pending
+                ]
+                for future in futures:
+                    PDFService._remove_stale_versions(future.result())
+
+        return {'rendered': len(pending), 'cached': cached}
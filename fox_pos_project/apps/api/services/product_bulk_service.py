@@ -0,0 +1,170 @@
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.db.models import F, Q, Value, DecimalField, ExpressionWrapper
+from django.db.models.functions import Ceil, Floor, Greatest, Now, Round
+from apps.products.models import Product
+from ..catalog import bump_catalog_version, get_catalog_version
+from ..exceptions import BusinessRuleViolation
+from ..utils import log_activity
+
+PRICE_FIELDS = {
+    'selling_price': ['selling_price'],
+    'purchase_price': ['purchase_price'],
+    'both': ['selling_price', 'purchase_price'],
+}
+PRICE_MODES = ('percent', 'absolute', 'set')
+ROUNDING_MODES = {'nearest': Round, 'up': Ceil, 'down': Floor}
+PREVIEW_LIMIT = 50
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def to_decimal(value, name):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        raise BusinessRuleViolation(f'{name} يجب أن يكون رقم', error_code='VALIDATION_ERROR')
+
+
+class ProductBulkService:
+    """Set-based price / stock-level / activation changes on a product selection"""
+
+    @staticmethod
+    def select_products(category=None, search=None, ids=None):
+        """Same selection rules as the product list (category filter, search, ids)"""
+        products = Product.objects.all()
+        if category:
+            products = products.filter(category=category)
+        if search:
+            products = products.filter(
+                Q(product_name__icontains=search) |
+                Q(product_code__icontains=search) |
+                Q(barcode__icontains=search)
+            )
+        if ids:
+            products = products.filter(product_id__in=ids)
+        return products
+
+    @staticmethod
+    def price_expression(field, mode, value, rounding=None, rounding_mode='nearest'):
+        """
+        SQL expression of the new price, computed from the current column
+
+        Args:
+            mode: 'percent' (+10 = 10% up), 'absolute' (+5 = 5 up) or 'set'
+            rounding: Step to round to (e.g. 0.5, 1, 5), optional
+            rounding_mode: 'nearest', 'up' or 'down'
+        """
+        value = Value(value, output_field=MONEY)
+        hundred = Value(Decimal('100'), output_field=MONEY)
+        if mode == 'percent':
+            expression = F(field) * (hundred + value) / hundred
+        elif mode == 'absolute':
+            expression = F(field) + value
+        else:
+            expression = value
+
+        if rounding:
+            step = Value(rounding, output_field=MONEY)
+            expression = ROUNDING_MODES[rounding_mode](expression / step) * step
+        else:
+            expression = Round(expression, 2)
+
+        # Never produce a negative price
+        return ExpressionWrapper(
+            Greatest(expression, Value(Decimal('0'), output_field=MONEY)),
+            output_field=MONEY
+        )
+
+    @staticmethod
+    def build_changes(price=None, min_stock_level=None, is_active=None):
+        """Validate the requested operation and turn it into {field: expression}"""
+        changes = {}
+
+        if price:
+            fields = PRICE_FIELDS.get(price.get('field', 'selling_price'))
+            mode = price.get('mode', 'percent')
+            rounding_mode = price.get('rounding_mode', 'nearest')
+            if fields is None:
+                raise BusinessRuleViolation('حقل السعر غير صحيح', error_code='VALIDATION_ERROR')
+            if mode not in PRICE_MODES:
+                raise BusinessRuleViolation('نوع تعديل السعر غير صحيح', error_code='VALIDATION_ERROR')
+            if rounding_mode not in ROUNDING_MODES:
+                raise BusinessRuleViolation('طريقة التقريب غير صحيحة', error_code='VALIDATION_ERROR')
+
+            value = to_decimal(price.get('value'), 'value')
+            rounding = price.get('rounding')
+            rounding = to_decimal(rounding, 'rounding') if rounding not in (None, '', 0, '0') else None
+            if rounding is not None and rounding <= 0:
+                raise BusinessRuleViolation('قيمة التقريب يجب أن تكون أكبر من صفر', error_code='VALIDATION_ERROR')
+            if mode == 'percent' and value <= -100:
+                raise BusinessRuleViolation('لا يمكن تخفيض السعر بنسبة 100% أو أكثر', error_code='VALIDATION_ERROR')
+
+            for field in fields:
+                changes[field] = ProductBulkService.price_expression(field, mode, value, rounding, rounding_mode)
+
+        if min_stock_level is not None:
+            level = to_decimal(min_stock_level, 'min_stock_level')
+            if level < 0:
+                raise BusinessRuleViolation('حد الطلب لا يمكن أن يكون سالب', error_code='VALIDATION_ERROR')
+            changes['min_stock_level'] = Value(level, output_field=MONEY)
+
+        if is_active is not None:
+            changes['is_active'] = Value(bool(is_active))
+
+        if not changes:
+            raise BusinessRuleViolation('لم يتم تحديد أي تعديل', error_code='VALIDATION_ERROR')
+        return changes
+
+    @staticmethod
+    def apply(products, changes, dry_run=False, user=None):
+        """
+        Apply the changes with one UPDATE, or preview them
+
+        The preview computes the new values with the very same SQL
+        expressions (as annotations), so it shows exactly what the update
+        would write.
+
+        Returns:
+            dict with matched count, preview rows and the catalog version
+        """
+        fields = list(changes)
+        preview_rows = (
+            products.order_by('product_name')
+            .annotate(**{f'new_{field}': expression for field, expression in changes.items()})
+            .values('product_id', 'product_code', 'product_name', *fields,
+                    *[f'new_{field}' for field in fields])[:PREVIEW_LIMIT]
+        )
+        preview = [
+            {
+                'id': row['product_id'],
+                'sku': row['product_code'],
+                'name': row['product_name'],
+                'changes': {
+                    field: {'old': row[field], 'new': row[f'new_{field}']}
+                    for field in fields if row[field] != row[f'new_{field}']
+                },
+            }
+            for row in preview_rows
+        ]
+
+        if dry_run:
+            return {
+                'dry_run': True,
+                'matched': products.count(),
+                'preview': preview,
+                'catalog_version': get_catalog_version(),
+            }
+
+        with transaction.atomic():
+            updated = products.update(**changes, updated_at=Now())
+            bump_catalog_version()
+            log_activity(user, 'تعديل جماعي للمنتجات', f'{updated} منتج - {", ".join(fields)}')
+
+        return {
+            'dry_run': False,
+            'matched': updated,
+            'updated': updated,
+            'preview': preview,
+            'catalog_version': get_catalog_version(),
+        }
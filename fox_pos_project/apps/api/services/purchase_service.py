@@ -4,6 +4,10 @@ from apps.products.models import Product
 from apps.suppliers.models import Supplier
 from ..models import Transaction, Shift
 from ..exceptions import BusinessRuleViolation
+from ..utils import log_activity
+from .ledger_service import LedgerService
+from .debt_service import DebtService
+from .stock_alert_service import StockAlertService
 import uuid
 
 
@@ -100,13 +104,22 @@ class PurchaseService:
             # Update quantity
             product.current_stock += new_quantity
             product.save()
+            StockAlertService.record(product, old_quantity)
         
         # 7. Update supplier balance (if deferred)
         if payment_method == 'آجل':
-            supplier.current_balance += Decimal(str(total_amount))
-            supplier.save()
+            LedgerService.post(
+                supplier, Decimal(str(total_amount)),
+                transaction_id=transaction_id, description=f'فاتورة شراء آجل {transaction_id}', user=user
+            )
+            DebtService.open_debt(supplier, total_amount, transaction_id, due_date=purchase_transaction.due_date)
         
-        # 7. TODO: Log activity
+        # 8. Log activity (buffered, written after commit)
+        log_activity(
+            user,
+            'عملية شراء',
+            f'فاتورة شراء {transaction_id} - {supplier.supplier_name} - {payment_method} - {total_amount}'
+        )
         
         return purchase_transaction
     
@@ -169,13 +182,23 @@ class PurchaseService:
         # Decrease product quantities
         for item in original_transaction.items:
             product = Product.objects.get(product_id=item['id'])
+            previous_stock = product.current_stock
             product.current_stock -= Decimal(str(item['quantity']))
             product.save()
+            StockAlertService.record(product, previous_stock)
         
         # Adjust supplier balance (if deferred)
         if original_transaction.payment_method == 'آجل' and original_transaction.related_supplier:
-            supplier = original_transaction.related_supplier
-            supplier.current_balance -= Decimal(str(original_transaction.amount))
-            supplier.save()
+            LedgerService.post(
+                original_transaction.related_supplier, -Decimal(str(original_transaction.amount)),
+                transaction_id=return_transaction.transaction_id,
+                description=f'مرتجع من {transaction_id}', user=user
+            )
+            # The credit settles the returned invoice first, then older debts
+            DebtService.allocate(
+                original_transaction.related_supplier, original_transaction.amount,
+                payment_method='مرتجع', user=user, notes=return_transaction.transaction_id,
+                transaction_id=transaction_id
+            )
         
         return return_transaction
@@ -0,0 +1,205 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Prefetch
+from apps.products.models import Product
+from apps.quotations.models import Quotation, QuotationItem
+from ..exceptions import BusinessRuleViolation
+from .sale_service import SaleService
+
+MAX_BATCH_CONVERT = 200
+
+
+class InsufficientStock(BusinessRuleViolation):
+    """Stock check failed; `details` lists the short lines"""
+    def __init__(self, details):
+        super().__init__('بعض المنتجات غير متوفرة بالكمية المطلوبة', error_code='INSUFFICIENT_STOCK')
+        self.details = details
+
+
+def with_lines(queryset):
+    """
+    Quotations with customer and lines (and their products) loaded in 2 queries
+
+    Fills quotationitem_set's prefetch cache, which both QuotationSerializer
+    and QuotationService.get_lines() read.
+    """
+    return queryset.select_related('customer').prefetch_related(
+        Prefetch(
+            'quotationitem_set',
+            queryset=QuotationItem.objects.select_related('product').order_by('item_id')
+        )
+    )
+
+
+class QuotationService:
+    """Quotation creation and conversion to sales"""
+
+    @staticmethod
+    def next_quotation_number():
+        last_quotation = Quotation.objects.order_by('-quotation_id').only('quotation_number').first()
+        if last_quotation:
+            last_num = int(last_quotation.quotation_number.replace('Q', ''))
+            return f'Q{last_num + 1:05d}'
+        return 'Q00001'
+
+    @staticmethod
+    @transaction.atomic
+    def create_quotation(customer, items, total_amount, user=None):
+        """
+        Create a quotation and its lines
+
+        Products are fetched in one query and the lines inserted with one
+        bulk INSERT; unknown products are rejected before anything is written.
+        """
+        product_ids = []
+        for item in items:
+            try:
+                product_ids.append(int(item['id']))
+            except (KeyError, TypeError, ValueError):
+                raise BusinessRuleViolation(f'المنتج {item.get("id")} غير موجود', error_code='NOT_FOUND')
+
+        products = Product.objects.in_bulk(set(product_ids))
+        for product_id in product_ids:
+            if product_id not in products:
+                raise BusinessRuleViolation(f'المنتج {product_id} غير موجود', error_code='NOT_FOUND')
+
+        quotation = Quotation.objects.create(
+            quotation_number=QuotationService.next_quotation_number(),
+            customer=customer,
+            total_amount=total_amount,
+            status='draft',
+            created_by=user.id if user and user.is_authenticated else None
+        )
+        QuotationItem.objects.bulk_create([
+            QuotationItem(
+                quotation=quotation,
+                product=products[product_id],
+                quantity=item['quantity'],
+                unit_price=item['price'],
+                total=item['quantity'] * item['price']
+            )
+            for product_id, item in zip(product_ids, items)
+        ])
+        return quotation
+
+    @staticmethod
+    def get_lines(quotation):
+        """Prefetched lines when available (see with_lines), otherwise one joined query"""
+        if 'quotationitem_set' in getattr(quotation, '_prefetched_objects_cache', {}):
+            return list(quotation.quotationitem_set.all())
+        return list(
+            QuotationItem.objects.filter(quotation=quotation).select_related('product').order_by('item_id')
+        )
+
+    @staticmethod
+    def convert(quotation, payment_method='كاش', user=None, consumed=None):
+        """
+        Turn a quotation into a sale
+
+        Args:
+            consumed: {product_id: quantity} already sold earlier in the same
+                batch, so the stock check sees stock as it is now without
+                re-reading the products
+
+        Raises:
+            InsufficientStock, BusinessRuleViolation
+        """
+        if quotation.status == 'converted':
+            raise BusinessRuleViolation('عرض السعر محول بالفعل', error_code='ALREADY_CONVERTED')
+
+        consumed = consumed if consumed is not None else defaultdict(Decimal)
+        lines = QuotationService.get_lines(quotation)
+
+        insufficient_stock = []
+        for line in lines:
+            available = line.product.current_stock - consumed[line.product_id]
+            if available < line.quantity:
+                insufficient_stock.append({
+                    'product': line.product.product_name,
+                    'available': float(available),
+                    'required': float(line.quantity)
+                })
+        if insufficient_stock:
+            raise InsufficientStock(insufficient_stock)
+
+        cart_items = [
+            {'id': line.product_id, 'quantity': float(line.quantity), 'price': float(line.unit_price)}
+            for line in lines
+        ]
+
+        with transaction.atomic():
+            sale_transaction = SaleService.complete_sale(
+                cart_items=cart_items,
+                customer_id=quotation.customer_id,
+                payment_method=payment_method,
+                total_amount=float(quotation.total_amount),
+                invoice_id=quotation.quotation_number,
+                is_direct_sale=False,
+                user=user
+            )
+            quotation.status = 'converted'
+            quotation.save(update_fields=['status', 'updated_at'])
+
+        for line in lines:
+            consumed[line.product_id] += line.quantity
+        return sale_transaction
+
+    @staticmethod
+    def convert_many(quotation_ids, payment_method='كاش', user=None):
+        """
+        Convert several quotations, each in its own savepoint
+
+        A failing quotation is reported and skipped; the others still
+        convert. Quotations and lines are loaded up front in 3 queries.
+
+        Returns:
+            dict with per-quotation results (in request order) and counts
+        """
+        quotation_ids = list(dict.fromkeys(quotation_ids))
+        if len(quotation_ids) > MAX_BATCH_CONVERT:
+            raise BusinessRuleViolation(
+                f'الحد الأقصى {MAX_BATCH_CONVERT} عرض سعر في المرة الواحدة',
+                error_code='VALIDATION_ERROR'
+            )
+
+        quotations = {
+            quotation.quotation_id: quotation
+            for quotation in with_lines(Quotation.objects.filter(quotation_id__in=quotation_ids))
+        }
+        consumed = defaultdict(Decimal)
+        results = []
+
+        for quotation_id in quotation_ids:
+            quotation = quotations.get(quotation_id)
+            if quotation is None:
+                results.append({
+                    'id': quotation_id,
+                    'success': False,
+                    'error_code': 'NOT_FOUND',
+                    'message': 'عرض السعر غير موجود'
+                })
+                continue
+            try:
+                sale_transaction = QuotationService.convert(quotation, payment_method, user, consumed)
+            except BusinessRuleViolation as e:
+                result = {
+                    'id': quotation_id,
+                    'number': quotation.quotation_number,
+                    'success': False,
+                    'error_code': e.error_code,
+                    'message': e.message
+                }
+                if isinstance(e, InsufficientStock):
+                    result['details'] = e.details
+                results.append(result)
+                continue
+            results.append({
+                'id': quotation_id,
+                'number': quotation.quotation_number,
+                'success': True,
+                'transaction_id': sale_transaction.transaction_id
+            })
+
+        converted = sum(1 for result in results if result['success'])
+        return {'results': results, 'converted': converted, 'failed': len(results) - converted}
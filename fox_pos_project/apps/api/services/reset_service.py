@@ -0,0 +1,134 @@
+import time
+from django.db import connection, transaction
+from apps.customers.models import Customer
+from apps.products.models import Product, StockAlert
+from apps.quotations.models import Quotation, QuotationItem
+from apps.suppliers.models import Supplier
+from apps.treasury.models import Debt, DebtPayment
+from ..authentication import invalidate_all_users
+from ..catalog import bump_catalog_version
+from ..models import ActivityLog, AppSettings, PartyLedgerEntry, Shift, Transaction
+
+# Emptied in this order: rows before the rows they reference
+TRANSACTION_DATA = [
+    Transaction, QuotationItem, Quotation, ActivityLog,
+    PartyLedgerEntry, DebtPayment, Debt, Shift, StockAlert,
+]
+MASTER_DATA = [Product, Customer, Supplier]
+
+# Every table whose rows point (directly or through other tables) at the given one
+REFERENCING_TABLES_SQL = """
+WITH RECURSIVE refs(relid) AS (
+    SELECT %s::regclass::oid
+  UNION
+    SELECT c.conrelid FROM pg_constraint c JOIN refs r ON c.confrelid = r.relid
+    WHERE c.contype = 'f'
+)
+SELECT relid FROM refs
+"""
+
+# The partitions of a partitioned table (no rows for an ordinary one)
+PARTITION_TREE_SQL = 'SELECT relid::oid FROM pg_partition_tree(%s::regclass)'
+
+
+def _report_row(model, method, rows, started):
+    return {
+        'table': model._meta.db_table.replace('"."', '.'),
+        'method': method,
+        'rows': rows,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+class ResetService:
+    """Bulk removal of business data for the system reset actions"""
+
+    @staticmethod
+    def clear_tables(models):
+        """
+        Empty the tables of the given models, in order
+
+        On PostgreSQL a table is emptied with TRUNCATE ... RESTART IDENTITY
+        CASCADE when everything the CASCADE would reach is being cleared
+        anyway (the partitions of a cleared table included); a table that
+        something else still references (shifts is referenced by
+        app_settings) gets one set-based DELETE instead, so a reset never
+        empties a table it was not asked to. Other backends use the ORM
+        delete.
+
+        No signals are sent on PostgreSQL; callers refresh what depends on them.
+
+        Returns:
+            list of {'table', 'method', 'rows', 'seconds'} (rows is None
+            for TRUNCATE, which does not count)
+        """
+        report = []
+
+        if connection.vendor != 'postgresql':
+            for model in models:
+                started = time.perf_counter()
+                rows, _ = model.objects.all().delete()
+                report.append(_report_row(model, 'delete', rows, started))
+            return report
+
+        with connection.cursor() as cursor:
+            tables = {}
+            clearing = set()
+            for model in models:
+                quoted = connection.ops.quote_name(model._meta.db_table)
+                cursor.execute('SELECT %s::regclass::oid', [quoted])
+                tables[model] = (quoted, cursor.fetchone()[0])
+                clearing.add(tables[model][1])
+                cursor.execute(PARTITION_TREE_SQL, [quoted])
+                clearing.update(row[0] for row in cursor.fetchall())
+
+            for model in models:
+                quoted, oid = tables[model]
+                started = time.perf_counter()
+                cursor.execute(REFERENCING_TABLES_SQL, [quoted])
+                if {row[0] for row in cursor.fetchall()} <= clearing:
+                    cursor.execute(f'TRUNCATE TABLE {quoted} RESTART IDENTITY CASCADE')
+                    method, rows = 'truncate', None
+                else:
+                    cursor.execute(f'DELETE FROM {quoted}')
+                    method, rows = 'delete', cursor.rowcount
+                report.append(_report_row(model, method, rows, started))
+
+        return report
+
+    @staticmethod
+    @transaction.atomic
+    def clear_transactions():
+        """
+        Remove transactions, quotations, shifts, activity logs, ledger,
+        debts and stock alerts, and zero every customer / supplier balance
+
+        Returns:
+            The clear_tables() report
+        """
+        # The open shift is about to go; app_settings must stop pointing at it,
+        # and neither may the open shifts cached by the authentication
+        AppSettings.objects.exclude(current_shift=None).update(current_shift=None)
+        report = ResetService.clear_tables(TRANSACTION_DATA)
+        invalidate_all_users()
+
+        for model in (Customer, Supplier):
+            started = time.perf_counter()
+            rows = model.objects.exclude(current_balance=0).update(current_balance=0)
+            report.append(_report_row(model, 'update', rows, started))
+        return report
+
+    @staticmethod
+    @transaction.atomic
+    def clear_all_data():
+        """
+        clear_transactions() plus products, customers and suppliers
+
+        Returns:
+            The clear_tables() report
+        """
+        AppSettings.objects.exclude(current_shift=None).update(current_shift=None)
+        report = ResetService.clear_tables(TRANSACTION_DATA + MASTER_DATA)
+        invalidate_all_users()
+        bump_catalog_version()
+        return report
@@ -5,6 +5,10 @@ from apps.products.models import Product
 from apps.customers.models import Customer
 from ..models import Transaction, Shift
 from ..exceptions import BusinessRuleViolation
+from ..utils import log_activity
+from .ledger_service import LedgerService
+from .debt_service import DebtService
+from .stock_alert_service import StockAlertService
 import uuid
 
 
@@ -138,8 +142,10 @@ class SaleService:
             for item in cart_items:
                 product = Product.objects.get(product_id=item['id'])
                 qty = item.get('quantity', item.get('cartQuantity', 0))
+                previous_stock = product.current_stock
                 product.current_stock -= Decimal(str(qty))
                 product.save()
+                StockAlertService.record(product, previous_stock)
         
         # 10. Create expense for COGS (if direct sale)
         if is_direct_sale:
@@ -161,11 +167,19 @@ class SaleService:
         
         # 11. Update customer balance (if deferred)
         if payment_method == 'آجل' and customer:
-            customer.current_balance -= Decimal(str(total_amount))
-            customer.save()
+            LedgerService.post(
+                customer, -Decimal(str(total_amount)),
+                transaction_id=invoice_id, description=f'فاتورة بيع آجل {invoice_id}', user=user
+            )
+            DebtService.open_debt(customer, total_amount, invoice_id, due_date=sale_transaction.due_date)
         
         # 12. TODO: Increment invoice number in settings
-        # 13. TODO: Log activity
+        # 13. Log activity (buffered, written after commit)
+        log_activity(
+            user,
+            'عملية بيع',
+            f'فاتورة {invoice_id} - {payment_method} - {total_amount}'
+        )
         
         return sale_transaction
     
@@ -221,13 +235,23 @@ class SaleService:
         if not original_transaction.is_direct_sale:
             for item in original_transaction.items:
                 product = Product.objects.get(product_id=item['id'])
+                previous_stock = product.current_stock
                 product.current_stock += Decimal(str(item['quantity']))
                 product.save()
+                StockAlertService.record(product, previous_stock)
         
         # Adjust customer balance (if deferred)
         if original_transaction.payment_method == 'آجل' and original_transaction.related_customer:
-            customer = original_transaction.related_customer
-            customer.current_balance += Decimal(str(original_transaction.amount))
-            customer.save()
+            LedgerService.post(
+                original_transaction.related_customer, Decimal(str(original_transaction.amount)),
+                transaction_id=return_transaction.transaction_id,
+                description=f'مرتجع من {transaction_id}', user=user
+            )
+            # The credit settles the returned invoice first, then older debts
+            DebtService.allocate(
+                original_transaction.related_customer, original_transaction.amount,
+                payment_method='مرتجع', user=user, notes=return_transaction.transaction_id,
+                transaction_id=transaction_id
+            )
         
         return return_transaction
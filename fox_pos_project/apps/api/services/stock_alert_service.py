@@ -0,0 +1,57 @@
+from apps.products.models import StockAlert
+
+
+class StockAlertService:
+    """Low-stock transitions and the alert feed"""
+
+    @staticmethod
+    def record(product, previous_stock):
+        """
+        Record an alert when a stock change moved the product across its
+        minimum level
+
+        Call after product.current_stock changed, inside the same
+        transaction, so the alert is only kept if the change is.
+
+        Args:
+            product: Product with its new current_stock
+            previous_stock: current_stock before the change
+
+        Returns:
+            The StockAlert, or None when nothing crossed
+        """
+        was_low = previous_stock <= product.min_stock_level
+        if was_low == product.is_low_stock:
+            return None
+
+        return StockAlert.objects.create(
+            product=product,
+            alert_type='low_stock' if product.is_low_stock else 'restocked',
+            current_stock=product.current_stock,
+            min_stock_level=product.min_stock_level
+        )
+
+    @staticmethod
+    def feed(after=None, limit=100):
+        """
+        Alerts newer than a cursor, oldest first
+
+        Args:
+            after: alert_id of the last alert the client has; None for the
+                most recent `limit` alerts
+            limit: Maximum alerts returned
+
+        Returns:
+            (alerts, cursor) where cursor is the alert_id to send next time
+        """
+        alerts = StockAlert.objects.select_related('product').only(
+            'alert_id', 'product_id', 'alert_type', 'current_stock', 'min_stock_level', 'created_at',
+            'product__product_name'
+        )
+        if after is None:
+            alerts = list(alerts.order_by('-alert_id')[:limit])[::-1]
+        else:
+            alerts = list(alerts.filter(alert_id__gt=after).order_by('alert_id')[:limit])
+
+        cursor = alerts[-1].alert_id if alerts else (after or 0)
+        return alerts, cursor
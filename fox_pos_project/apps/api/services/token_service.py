@@ -0,0 +1,44 @@
+import time
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from ..tokens import blacklist_settings
+
+
+class TokenMaintenanceService:
+    """Housekeeping of the JWT outstanding / blacklisted token tables"""
+
+    @staticmethod
+    def prune_expired(batch_size=None, now=None):
+        """
+        Delete expired outstanding tokens and their blacklist rows
+
+        An expired token fails verification on its own, so neither row is
+        needed any more. Rows go in batches of batch_size (default
+        TOKEN_BLACKLIST['PRUNE_BATCH_SIZE']) oldest first, each batch in its
+        own short transaction, so logins and refreshes are never blocked
+        for long. The expires_at index (api 0008) keeps each batch lookup
+        cheap.
+
+        Returns:
+            {'outstanding': deleted, 'blacklisted': deleted, 'batches': n, 'seconds': elapsed}
+        """
+        batch_size = batch_size or blacklist_settings()['PRUNE_BATCH_SIZE']
+        now = now or timezone.now()
+        started = time.perf_counter()
+        result = {'outstanding': 0, 'blacklisted': 0, 'batches': 0}
+
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by('expires_at').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                result['blacklisted'] += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                result['outstanding'] += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            result['batches'] += 1
+
+        result['seconds'] = round(time.perf_counter() - started, 3)
+        return result
@@ -1,3 +1,1187 @@
-from django.test import TestCase
+import threading
+from datetime import datetime, timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+from zoneinfo import ZoneInfo
 
-# Tests will be added here
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models.sql import Query
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.exceptions import TokenError
+
+from apps.customers.models import Customer
+from apps.products.models import Product, StockAlert
+from apps.quotations.models import Quotation, QuotationItem
+from apps.sales.models import SalesInvoice, SalesInvoiceItem
+from apps.suppliers.models import Supplier
+from apps.treasury.models import Debt, DebtPayment
+from fox_pos.listing import KeysetListView
+from fox_pos.static_files import IMMUTABLE, REVALIDATE, accepts_gzip, cache_control_for
+
+from . import partitioning
+from .activity_log import ActivityLogWriter
+from .authentication import CachedJWTAuthentication, get_open_shift
+from .catalog import get_version, set_new_version
+from .exceptions import BusinessRuleViolation
+from .live import UNAVAILABLE_RETRY
+from .management.commands import generate_dataset
+from .models import ActivityLog, AppSettings, LiveEvent, PartyLedgerEntry, Shift, Transaction
+from .query_plans import Plan, capture_plans, check_plan, check_plans, format_report
+from .services.dashboard_service import DashboardService
+from .services.debt_service import DebtService
+from .services.import_service import ProductImportService
+from .services.quotation_service import MAX_BATCH_CONVERT, QuotationService
+from .services.reset_service import ResetService
+from .services.sale_service import SaleService
+from .services.stock_alert_service import StockAlertService
+from .tokens import RefreshToken, RevokedJTIs, TokenRefreshSerializer
+from .utils import log_activity, parse_flag
+
+
+def make_log(index):
+    return ActivityLog(
+        user_name='اختبار',
+        action='اختبار',
+        details=f'سجل {index}',
+        date=timezone.now()
+    )
+
+
+class ActivityLogWriterTests(TransactionTestCase):
+    """The buffered writer runs on its own connection, so commit for real"""
+
+    # flush matches tables by their bare names, so it never sees the
+    # fox_system"."x tables: available_apps lets it TRUNCATE ... CASCADE past
+    # the ones referencing auth_user, and tearDown clears activity_logs
+    available_apps = settings.INSTALLED_APPS
+
+    def tearDown(self):
+        ActivityLog.objects.all().delete()
+
+    def test_no_records_lost_on_clean_shutdown(self):
+        writer = ActivityLogWriter(batch_size=50, flush_interval=60)
+        for i in range(1000):
+            writer.enqueue(make_log(i))
+
+        writer.shutdown()
+
+        self.assertEqual(writer.pending(), 0)
+        self.assertEqual(ActivityLog.objects.count(), 1000)
+
+    def test_flushes_when_batch_is_full(self):
+        writer = ActivityLogWriter(batch_size=10, flush_interval=60)
+        for i in range(10):
+            writer.enqueue(make_log(i))
+
+        # The size threshold wakes the writer long before the interval
+        for _ in range(50):
+            if ActivityLog.objects.count() == 10:
+                break
+            writer._thread.join(0.1)
+
+        self.assertEqual(ActivityLog.objects.count(), 10)
+        writer.shutdown()
+
+    def test_queue_overflow_writes_inline(self):
+        writer = ActivityLogWriter(batch_size=100, flush_interval=60, max_queue_size=5)
+        with mock.patch.object(writer, '_ensure_started'):
+            for i in range(8):
+                writer.enqueue(make_log(i))
+
+        self.assertEqual(writer.pending(), 5)
+        self.assertEqual(ActivityLog.objects.count(), 3)
+        writer.flush()
+        self.assertEqual(ActivityLog.objects.count(), 8)
+
+
+class LogActivityTests(TestCase):
+
+    @override_settings(ACTIVITY_LOG={'MODE': 'sync'})
+    def test_sync_mode_inserts_immediately(self):
+        log_activity(None, 'عملية بيع', 'فاتورة')
+        log = ActivityLog.objects.get()
+        self.assertEqual(log.user_name, 'نظام')
+
+    @override_settings(ACTIVITY_LOG={'MODE': 'async'})
+    def test_async_mode_enqueues_after_commit(self):
+        writer = mock.Mock()
+        with mock.patch('apps.api.utils.get_activity_log_writer', return_value=writer):
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    log_activity(None, 'عملية بيع', 'فاتورة')
+                    writer.enqueue.assert_not_called()
+
+        writer.enqueue.assert_called_once()
+        self.assertEqual(ActivityLog.objects.count(), 0)
+
+
+class VersionCounterTests(SimpleTestCase):
+
+    def test_bump_keeps_the_counter_from_expiring(self):
+        with mock.patch('apps.api.catalog.cache') as cache:
+            version = set_new_version('test:version')
+        cache.set.assert_called_once_with('test:version', version, timeout=None)
+
+    def test_concurrent_bumps_never_collide(self):
+        # Two workers bumping from the same value must both be seen as a change
+        with mock.patch('apps.api.catalog.cache') as cache:
+            cache.get.return_value = 1
+            start = get_version('test:version')
+            versions = {set_new_version('test:version') for _ in range(1000)}
+        self.assertEqual(len(versions), 1000)
+        self.assertNotIn(start, versions)
+
+
+class RevokedJTIsTests(TransactionTestCase):
+    """Each blacklist commits on its own connection, as in separate workers"""
+
+    available_apps = settings.INSTALLED_APPS
+
+    def test_concurrent_blacklists_are_seen_by_every_process(self):
+        user = User.objects.create_user('cashier', password='secret')
+        refresh_tokens = [RefreshToken.for_user(user) for _ in range(2)]
+        # Two worker processes; only the first has built its filter yet
+        processes = [RevokedJTIs(), RevokedJTIs()]
+        self.assertFalse(processes[0].may_contain(refresh_tokens[0]['jti']))
+        barrier = threading.Barrier(len(processes))
+
+        def blacklist(process, refresh):
+            try:
+                barrier.wait()
+                with transaction.atomic():
+                    refresh.blacklist()
+                process.add(refresh['jti'])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=blacklist, args=pair) for pair in zip(processes, refresh_tokens)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Replaying either rotated token is refused by either process
+        for process in processes:
+            with mock.patch('apps.api.tokens.revoked_jtis', process):
+                for refresh in refresh_tokens:
+                    with self.assertRaises(TokenError):
+                        TokenRefreshSerializer(data={'refresh': str(refresh)}).is_valid()
+
+
+class EventsUnderWSGITests(SimpleTestCase):
+
+    def test_tills_are_told_to_stop_listening(self):
+        response = self.client.get('/api/events/?token=abc')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/event-stream'))
+        body = response.content.decode()
+        self.assertIn('event: unavailable\n', body)
+        self.assertIn(f'retry: {UNAVAILABLE_RETRY}\n', body)
+
+
+class StaticFilesTests(SimpleTestCase):
+
+    def test_only_hashed_bundle_files_are_immutable(self):
+        for name in ('assets/index-BdQq_4o_.js', 'assets/index-8b5b2c3a.css', 'admin/css/base.3f1c2d4e5a6b.css'):
+            self.assertEqual(cache_control_for(name), IMMUTABLE, name)
+        for name in ('assets/react-dropzone.js', 'app-settings.css', 'index.html', 'fox-logo.png'):
+            self.assertEqual(cache_control_for(name), REVALIDATE, name)
+
+    def test_gzip_refused_with_zero_quality(self):
+        self.assertTrue(accepts_gzip('gzip, deflate, br'))
+        self.assertTrue(accepts_gzip('br;q=1.0, *;q=0.5'))
+        self.assertFalse(accepts_gzip('gzip;q=0, br'))
+        self.assertFalse(accepts_gzip('*;q=0'))
+        self.assertFalse(accepts_gzip('identity'))
+
+
+def create_unmanaged_tables(*models):
+    """Unmanaged tables come with the database dump, not migrations: create them for tests"""
+    with connection.cursor() as cursor:
+        missing = []
+        for model in models:
+            cursor.execute('SELECT to_regclass(%s)', [model._meta.db_table.replace('"', '')])
+            if cursor.fetchone()[0] is None:
+                missing.append(model)
+    with connection.schema_editor() as editor:
+        for model in missing:
+            editor.create_model(model)
+
+
+class QuotationListQueryTests(TestCase):
+    """The quotation list costs a fixed number of queries, whatever the page holds"""
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables(Customer, Quotation, QuotationItem)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('quotations', password='x', is_staff=True)
+        customer = Customer.objects.create(customer_code='C-Q', customer_name='عميل عروض')
+        products = [
+            Product.objects.create(product_code=f'P-Q{i}', product_name=f'منتج {i}', selling_price=10)
+            for i in range(3)
+        ]
+        for i in range(20):
+            quotation = Quotation.objects.create(
+                quotation_number=f'Q{i:05d}', customer=customer, total_amount=60, status='draft'
+            )
+            QuotationItem.objects.bulk_create([
+                QuotationItem(quotation=quotation, product=product, quantity=2, unit_price=10, total=20)
+                for product in products
+            ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_with_items(self):
+        # Page count, quotations + customers, items + products
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/quotations/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 20)
+        first = response.data['results'][0]
+        self.assertEqual(first['customer_name'], 'عميل عروض')
+        self.assertEqual(len(first['items']), 3)
+        self.assertEqual(first['items'][0]['name'], 'منتج 0')
+
+    def test_summary_list(self):
+        # Page count, quotations + customers with item annotations
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/quotations/?summary=1')
+
+        self.assertEqual(response.status_code, 200)
+        first = response.data['results'][0]
+        self.assertNotIn('items', first)
+        self.assertEqual(first['itemCount'], 3)
+        self.assertEqual(float(first['itemsTotal']), 60)
+
+
+class ProductImportTests(TestCase):
+
+    def import_csv(self, text):
+        return ProductImportService.import_file(BytesIO(text.encode()), 'products.csv')
+
+    def test_blank_cells_leave_existing_products_unchanged(self):
+        Product.objects.create(
+            product_code='P1', product_name='كرنيشة', barcode='6221', current_stock=10,
+            min_stock_level=5, purchase_price=20, selling_price=30, category='ألومنيوم'
+        )
+        Product.objects.create(product_code='P2', product_name='زاوية', current_stock=8, min_stock_level=5)
+
+        report = self.import_csv(
+            'sku,name,barcode,quantity,costPrice,sellPrice,minStockAlert,category\n'
+            'P1,كرنيشة 2م,,,,35,,\n'
+            'P2,زاوية,,3,,,,\n'
+            'P3,مفصلة,,,,,,\n'
+        )
+
+        self.assertEqual((report['created'], report['updated'], report['failed']), (1, 2, 0))
+        first = Product.objects.get(product_code='P1')
+        self.assertEqual(first.product_name, 'كرنيشة 2م')
+        self.assertEqual(first.selling_price, 35)
+        self.assertEqual((first.barcode, first.category), ('6221', 'ألومنيوم'))
+        self.assertEqual((first.current_stock, first.min_stock_level, first.purchase_price), (10, 5, 20))
+        new = Product.objects.get(product_code='P3')
+        self.assertEqual((new.barcode, new.unit, new.current_stock), (None, 'قطعة', 0))
+        # P2 dropped below its minimum through the import
+        alert = StockAlert.objects.get()
+        self.assertEqual((alert.product.product_code, alert.alert_type), ('P2', 'low_stock'))
+
+
+class LabelsViewTests(TestCase):
+
+    def setUp(self):
+        self.product = Product.objects.create(product_code='P1', product_name='كرنيشة', selling_price=30)
+        self.labelled = Product.objects.create(product_code='P2', product_name='زاوية', barcode='6221')
+        self.client = APIClient()
+
+    def print_labels(self, user, **body):
+        self.client.force_authenticate(user)
+        ids = [self.product.pk, self.labelled.pk]
+        return self.client.post('/api/products/labels/', {'ids': ids, **body}, format='json')
+
+    def test_flags_parse_strings(self):
+        self.assertEqual([parse_flag(v) for v in ('false', '0', 'no', '', 'off')], [False] * 5)
+        self.assertEqual([parse_flag(v) for v in ('true', '1', 'Yes', 'on', True)], [True] * 5)
+        self.assertEqual((parse_flag(None), parse_flag(None, True)), (False, True))
+
+    def test_assign_false_string_prints_without_assigning(self):
+        admin = User.objects.create_user('admin', password='x', is_staff=True)
+        response = self.print_labels(admin, assign='false')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Barcodes-Assigned'], '0')
+        self.product.refresh_from_db()
+        self.assertIsNone(self.product.barcode)
+
+    def test_only_admins_assign_barcodes(self):
+        cashier = User.objects.create_user('cashier', password='x')
+        self.assertEqual(self.print_labels(cashier, assign=True).status_code, 403)
+        # Printing alone stays open and assigns nothing by default
+        response = self.print_labels(cashier)
+        self.assertEqual((response.status_code, response['X-Barcodes-Assigned']), (200, '0'))
+
+        admin = User.objects.create_user('admin', password='x', is_staff=True)
+        self.assertEqual(self.print_labels(admin)['X-Barcodes-Assigned'], '1')
+        self.product.refresh_from_db()
+        self.assertIsNotNone(self.product.barcode)
+
+
+class ExportRoutingTests(TestCase):
+
+    def test_streamed_export_reads_from_the_replica(self):
+        Product.objects.create(product_code='P1', product_name='كرنيشة')
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('reports', password='x', is_staff=True))
+        # The test database has no replica: serve the alias from the primary's
+        # connection and record the alias each query was compiled for
+        connections['replica'] = connections['default']
+        self.addCleanup(connections.__delitem__, 'replica')
+        aliases = []
+        get_compiler = Query.get_compiler
+
+        def record_alias(query, using=None, *args, **kwargs):
+            if query.model is Product:
+                aliases.append(using)
+            return get_compiler(query, using, *args, **kwargs)
+
+        with mock.patch('fox_pos.db_router.replica_configured', return_value=True), \
+                mock.patch('fox_pos.db_router.replica_health.is_healthy', return_value=True), \
+                mock.patch.object(Query, 'get_compiler', record_alias):
+            response = client.get('/api/reports/inventory/export/')
+            # Rows are read only now, after the middleware has reset the routing
+            content = b''.join(response.streaming_content).decode('utf-8-sig')
+
+        self.assertIn('كرنيشة', content)
+        self.assertEqual(aliases, ['replica'])
+
+
+class DashboardOverdueTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables(Customer, Debt)
+        super().setUpClass()
+
+    def test_overdue_list_holds_open_debts_only(self):
+        customer = Customer.objects.create(customer_code='C-D', customer_name='عميل آجل')
+        today = timezone.localdate()
+
+        def debt(days_overdue, remaining, status='pending', transaction_id=None):
+            return Debt.objects.create(
+                debt_type='receivable', entity_type='customer', entity_id=customer.customer_id,
+                transaction_id=transaction_id, original_amount=100, paid_amount=100 - remaining,
+                remaining_amount=remaining, due_date=today - timedelta(days=days_overdue), status=status
+            )
+
+        debt(10, 0, status='paid', transaction_id='INV-PAID')
+        debt(5, 40, status='partial', transaction_id='INV-5')
+        debt(20, 100, transaction_id='INV-20')
+        debt(-3, 100, transaction_id='INV-NOT-DUE')
+
+        overdue = DashboardService.get_kpis(overdue_limit=1)['overdue_invoices']
+        self.assertEqual(len(overdue), 1)
+        self.assertEqual(overdue[0]['id'], 'INV-20')
+        self.assertEqual(overdue[0]['relatedName'], 'عميل آجل')
+
+        overdue = DashboardService.get_kpis()['overdue_invoices']
+        self.assertEqual([(row['id'], row['amount']) for row in overdue], [('INV-20', 100), ('INV-5', 40)])
+
+
+class DebtAllocationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables(Customer, Debt, DebtPayment)
+        super().setUpClass()
+
+    def setUp(self):
+        self.customer = Customer.objects.create(customer_code='C-A', customer_name='عميل أقساط')
+        self.today = timezone.localdate()
+
+    def debt(self, transaction_id, amount, days_ago):
+        return DebtService.open_debt(
+            self.customer, amount, transaction_id=transaction_id, due_date=self.today - timedelta(days=days_ago)
+        )
+
+    def settled(self, result):
+        return [(row['transaction_id'], row['amount'], row['status']) for row in result['allocations']]
+
+    def test_oldest_due_debt_is_settled_first(self):
+        self.debt('INV-NEW', 100, days_ago=1)
+        self.debt('INV-OLD', 100, days_ago=30)
+        self.debt('INV-MID', 100, days_ago=10)
+
+        result = DebtService.allocate(self.customer, 150)
+
+        self.assertEqual(self.settled(result), [('INV-OLD', 100, 'paid'), ('INV-MID', 50, 'partial')])
+        self.assertEqual(result['unallocated'], 0)
+        self.assertEqual(Debt.objects.get(transaction_id='INV-NEW').remaining_amount, 100)
+
+    def test_named_invoice_is_settled_before_the_fifo_order(self):
+        self.debt('INV-OLD', 100, days_ago=30)
+        self.debt('INV-RET', 80, days_ago=1)
+
+        result = DebtService.allocate(self.customer, 100, transaction_id='INV-RET')
+
+        self.assertEqual(self.settled(result), [('INV-RET', 80, 'paid'), ('INV-OLD', 20, 'partial')])
+
+    def test_amount_beyond_the_open_debts_is_an_advance(self):
+        self.debt('INV-1', 60, days_ago=5)
+
+        result = DebtService.allocate(self.customer, 100)
+
+        self.assertEqual(self.settled(result), [('INV-1', 60, 'paid')])
+        self.assertEqual(result['unallocated'], 40)
+        self.assertEqual(DebtService.allocate(self.customer, 25)['unallocated'], 25)
+
+    def test_debt_with_nothing_left_is_closed_without_a_payment(self):
+        empty = self.debt('INV-EMPTY', 50, days_ago=40)
+        Debt.objects.filter(pk=empty.pk).update(remaining_amount=0)
+        self.debt('INV-1', 50, days_ago=5)
+
+        result = DebtService.allocate(self.customer, 30)
+
+        self.assertEqual(self.settled(result), [('INV-1', 30, 'partial')])
+        self.assertEqual(Debt.objects.get(pk=empty.pk).status, 'paid')
+        self.assertFalse(DebtPayment.objects.filter(payment_amount__lte=0).exists())
+        self.assertEqual(DebtPayment.objects.count(), 1)
+
+
+class POSInvoiceTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables(Customer, SalesInvoice, SalesInvoiceItem, Debt, DebtPayment)
+        super().setUpClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user('cashier', password='x')
+        self.client.force_login(self.user)
+        self.customer = Customer.objects.create(customer_code='C-POS', customer_name='عميل نقطة بيع')
+        self.product = Product.objects.create(
+            product_code='P-POS', product_name='منتج', selling_price=50, current_stock=10
+        )
+
+    def test_unpaid_remainder_is_owed_and_opens_a_debt(self):
+        response = self.client.post('/sales/api/invoice/create/', {
+            'customer_id': self.customer.pk,
+            'items': [{'product_id': self.product.pk, 'quantity': 2, 'price': 50}],
+            'payment_method': 'آجل',
+            'paid_amount': 30,
+        }, content_type='application/json')
+        invoice_number = response.json()['invoice_number']
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.current_balance, -70)
+        entry = PartyLedgerEntry.objects.get(party_type='customer', party_id=self.customer.pk)
+        self.assertEqual((entry.amount, entry.transaction_id), (-70, invoice_number))
+        debt = Debt.objects.get(entity_type='customer', entity_id=self.customer.pk)
+        self.assertEqual((debt.transaction_id, debt.remaining_amount, debt.status), (invoice_number, 70, 'pending'))
+
+
+class KeysetListViewTests(TestCase):
+    """Paging through debts by due_date: ties on the key and debts without one"""
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables(Debt)
+        super().setUpClass()
+
+    def page(self, query=''):
+        view = KeysetListView(model=Debt, key_field='due_date', page_size=3)
+        view.setup(RequestFactory().get(f'/debts/{query}'))
+        context = view.get_context_data()
+        return [debt.pk for debt in context['object_list']], context['pagination']
+
+    def test_pages_cover_every_row_once_in_both_directions(self):
+        today = timezone.localdate()
+        for due_date in [today, today, today, today - timedelta(days=1), None, today, None, None]:
+            Debt.objects.create(
+                debt_type='receivable', entity_type='customer', entity_id=1,
+                original_amount=10, remaining_amount=10, due_date=due_date
+            )
+        expected = (
+            list(Debt.objects.filter(due_date__isnull=False).order_by('-due_date', '-debt_id')
+                 .values_list('debt_id', flat=True))
+            + list(Debt.objects.filter(due_date__isnull=True).order_by('-debt_id').values_list('debt_id', flat=True))
+        )
+
+        pages = []
+        rows, pagination = self.page()
+        self.assertIsNone(pagination['previous_url'])
+        while True:
+            pages.append(rows)
+            if not pagination['next_url']:
+                break
+            rows, pagination = self.page(pagination['next_url'])
+        self.assertEqual([pk for page in pages for pk in page], expected)
+        self.assertEqual(len(pages), 3)
+
+        backwards = [rows]
+        while pagination['previous_url']:
+            rows, pagination = self.page(pagination['previous_url'])
+            backwards.append(rows)
+        self.assertEqual(backwards[::-1], pages)
+
+
+class PDFNotFoundTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables(Customer, Quotation, QuotationItem)
+        super().setUpClass()
+
+    def test_missing_documents_are_404(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('printer', password='x', is_staff=True))
+
+        for url in ('/api/transactions/INV-MISSING/pdf/', '/api/quotations/999999/pdf/'):
+            response = client.get(url)
+            self.assertEqual(response.status_code, 404, url)
+            self.assertEqual(response.json()['error_code'], 'NOT_FOUND')
+
+
+class ReportExportTests(TestCase):
+
+    def test_file_name_is_built_from_the_parsed_dates(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('exports', password='x', is_staff=True))
+
+        response = client.get('/api/reports/sales/export/', {
+            'from_date': '2025-06-01"\r\nX-Injected: 1', 'to_date': '2025-06-30T23:59',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="sales_2025-06-01_2025-06-30.csv"')
+        self.assertNotIn('X-Injected', response)
+
+
+def table_name(model):
+    return model._meta.db_table.split('"."')[-1]
+
+
+# Tables that grow with every sale; reading one with a Seq Scan is a regression
+LARGE_TABLES = {table_name(model) for model in (Transaction, PartyLedgerEntry, Debt, ActivityLog, LiveEvent)}
+TRANSACTION_DATES = {table_name(Transaction): 'date'}
+
+
+class QuotationConvertManyTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables(Customer, Quotation, QuotationItem)
+        super().setUpClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user('batch', password='x', is_staff=True)
+        self.customer = Customer.objects.create(customer_code='C-B', customer_name='عميل')
+        self.product = Product.objects.create(
+            product_code='P1', product_name='كرنيشة', current_stock=5, min_stock_level=0, selling_price=10
+        )
+
+    def quotation(self, quantity):
+        return QuotationService.create_quotation(
+            self.customer, [{'id': self.product.pk, 'quantity': quantity, 'price': 10}], quantity * 10
+        )
+
+    def test_stock_sold_earlier_in_the_batch_counts(self):
+        first, second, third = self.quotation(3), self.quotation(3), self.quotation(2)
+
+        result = QuotationService.convert_many(
+            [first.pk, second.pk, first.pk, third.pk, 999999], user=self.user
+        )
+
+        self.assertEqual((result['converted'], result['failed']), (2, 2))
+        self.assertEqual(
+            [(r['id'], r['success'], r.get('error_code')) for r in result['results']],
+            [(first.pk, True, None), (second.pk, False, 'INSUFFICIENT_STOCK'),
+             (third.pk, True, None), (999999, False, 'NOT_FOUND')]
+        )
+        # Reported from the batch's own accounting, before the sale is attempted
+        self.assertEqual(result['results'][1]['details'], [{'product': 'كرنيشة', 'available': 2.0, 'required': 3.0}])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.current_stock, 0)
+
+    def test_a_failed_quotation_rolls_back_only_its_own_sale(self):
+        first, second, third = self.quotation(1), self.quotation(1), self.quotation(1)
+        complete_sale = SaleService.complete_sale
+
+        def fail_second(**kwargs):
+            sale = complete_sale(**kwargs)
+            if kwargs['invoice_id'] == second.quotation_number:
+                raise BusinessRuleViolation('فشل', error_code='TEST_FAILURE')
+            return sale
+
+        with mock.patch.object(SaleService, 'complete_sale', side_effect=fail_second):
+            result = QuotationService.convert_many([first.pk, second.pk, third.pk], user=self.user)
+
+        self.assertEqual([r['success'] for r in result['results']], [True, False, True])
+        self.assertEqual(
+            set(Transaction.objects.values_list('transaction_id', flat=True)),
+            {first.quotation_number, third.quotation_number}
+        )
+        second.refresh_from_db()
+        self.assertEqual(second.status, 'draft')
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.current_stock, 3)
+
+    def test_batch_size_is_capped(self):
+        with self.assertRaises(BusinessRuleViolation) as raised:
+            QuotationService.convert_many(range(MAX_BATCH_CONVERT + 1))
+        self.assertEqual(raised.exception.error_code, 'VALIDATION_ERROR')
+        # Repeated ids count once
+        self.assertEqual(QuotationService.convert_many([1] * (MAX_BATCH_CONVERT + 1))['failed'], 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'TRUNCATE selection is PostgreSQL only')
+class ResetServiceTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables(Customer, Supplier, Quotation, QuotationItem, Debt, DebtPayment)
+        super().setUpClass()
+
+    def setUp(self):
+        user = User.objects.create_user('reset', password='x')
+        self.shift = Shift.objects.create(user=user, start_cash=0)
+        self.settings = AppSettings.get_settings()
+        self.settings.current_shift = self.shift
+        self.settings.save()
+        Transaction.objects.create(
+            transaction_id='INV-1', type='بيع', amount=10, payment_method='كاش', shift=self.shift
+        )
+        # A reset runs in its own request: no deferred foreign key checks are pending
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+    def methods(self, report):
+        return {row['table']: (row['method'], row['rows']) for row in report}
+
+    def test_referenced_table_is_deleted_not_truncated(self):
+        # transactions and app_settings point at shifts; only transactions is being cleared
+        AppSettings.objects.update(current_shift=None)
+        methods = self.methods(ResetService.clear_tables([Transaction, Shift]))
+        self.assertEqual(methods['fox_system.transactions'], ('truncate', None))
+        self.assertEqual(methods['fox_system.shifts'], ('delete', 1))
+        self.assertTrue(AppSettings.objects.exists())
+
+        Shift.objects.create(user=self.shift.user, start_cash=0)
+        methods = self.methods(ResetService.clear_tables([AppSettings, Transaction, Shift]))
+        self.assertEqual(methods['fox_system.shifts'], ('truncate', None))
+
+    def test_clear_transactions(self):
+        customer = Customer.objects.create(customer_code='C-R', customer_name='عميل', current_balance=-50)
+
+        methods = self.methods(ResetService.clear_transactions())
+
+        self.assertEqual(methods['fox_system.transactions'], ('truncate', None))
+        self.assertEqual(methods['fox_system.shifts'], ('delete', 1))
+        self.assertEqual(methods['fox_system.customers'], ('update', 1))
+        self.assertFalse(Transaction.objects.exists() or Shift.objects.exists())
+        self.settings.refresh_from_db()
+        self.assertIsNone(self.settings.current_shift)
+        customer.refresh_from_db()
+        self.assertEqual(customer.current_balance, 0)
+        # The id lookup of the partitioned table is emptied with it
+        Transaction.objects.create(transaction_id='INV-1', type='بيع', amount=10, payment_method='كاش')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Parallel generation needs PostgreSQL')
+class GenerateDatasetTests(TransactionTestCase):
+    """Worker processes commit on their own connections"""
+
+    available_apps = settings.INSTALLED_APPS
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables(Customer, Supplier, Debt, DebtPayment)
+        super().setUpClass()
+
+    def tearDown(self):
+        ResetService.clear_all_data()
+
+    def generate(self, workers):
+        call_command(
+            'generate_dataset', products=30, customers=10, suppliers=3, days=6, sales_per_day=15,
+            seed=3, end_date='2025-03-02', workers=workers, reset=True, stdout=StringIO()
+        )
+        # Parties by code: their ids depend on what the reset left in the sequences
+        codes = {
+            **{('customer', pk): code for pk, code in Customer.objects.values_list('pk', 'customer_code')},
+            **{('supplier', pk): code for pk, code in Supplier.objects.values_list('pk', 'supplier_code')},
+        }
+        return {
+            'transactions': list(Transaction.objects.order_by('transaction_id').values_list(
+                'transaction_id', 'type', 'date', 'amount', 'payment_method', 'items',
+                'related_customer__customer_code', 'related_supplier__supplier_code', 'shift__start_time', 'due_date'
+            )),
+            'ledger': [
+                (codes[party_type, party_id], *rest)
+                for party_type, party_id, *rest in PartyLedgerEntry.objects.order_by('entry_id').values_list(
+                    'party_type', 'party_id', 'date', 'amount', 'balance', 'transaction_id'
+                )
+            ],
+            'debts': [
+                (transaction_id, codes[entity_type, entity_id], *rest)
+                for transaction_id, entity_type, entity_id, *rest in Debt.objects.order_by('transaction_id').values_list(
+                    'transaction_id', 'entity_type', 'entity_id', 'remaining_amount', 'due_date'
+                )
+            ],
+            'payments': list(DebtPayment.objects.order_by('debt__transaction_id').values_list(
+                'debt__transaction_id', 'payment_amount', 'payment_date', 'created_at'
+            )),
+            'shifts': list(Shift.objects.order_by('start_time').values_list(
+                'start_time', 'total_sales', 'sales_by_method', 'end_cash'
+            )),
+            'balances': list(Customer.objects.order_by('customer_code').values_list('customer_code', 'current_balance')),
+        }
+
+    def test_same_rows_whatever_the_worker_count(self):
+        User.objects.create_superuser('owner', password='x')
+        # Two days per worker task: three tasks over six days
+        with mock.patch.object(generate_dataset, 'CHUNK_SALES', 30):
+            single = self.generate(workers=1)
+            parallel = self.generate(workers=3)
+
+        self.assertGreater(len(single['transactions']), 50)
+        self.assertTrue(single['ledger'] and single['debts'])
+        for name in single:
+            self.assertEqual(parallel[name], single[name], name)
+
+    def test_settlements_agree_with_debts_shifts_and_balances(self):
+        User.objects.create_superuser('owner', password='x')
+        call_command(
+            'generate_dataset', products=30, customers=10, suppliers=3, days=40, sales_per_day=10,
+            seed=5, end_date='2025-03-02', workers=1, stdout=StringIO()
+        )
+
+        settlements = {
+            t.transaction_id: t for t in Transaction.objects.filter(type='تسوية دين').select_related('shift')
+        }
+        payments = {p.debt.transaction_id: p for p in DebtPayment.objects.select_related('debt')}
+        self.assertTrue(settlements)
+        self.assertEqual(set(settlements), {f'SET-{invoice}' for invoice in payments})
+        for invoice, payment in payments.items():
+            settlement = settlements[f'SET-{invoice}']
+            self.assertEqual((payment.debt.status, payment.debt.remaining_amount), ('paid', 0))
+            self.assertEqual(payment.payment_amount, settlement.amount)
+            self.assertEqual(payment.payment_date, timezone.localtime(settlement.date).date())
+            self.assertEqual(settlement.shift.start_time.date(), payment.payment_date)
+
+        # Each drawer holds the day's paid sales and the debts collected that day
+        for shift in Shift.objects.all():
+            received = sum(
+                t.amount for t in shift.transactions.all()
+                if (t.type == 'بيع' and t.payment_method != 'آجل') or (t.type == 'تسوية دين' and t.related_customer_id)
+            )
+            self.assertEqual(shift.end_cash - shift.start_cash, received)
+
+        open_debts = {}
+        for debt in Debt.objects.exclude(status='paid'):
+            open_debts[debt.entity_type, debt.entity_id] = open_debts.get((debt.entity_type, debt.entity_id), 0) + debt.remaining_amount
+        for customer in Customer.objects.all():
+            self.assertEqual(-customer.current_balance, open_debts.get(('customer', customer.pk), 0))
+        for supplier in Supplier.objects.all():
+            self.assertEqual(supplier.current_balance, open_debts.get(('supplier', supplier.pk), 0))
+
+
+class AuthCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables(Customer, Supplier, Quotation, QuotationItem, Debt, DebtPayment)
+        super().setUpClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user('cached', password='old-password')
+        self.authentication = CachedJWTAuthentication()
+
+    def authenticate(self, token):
+        request = RequestFactory().get('/api/products/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.authentication.authenticate(request)[0]
+
+    def test_deactivation_is_seen_on_the_next_request(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.assertEqual(self.authenticate(token).pk, self.user.pk)
+
+        # A change that sends no signal is not seen: the user is cached
+        User.objects.filter(pk=self.user.pk).update(first_name='x')
+        self.assertEqual(self.authenticate(token).first_name, '')
+
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_password_change_revokes_cached_tokens(self):
+        with mock.patch.object(jwt_settings, 'CHECK_REVOKE_TOKEN', True):
+            token = RefreshToken.for_user(self.user).access_token
+            self.authenticate(token)
+
+            self.user.set_password('new-password')
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.save()
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate(token)
+
+            self.assertTrue(self.authenticate(RefreshToken.for_user(self.user).access_token).check_password('new-password'))
+
+    def test_open_shift_follows_shift_changes(self):
+        self.assertIsNone(get_open_shift(self.user))
+        with self.captureOnCommitCallbacks(execute=True):
+            shift = Shift.objects.create(user=self.user, start_cash=0)
+        self.assertEqual(get_open_shift(self.user).pk, shift.pk)
+
+        shift.status = 'closed'
+        with self.captureOnCommitCallbacks(execute=True):
+            shift.save()
+        self.assertIsNone(get_open_shift(self.user))
+
+    def test_reset_drops_cached_open_shifts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Shift.objects.create(user=self.user, start_cash=0)
+        self.assertIsNotNone(get_open_shift(self.user))
+
+        # The reset deletes shifts with SQL: no Shift signals
+        with self.captureOnCommitCallbacks(execute=True):
+            ResetService.clear_transactions()
+        self.assertIsNone(get_open_shift(self.user))
+
+
+class StockAlertTests(TestCase):
+
+    def setUp(self):
+        self.product = Product.objects.create(
+            product_code='P1', product_name='كرنيشة', current_stock=10, min_stock_level=5
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('stock', password='x', is_staff=True))
+
+    def adjust(self, quantity_diff):
+        response = self.client.post(
+            f'/api/products/{self.product.pk}/adjust_stock/', {'quantity_diff': quantity_diff}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def feed(self, after=None):
+        query = '' if after is None else f'?after={after}'
+        return self.client.get(f'/api/products/stock_alerts/{query}').data
+
+    def test_alerts_only_on_crossing_the_minimum(self):
+        for quantity_diff in (-4, -1, -1, 4, 1, -2):  # 6, 5 low, 4, 8 restocked, 9, 7
+            self.adjust(quantity_diff)
+        self.assertEqual(
+            list(StockAlert.objects.values_list('alert_type', 'current_stock')),
+            [('low_stock', 5), ('restocked', 8)]
+        )
+
+        self.product.current_stock = 5
+        self.assertIsNone(StockAlertService.record(self.product, previous_stock=5))
+
+    def test_feed_returns_alerts_after_the_cursor(self):
+        self.assertEqual(self.feed(), {'alerts': [], 'cursor': 0})
+        self.adjust(-6)
+        first = self.feed()
+        self.assertEqual([alert['type'] for alert in first['alerts']], ['low_stock'])
+        self.assertEqual(self.feed(first['cursor']), {'alerts': [], 'cursor': first['cursor']})
+
+        self.adjust(10)
+        self.adjust(-10)
+        since = self.feed(first['cursor'])
+        self.assertEqual([alert['type'] for alert in since['alerts']], ['restocked', 'low_stock'])
+        self.assertGreater(since['cursor'], first['cursor'])
+        # Without a cursor: the latest alerts, oldest first
+        self.assertEqual([alert['type'] for alert in self.feed()['alerts']], ['low_stock', 'restocked', 'low_stock'])
+
+        response = self.client.get('/api/products/stock_alerts/?after=x')
+        self.assertEqual(response.data['error_code'], 'VALIDATION_ERROR')
+
+
+class PlanCheckTests(SimpleTestCase):
+
+    def plan(self, *scans, cost=100.0):
+        return Plan('SELECT 1', {
+            'Node Type': 'Append', 'Startup Cost': 0.0, 'Total Cost': cost, 'Plan Rows': 10,
+            'Plans': [
+                {'Startup Cost': 0.0, 'Total Cost': cost, 'Plan Rows': 5, **scan}
+                for scan in scans
+            ]
+        })
+
+    def test_seq_scan_on_a_partition_of_a_large_table(self):
+        plan = self.plan(
+            {'Node Type': 'Seq Scan', 'Relation Name': 'transactions_p2025_06'},
+            {'Node Type': 'Seq Scan', 'Relation Name': 'shifts'},
+            {'Node Type': 'Seq Scan', 'Relation Name': 'transactions_p2027_01', 'Total Cost': 1.12},
+        )
+        problems = check_plan(plan, large_tables={'transactions'})
+        self.assertEqual(list(problems), [id(plan.tree['Plans'][0])])
+
+    def test_date_range_must_be_an_index_condition(self):
+        date_range = "((date >= '2025-06-15 00:00:00+03'::timestamp with time zone))"
+        filtered = {'Node Type': 'Index Scan', 'Relation Name': 'transactions_p2025_06',
+                    'Index Name': 'transactions_p2025_06_pkey', 'Filter': date_range}
+        indexed = {'Node Type': 'Bitmap Heap Scan', 'Relation Name': 'transactions_p2025_05',
+                   'Recheck Cond': date_range, 'Filter': date_range}
+        due_date = {'Node Type': 'Index Scan', 'Relation Name': 'transactions_default',
+                    'Filter': "(due_date < '2025-06-15'::date)"}
+        plan = self.plan(filtered, indexed, due_date)
+
+        problems = check_plan(plan, date_columns=TRANSACTION_DATES)
+        self.assertEqual(list(problems), [id(plan.tree['Plans'][0])])
+
+    def test_report_marks_the_offending_nodes(self):
+        plan = self.plan({'Node Type': 'Seq Scan', 'Relation Name': 'transactions_p2025_06'}, cost=5000.0)
+        report = format_report(check_plans([plan], large_tables={'transactions'}, max_cost=1000))
+
+        self.assertEqual(report.splitlines(), [
+            'SELECT 1',
+            '- Append  (cost=0.00..5000.00 rows=10)',
+            '+   expected estimated cost at most 1000',
+            '-   Seq Scan on transactions_p2025_06  (cost=0.00..5000.00 rows=5)',
+            '+     expected an index scan: transactions is a large table',
+        ])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Partitioning needs PostgreSQL')
+class PartitioningTests(TestCase):
+    """Monthly partitions (migration 0006, apps.api.partitioning, manage_partitions)"""
+
+    def local(self, *args):
+        return datetime(*args, tzinfo=ZoneInfo(settings.TIME_ZONE))
+
+    def partition_of(self, table, column, value):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT tableoid::regclass::text FROM {partitioning.qualified(table)} WHERE {column} = %s',
+                [value]
+            )
+            row = cursor.fetchone()
+        return row[0].split('.')[-1] if row else None
+
+    def add_transaction(self, transaction_id, date=None):
+        created = Transaction.objects.create(
+            transaction_id=transaction_id, type='بيع', amount=10, payment_method='كاش'
+        )
+        if date:
+            Transaction.objects.filter(pk=transaction_id).update(date=date)
+        return created
+
+    def test_migration_partitions_both_tables(self):
+        today = timezone.localdate()
+        for table in partitioning.PARTITIONED_TABLES:
+            self.assertTrue(partitioning.is_partitioned(table))
+            self.assertIn((today.year, today.month), [(y, m) for y, m, _ in partitioning.list_partitions(table)])
+
+        self.add_transaction('INV-1')
+        self.assertEqual(
+            self.partition_of('transactions', 'transaction_id', 'INV-1'),
+            partitioning.partition_name('transactions', today.year, today.month)
+        )
+
+    def test_transaction_indexes(self):
+        # The (fk, date) indexes cover the FKs: no single-column FK indexes, on any partition
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = %s AND tablename LIKE %s',
+                [partitioning.SCHEMA, 'transactions%']
+            )
+            indexes = dict(cursor.fetchall())
+
+        self.assertIn('transactions_customer_date_idx', indexes)
+        self.assertFalse([name for name in indexes if 'deferred_due' in name])
+        for column in ('related_customer_id', 'related_supplier_id', 'shift_id'):
+            self.assertFalse([name for name, sql in indexes.items() if sql.endswith(f'({column})')], column)
+
+    def test_transaction_id_is_unique_across_months(self):
+        self.add_transaction('INV-1', date=self.local(2021, 3, 5, 12))
+        self.assertEqual(self.partition_of('transactions', 'transaction_id', 'INV-1'), 'transactions_default')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.add_transaction('INV-1')
+
+        Transaction.objects.filter(pk='INV-1').delete()
+        self.add_transaction('INV-1')
+
+    def test_new_partition_takes_default_rows_and_keeps_ids(self):
+        self.add_transaction('INV-1', date=self.local(2031, 5, 10, 12))
+        self.assertEqual(partitioning.create_month_partition('transactions', 2031, 5), 'transactions_p2031_05')
+        self.assertIsNone(partitioning.create_month_partition('transactions', 2031, 5))
+        self.assertEqual(self.partition_of('transactions', 'transaction_id', 'INV-1'), 'transactions_p2031_05')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.add_transaction('INV-1')
+
+    def test_detached_partitions_are_archived_or_dropped(self):
+        self.add_transaction('INV-1', date=self.local(2020, 1, 15))
+        self.add_transaction('INV-2', date=self.local(2020, 2, 15))
+        partitioning.create_month_partition('transactions', 2020, 1)
+        partitioning.create_month_partition('transactions', 2020, 2)
+
+        self.assertEqual(
+            partitioning.detach_partitions_before('transactions', 2020, 2, archive_schema='fox_archive_test'),
+            ['transactions_p2020_01']
+        )
+        self.assertEqual(self.partition_of('transactions', 'transaction_id', 'INV-1'), None)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT transaction_id FROM fox_archive_test.transactions_p2020_01')
+            self.assertEqual(cursor.fetchall(), [('INV-1',)])
+        # An archived id stays taken
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.add_transaction('INV-1')
+
+        self.assertEqual(
+            partitioning.detach_partitions_before('transactions', 2020, 3, drop=True), ['transactions_p2020_02']
+        )
+        self.assertEqual(Transaction.objects.filter(pk='INV-2').count(), 0)
+        self.add_transaction('INV-2')
+
+    def test_convert_table_and_insert_across_a_month_boundary(self):
+        table = partitioning.qualified('partition_test')
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TABLE {table} (
+                    code varchar(20) PRIMARY KEY,
+                    date timestamptz NOT NULL,
+                    user_id integer REFERENCES auth_user (id),
+                    amount numeric(12, 2) DEFAULT 0
+                )
+            """)
+            cursor.execute(f'CREATE INDEX partition_test_date_idx ON {table} (date)')
+            cursor.execute(
+                f'INSERT INTO {table} (code, date) VALUES (%s, %s), (%s, %s)',
+                # 1 February 01:00 in Cairo is still 31 January in UTC
+                ['A', self.local(2025, 1, 15), 'B', self.local(2025, 2, 1, 1)]
+            )
+
+        spec = {'key': 'date', 'primary_key': ['code', 'date'], 'serial': None, 'unique': 'code'}
+        with mock.patch.dict(partitioning.PARTITIONED_TABLES, {'partition_test': spec}):
+            self.assertTrue(partitioning.convert_table('partition_test', months_ahead=0))
+            self.assertFalse(partitioning.convert_table('partition_test'))
+
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {table} (code, date) VALUES (%s, %s), (%s, %s)',
+                    ['C', self.local(2025, 1, 31, 23, 59), 'D', self.local(2025, 2, 1)]
+                )
+                with self.assertRaises(IntegrityError), transaction.atomic():
+                    cursor.execute(f'INSERT INTO {table} (code, date) VALUES (%s, %s)', ['A', self.local(2025, 2, 2)])
+
+                cursor.execute(
+                    'SELECT indexname FROM pg_indexes WHERE schemaname = %s AND tablename = %s',
+                    [partitioning.SCHEMA, 'partition_test_p2025_02']
+                )
+                indexes = {row[0] for row in cursor.fetchall()}
+                cursor.execute(
+                    "SELECT count(*) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+                    [f'{partitioning.SCHEMA}.partition_test']
+                )
+                foreign_keys = cursor.fetchone()[0]
+
+        self.assertEqual(
+            {code: self.partition_of('partition_test', 'code', code) for code in 'ABCD'},
+            {'A': 'partition_test_p2025_01', 'B': 'partition_test_p2025_02',
+             'C': 'partition_test_p2025_01', 'D': 'partition_test_p2025_02'}
+        )
+        self.assertTrue(any('date' in name for name in indexes), indexes)
+        self.assertEqual(foreign_keys, 1)
+
+    def test_manage_partitions_command(self):
+        out = StringIO()
+        call_command('manage_partitions', '--table', 'transactions', '--ahead', '5', stdout=out)
+        today = timezone.localdate()
+        name = partitioning.partition_name('transactions', *partitioning.add_months(today.year, today.month, 5))
+        self.assertIn(f'created {name}', out.getvalue())
+        self.assertIn(name, [existing for _, _, existing in partitioning.list_partitions('transactions')])
+
+        with self.assertRaises(CommandError):
+            call_command('manage_partitions', '--detach-before', '2020-13', stdout=StringIO())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN plans need PostgreSQL')
+class QueryPlanTests(TestCase):
+    """
+    Hot endpoints keep their index access paths on a seeded database
+
+    Cost ceilings are estimated cost units for ~90 days of 300 sales a day,
+    well below what scanning all of transactions costs.
+    """
+    DAY = '2025-06-15'
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables(Customer, Supplier, Debt)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('plans', password='x', is_staff=True, is_superuser=True)
+        call_command(
+            'generate_dataset', products=2000, customers=1000, suppliers=50, days=90, sales_per_day=300,
+            seed=7, end_date='2025-06-30', workers=1, stdout=StringIO()
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertPlans(self, send, max_cost, date_range=False):
+        with capture_plans() as plans:
+            response = send()
+
+        self.assertLess(response.status_code, 300, getattr(response, 'data', None))
+        self.assertTrue(len(plans))
+        results = check_plans(
+            plans, LARGE_TABLES, TRANSACTION_DATES if date_range else None, max_cost
+        )
+        if results:
+            self.fail('Query plan regression:\n\n' + format_report(results))
+
+    def test_create_sale(self):
+        products = Product.objects.filter(current_stock__gte=5).order_by('product_id')[:2]
+        customer = Customer.objects.order_by('customer_id').first()
+        items = [{'id': p.product_id, 'quantity': 1, 'price': float(p.selling_price)} for p in products]
+
+        self.assertPlans(lambda: self.client.post('/api/transactions/create_sale/', {
+            'items': items,
+            'customer_id': customer.customer_id,
+            'payment_method': 'كاش',
+            'total_amount': sum(item['price'] for item in items),
+        }, format='json'), max_cost=100)
+
+    def test_transaction_list_for_a_shift(self):
+        shift = Shift.objects.order_by('-shift_id').first()
+        self.assertPlans(lambda: self.client.get(f'/api/transactions/?shift={shift.shift_id}'), max_cost=1000)
+
+    def test_transaction_list_for_a_day(self):
+        self.assertPlans(
+            lambda: self.client.get(f'/api/transactions/?from_date={self.DAY}&to_date={self.DAY}'),
+            max_cost=1000, date_range=True
+        )
+
+    def test_product_search(self):
+        # A substring search reads the whole catalog; only the cost is bounded
+        self.assertPlans(lambda: self.client.get('/api/products/?search=كرنيشة'), max_cost=1000)
+
+    def test_sales_report_for_a_day(self):
+        self.assertPlans(
+            lambda: self.client.get(f'/api/reports/sales/?from_date={self.DAY}&to_date={self.DAY}'),
+            max_cost=1000, date_range=True
+        )
+
+    def test_inventory_report(self):
+        self.assertPlans(lambda: self.client.get('/api/reports/inventory/'), max_cost=1000)
@@ -0,0 +1,144 @@
+"""
+Refresh tokens with an in-memory blacklist pre-check
+
+Every refresh (ROTATE_REFRESH_TOKENS + BLACKLIST_AFTER_ROTATION) checks
+the presented token against token_blacklist_blacklistedtoken. RefreshToken
+here answers that check from a per-process bloom filter of blacklisted
+JTIs: a JTI the filter has never seen is not blacklisted, so only the
+rare "maybe" (a replayed token, or a false positive at BLOOM_ERROR_RATE)
+still goes to the database.
+
+The filter is only trusted while it is current. Blacklisting a token moves
+a version in the shared cache on (see apps.api.catalog.set_new_version),
+and every process - the one that blacklisted included - that sees a
+version other than the one it last synced at first loads the rows
+blacklisted since its last sync (by id, re-reading a trailing window so
+rows whose transactions committed out of id order are not missed). The
+version is never advanced locally: with two blacklists at once, a process
+could otherwise skip the other one's row. When the filter holds more
+JTIs than BLOOM_CAPACITY it is rebuilt from the unexpired ones.
+
+Expired tokens are removed by the prune_tokens command, which
+run_production.py runs at startup; the live event hub also prunes them
+hourly (see live.EventHub).
+"""
+import hashlib
+import math
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt import serializers, tokens
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .catalog import get_version, set_new_version
+
+BLACKLIST_VERSION_KEY = 'jwt:blacklist:version'
+
+# Rows re-read below the last synced id on each sync
+SYNC_WINDOW = 50
+
+
+def blacklist_settings():
+    return {
+        'BLOOM_CAPACITY': 200000,
+        'BLOOM_ERROR_RATE': 0.001,
+        'PRUNE_BATCH_SIZE': 5000,
+        **getattr(settings, 'TOKEN_BLACKLIST', {}),
+    }
+
+
+class BloomFilter:
+    """Fixed-size bloom filter of strings (no removal)"""
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        """Add a value; count only grows when it sets a new bit, so re-adds are free"""
+        added = False
+        for position in self._positions(value):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        self.count += added
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RevokedJTIs:
+    """The process-wide bloom filter of blacklisted JTIs and its sync state"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.version = None
+        self.last_id = 0
+
+    def _load(self, rows):
+        for row_id, jti in rows:
+            self.bloom.add(jti)
+            self.last_id = max(self.last_id, row_id)
+
+    def _sync(self):
+        config = blacklist_settings()
+        version = get_version(BLACKLIST_VERSION_KEY)
+        if self.bloom is not None and version == self.version:
+            return
+        if self.bloom is None or self.bloom.count > config['BLOOM_CAPACITY']:
+            self.bloom = BloomFilter(config['BLOOM_CAPACITY'], config['BLOOM_ERROR_RATE'])
+            self.last_id = 0
+            rows = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        else:
+            rows = BlacklistedToken.objects.filter(id__gt=self.last_id - SYNC_WINDOW)
+        self._load(rows.values_list('id', 'token__jti').iterator())
+        self.version = version
+
+    def may_contain(self, jti):
+        """False when the JTI is certainly not blacklisted"""
+        with self.lock:
+            self._sync()
+            return jti in self.bloom
+
+    def add(self, jti):
+        """Record a token blacklisted by this process, once it is committed"""
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+            # Every process, this one included, resyncs from the database
+            set_new_version(BLACKLIST_VERSION_KEY)
+
+
+revoked_jtis = RevokedJTIs()
+
+
+def token_blacklisted(sender, instance, created, **kwargs):
+    """post_save receiver for BlacklistedToken"""
+    if created:
+        jti = instance.token.jti
+        transaction.on_commit(lambda: revoked_jtis.add(jti))
+
+
+class RefreshToken(tokens.RefreshToken):
+    """RefreshToken whose blacklist check goes through the bloom filter first"""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if revoked_jtis.may_contain(jti):
+            super().check_blacklist()
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
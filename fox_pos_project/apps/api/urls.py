@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 from .auth import CustomTokenObtainPairView, LogoutView
+from .live import events_unavailable
 from .views import (ProductViewSet, CustomerViewSet, SupplierViewSet, ShiftViewSet, 
                     TransactionViewSet, QuotationViewSet, SettingsViewSet, UserViewSet,
                     ActivityLogViewSet, ReportsViewSet, SystemViewSet)
@@ -27,6 +28,9 @@ urlpatterns = [
     path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('auth/logout/', LogoutView.as_view(), name='logout'),
     
+    # Live events: served by the ASGI application, this only answers under WSGI
+    path('events/', events_unavailable, name='live_events'),
+    
     # API routes
     path('', include(router.urls)),
 ]
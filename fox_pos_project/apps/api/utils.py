@@ -1,13 +1,23 @@
 """
 Utility functions for the API app
 """
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
 from .models import ActivityLog
+from .activity_log import get_activity_log_writer, get_config
 
 
 def log_activity(user, action, details):
     """
     Log an activity to the ActivityLog model
     
+    In 'async' mode (settings.ACTIVITY_LOG) the record is queued once the
+    surrounding transaction commits and written in a batch by the background
+    writer; in 'sync' mode it is inserted immediately.
+    
     Args:
         user: User instance or None
         action: Action description (e.g., 'عملية بيع', 'عملية شراء')
@@ -15,9 +25,58 @@ def log_activity(user, action, details):
     """
     user_name = user.username if user else 'نظام'
     
-    ActivityLog.objects.create(
+    record = ActivityLog(
         user=user,
         user_name=user_name,
         action=action,
-        details=details
+        details=details,
+        date=timezone.now()
     )
+    
+    if get_config()['MODE'] == 'sync':
+        record.save()
+        return
+    
+    # Only log work that actually committed
+    transaction.on_commit(lambda: get_activity_log_writer().enqueue(record))
+
+
+def parse_flag(value, default=False):
+    """
+    A boolean request field: JSON true/false, or a form / query string
+    ('1', 'true', 'yes', 'on' are true, anything else false)
+    """
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def parse_query_date(value, name):
+    """Parse a YYYY-MM-DD query parameter (a trailing time part is ignored)"""
+    parsed = parse_date(str(value)[:10])
+    if parsed is None:
+        raise ValidationError({name: 'صيغة التاريخ غير صحيحة (YYYY-MM-DD)'})
+    return parsed
+
+
+def filter_date_range(queryset, from_date=None, to_date=None, field='date'):
+    """
+    Restrict a queryset to whole local days between from_date and to_date.
+    
+    Filters with a plain range on the column (not `__date`) so the database
+    can use indexes and prune monthly partitions.
+    """
+    tz = timezone.get_current_timezone()
+    if from_date:
+        start = parse_query_date(from_date, 'from_date')
+        queryset = queryset.filter(**{
+            f'{field}__gte': timezone.make_aware(datetime.combine(start, time.min), tz)
+        })
+    if to_date:
+        end = parse_query_date(to_date, 'to_date') + timedelta(days=1)
+        queryset = queryset.filter(**{
+            f'{field}__lt': timezone.make_aware(datetime.combine(end, time.min), tz)
+        })
+    return queryset
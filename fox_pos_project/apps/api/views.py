@@ -1,23 +1,31 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
+from rest_framework.exceptions import PermissionDenied
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.pagination import PageNumberPagination
 from django.contrib.auth.models import User
-from apps.products.models import Product
+from apps.products.models import LOW_STOCK, Product
 from apps.customers.models import Customer
 from apps.suppliers.models import Supplier
 from apps.quotations.models import Quotation, QuotationItem
 from .models import Shift, Transaction, AppSettings, ActivityLog
 from .serializers import (ProductSerializer, CustomerSerializer, SupplierSerializer, 
                           ShiftSerializer, TransactionSerializer, QuotationSerializer, 
+                          QuotationSummarySerializer, 
                           AppSettingsSerializer, UserSerializer, UserCreateSerializer, 
-                          ChangePasswordSerializer, ActivityLogSerializer)
+                          ChangePasswordSerializer, ActivityLogSerializer, StockAlertSerializer)
+from .authentication import get_open_shift
 from .exceptions import BusinessRuleViolation
+from .utils import filter_date_range, parse_flag, parse_query_date
+from . import exports
+from django.http import FileResponse
 from django.utils import timezone
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from django.db import transaction as db_transaction
+from fox_pos.db_router import ReplicaReadMixin, replica_reads
 import uuid
 
 
@@ -27,15 +35,9 @@ def get_user_shift(user):
     Admin users can work without a shift.
     
     Returns:
-        Shift object or None
+        Shift object or None (from the auth cache, see apps.api.authentication)
     """
-    if user and user.is_staff:
-        # Admin can work with or without a shift
-        return Shift.objects.filter(user=user, status='open').first()
-    elif user:
-        # Non-admin users should have their own shift
-        return Shift.objects.filter(user=user, status='open').first()
-    return None
+    return get_open_shift(user)
 
 
 class TransactionViewSet(viewsets.ModelViewSet):
@@ -43,6 +45,8 @@ class TransactionViewSet(viewsets.ModelViewSet):
     ViewSet for Transaction operations
     
     GET    /api/transactions/           - List transactions
+    GET    /api/transactions/export/    - Export the filtered list (?file_type=csv|xlsx)
+    GET    /api/transactions/{id}/pdf/  - Sale invoice as PDF
     POST   /api/transactions/           - Create transaction
     PUT    /api/transactions/{id}/approve/ - Approve pending transaction
     PUT    /api/transactions/{id}/reject/  - Reject pending transaction
@@ -58,15 +62,11 @@ class TransactionViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter transactions by date range if provided"""
         queryset = super().get_queryset()
-        from_date = self.request.query_params.get('from_date')
-        to_date = self.request.query_params.get('to_date')
-        
-        if from_date:
-            queryset = queryset.filter(date__date__gte=from_date)
-        if to_date:
-            queryset = queryset.filter(date__date__lte=to_date)
-        
-        return queryset
+        return filter_date_range(
+            queryset,
+            self.request.query_params.get('from_date'),
+            self.request.query_params.get('to_date')
+        )
     
     def perform_create(self, serializer):
         """Create transaction with auto-generated ID"""
@@ -98,6 +98,33 @@ class TransactionViewSet(viewsets.ModelViewSet):
             status=status
         )
     
+    @action(detail=False, methods=['get'])
+    @replica_reads
+    def export(self, request):
+        """
+        Export transactions with the same filters as the list
+        GET /api/transactions/export/?type=بيع&from_date=2024-01-01&file_type=xlsx
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return exports.export_response(
+            request,
+            exports.TRANSACTION_HEADERS,
+            exports.transaction_rows(queryset),
+            'transactions',
+            'المعاملات'
+        )
+    
+    @action(detail=True, methods=['get'])
+    def pdf(self, request, pk=None):
+        """
+        Sale invoice as PDF, served from the render cache when unchanged
+        GET /api/transactions/{id}/pdf/
+        """
+        from .services.pdf_service import PDFService
+        
+        path = PDFService.get_invoice_pdf(pk)
+        return FileResponse(open(path, 'rb'), filename=f'{pk}.pdf', content_type='application/pdf')
+    
     @action(detail=True, methods=['put'], permission_classes=[IsAdminUser])
     def approve(self, request, pk=None):
         """
@@ -479,6 +506,7 @@ class SupplierViewSet(viewsets.ModelViewSet):
     PUT    /api/suppliers/{id}/      - Update supplier
     DELETE /api/suppliers/{id}/      - Delete supplier
     POST   /api/suppliers/{id}/settle_debt/ - Settle debt
+    GET    /api/suppliers/{id}/statement/   - Account statement (?from_date&to_date)
     """
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
@@ -533,11 +561,17 @@ class SupplierViewSet(viewsets.ModelViewSet):
                 )
             
             # Update supplier balance (decrease = payment made to supplier)
-            supplier.current_balance -= amount
-            supplier.save()
+            from .services.ledger_service import LedgerService
+            from .services.debt_service import DebtService
+            with db_transaction.atomic():
+                LedgerService.post(
+                    supplier, -amount, description=f'سداد دين - {payment_method}', user=request.user
+                )
+                # Pay off open purchase invoices, oldest due first
+                settlement = DebtService.allocate(supplier, amount, payment_method, user=request.user)
             
             serializer = self.get_serializer(supplier)
-            return Response(serializer.data)
+            return Response({**serializer.data, 'settlement': settlement})
         except Exception as e:
             import traceback
             print(f"Error in settle_debt: {e}")
@@ -546,6 +580,20 @@ class SupplierViewSet(viewsets.ModelViewSet):
                 {'error_code': 'SERVER_ERROR', 'message': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    @action(detail=True, methods=['get'])
+    def statement(self, request, pk=None):
+        """
+        Account statement: opening balance, entries and closing balance
+        GET /api/suppliers/{id}/statement/?from_date=2024-01-01&to_date=2024-12-31
+        """
+        from .services.ledger_service import LedgerService
+        
+        return Response(LedgerService.statement(
+            self.get_object(),
+            request.query_params.get('from_date'),
+            request.query_params.get('to_date')
+        ))
 
 
 class CustomerViewSet(viewsets.ModelViewSet):
@@ -558,6 +606,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
     PUT    /api/customers/{id}/      - Update customer
     DELETE /api/customers/{id}/      - Delete customer
     POST   /api/customers/{id}/settle_debt/ - Settle debt
+    GET    /api/customers/{id}/statement/   - Account statement (?from_date&to_date)
     """
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
@@ -612,11 +661,17 @@ class CustomerViewSet(viewsets.ModelViewSet):
                 )
             
             # Update customer balance (increase = payment received)
-            customer.current_balance += amount
-            customer.save()
+            from .services.ledger_service import LedgerService
+            from .services.debt_service import DebtService
+            with db_transaction.atomic():
+                LedgerService.post(
+                    customer, amount, description=f'تحصيل دين - {payment_method}', user=request.user
+                )
+                # Settle open sale invoices, oldest due first
+                settlement = DebtService.allocate(customer, amount, payment_method, user=request.user)
             
             serializer = self.get_serializer(customer)
-            return Response(serializer.data)
+            return Response({**serializer.data, 'settlement': settlement})
         except Exception as e:
             import traceback
             print(f"Error in settle_debt: {e}")
@@ -625,6 +680,20 @@ class CustomerViewSet(viewsets.ModelViewSet):
                 {'error_code': 'SERVER_ERROR', 'message': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    @action(detail=True, methods=['get'])
+    def statement(self, request, pk=None):
+        """
+        Account statement: opening balance, entries and closing balance
+        GET /api/customers/{id}/statement/?from_date=2024-01-01&to_date=2024-12-31
+        """
+        from .services.ledger_service import LedgerService
+        
+        return Response(LedgerService.statement(
+            self.get_object(),
+            request.query_params.get('from_date'),
+            request.query_params.get('to_date')
+        ))
 
 
 class ProductViewSet(viewsets.ModelViewSet):
@@ -636,7 +705,13 @@ class ProductViewSet(viewsets.ModelViewSet):
     GET    /api/products/{id}/      - Retrieve product
     PUT    /api/products/{id}/      - Update product
     DELETE /api/products/{id}/      - Delete product
+    GET    /api/products/?low_stock=true - Products at or below their minimum level
     POST   /api/products/{id}/adjust_stock/ - Adjust stock
+    GET    /api/products/stock_alerts/?after={cursor} - Low-stock alerts newer than the cursor
+    POST   /api/products/labels/    - Assign missing barcodes and print label sheets
+    POST   /api/products/import/    - Bulk import from XLSX/CSV
+    POST   /api/products/bulk_update/ - Set-based price / min stock / activation changes
+    GET    /api/products/{id}/barcode/ - Barcode image (PNG)
     """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
@@ -646,6 +721,21 @@ class ProductViewSet(viewsets.ModelViewSet):
     ordering_fields = ['product_name', 'current_stock', 'created_at']
     ordering = ['-created_at']
     
+    def get_queryset(self):
+        """?low_stock=true keeps products at or below their minimum level (idx_products_low_stock)"""
+        queryset = super().get_queryset()
+        if self.request.query_params.get('low_stock') in ('true', '1'):
+            queryset = queryset.filter(LOW_STOCK)
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        """List products; X-Catalog-Version lets clients key their caches"""
+        from .catalog import get_catalog_version
+        
+        response = super().list(request, *args, **kwargs)
+        response['X-Catalog-Version'] = str(get_catalog_version())
+        return response
+    
     def create(self, request, *args, **kwargs):
         """Create product with error handling"""
         import traceback
@@ -730,13 +820,165 @@ class ProductViewSet(viewsets.ModelViewSet):
             )
         
         # Update product quantity
-        product.current_stock = new_quantity
-        product.save()
+        from decimal import Decimal
+        from .services.stock_alert_service import StockAlertService
+        
+        with db_transaction.atomic():
+            previous_stock = product.current_stock
+            product.current_stock = Decimal(str(new_quantity))
+            product.save()
+            StockAlertService.record(product, previous_stock)
         
         # TODO: Create adjustment transaction when Transaction model is implemented
         
         serializer = self.get_serializer(product)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def bulk_update(self, request):
+        """
+        Apply one change to a filtered product set in a single UPDATE
+        POST /api/products/bulk_update/
+        Body: {
+            "filters": { "category": "...", "search": "...", "ids": [1, 2] },
+            "price": { "field": "selling_price|purchase_price|both",
+                       "mode": "percent|absolute|set", "value": 10,
+                       "rounding": 0.5, "rounding_mode": "nearest|up|down" },
+            "min_stock_level": 5,
+            "is_active": true,
+            "dry_run": true
+        }
+        """
+        from .services.product_bulk_service import ProductBulkService
+        
+        filters = request.data.get('filters') or {}
+        ids = filters.get('ids') or None
+        if ids is not None and not isinstance(ids, list):
+            return Response(
+                {'error_code': 'VALIDATION_ERROR', 'message': 'ids يجب أن تكون قائمة'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        changes = ProductBulkService.build_changes(
+            price=request.data.get('price'),
+            min_stock_level=request.data.get('min_stock_level'),
+            is_active=request.data.get('is_active')
+        )
+        products = ProductBulkService.select_products(
+            category=filters.get('category'),
+            search=filters.get('search'),
+            ids=ids
+        )
+        result = ProductBulkService.apply(
+            products,
+            changes,
+            dry_run=parse_flag(request.data.get('dry_run')),
+            user=request.user
+        )
+        return Response(result)
+    
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_products(self, request):
+        """
+        Bulk import / update products from a spreadsheet
+        POST /api/products/import/  (multipart: file, update_existing, dry_run)
+        
+        Returns a per-row error report; valid rows are imported even when
+        other rows fail.
+        """
+        from .services.import_service import ProductImportService
+        
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response(
+                {'error_code': 'VALIDATION_ERROR', 'message': 'file مطلوب'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        report = ProductImportService.import_file(
+            upload,
+            upload.name,
+            update_existing=parse_flag(request.data.get('update_existing'), True),
+            dry_run=parse_flag(request.data.get('dry_run'))
+        )
+        return Response(report)
+    
+    @action(detail=False, methods=['post'])
+    def labels(self, request):
+        """
+        Assign barcodes in bulk and return printable label sheets (PDF)
+        POST /api/products/labels/
+        Body: { "category": "...", "ids": [1, 2], "missing_only": true,
+                "assign": true, "layout": "3x8", "show_price": true }
+        
+        Assigning barcodes writes to the catalog, so it is for admins; for
+        other users `assign` defaults to false (print existing barcodes).
+        """
+        from django.http import HttpResponse
+        from .services.barcode_service import BarcodeService
+        
+        ids = request.data.get('ids') or None
+        if ids is not None and not isinstance(ids, list):
+            return Response(
+                {'error_code': 'VALIDATION_ERROR', 'message': 'ids يجب أن تكون قائمة'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        assign = parse_flag(request.data.get('assign'), request.user.is_staff)
+        if assign and not request.user.is_staff:
+            raise PermissionDenied('تعيين الباركود للمنتجات متاح للمدير فقط')
+        
+        content, assigned = BarcodeService.print_labels(
+            category=request.data.get('category') or None,
+            ids=ids,
+            missing_only=parse_flag(request.data.get('missing_only')),
+            assign=assign,
+            layout=request.data.get('layout', '3x8'),
+            show_price=parse_flag(request.data.get('show_price'), True)
+        )
+        
+        response = HttpResponse(content, content_type='application/pdf')
+        response['Content-Disposition'] = 'attachment; filename="labels.pdf"'
+        response['X-Barcodes-Assigned'] = str(assigned)
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def barcode(self, request, pk=None):
+        """
+        Barcode image of a product, cached on disk by code
+        GET /api/products/{id}/barcode/
+        """
+        from .services.barcode_service import BarcodeService
+        
+        product = self.get_object()
+        if not product.barcode:
+            raise BusinessRuleViolation('المنتج ليس له باركود')
+        path = BarcodeService.barcode_image(product.barcode)
+        return FileResponse(open(path, 'rb'), content_type='image/png')
+    
+    @action(detail=False, methods=['get'])
+    def stock_alerts(self, request):
+        """
+        Low-stock / restocked alerts newer than a cursor
+        GET /api/products/stock_alerts/?after=120&limit=100
+        
+        Without `after` the most recent alerts are returned. Send back the
+        returned `cursor` to get only what happened since.
+        """
+        from .services.stock_alert_service import StockAlertService
+        
+        try:
+            after = request.query_params.get('after')
+            after = int(after) if after not in (None, '') else None
+            limit = min(max(int(request.query_params.get('limit', 100)), 1), 500)
+        except ValueError:
+            raise BusinessRuleViolation('after و limit يجب أن تكون أرقاماً', error_code='VALIDATION_ERROR')
+        
+        alerts, cursor = StockAlertService.feed(after=after, limit=limit)
+        return Response({
+            'alerts': StockAlertSerializer(alerts, many=True).data,
+            'cursor': cursor,
+        })
 
 
 
@@ -744,12 +986,14 @@ class QuotationViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Quotation operations
     
-    GET    /api/quotations/           - List quotations
+    GET    /api/quotations/           - List quotations (?summary=1: counts/totals instead of items)
     POST   /api/quotations/           - Create quotation
     GET    /api/quotations/{id}/      - Retrieve quotation
     PUT    /api/quotations/{id}/      - Update quotation
     DELETE /api/quotations/{id}/      - Delete quotation
     POST   /api/quotations/{id}/convert/ - Convert to invoice
+    POST   /api/quotations/convert_many/ - Convert several quotations (per-quotation results)
+    GET    /api/quotations/{id}/pdf/  - Quotation as PDF
     """
     queryset = Quotation.objects.all()
     serializer_class = QuotationSerializer
@@ -758,6 +1002,39 @@ class QuotationViewSet(viewsets.ModelViewSet):
     ordering_fields = ['quotation_date', 'total_amount']
     ordering = ['-quotation_date']
     
+    def is_summary(self):
+        return self.action == 'list' and self.request.query_params.get('summary') in ('1', 'true')
+    
+    def get_queryset(self):
+        """
+        Related data each action's serializer reads, loaded up front
+        
+        list?summary=1  - customer join + item count/total annotations (1 query)
+        other actions   - customer join + items with their products (2 queries)
+        """
+        from decimal import Decimal
+        from django.db.models import Count, DecimalField, Sum, Value
+        from django.db.models.functions import Coalesce
+        from .services.quotation_service import with_lines
+        
+        queryset = Quotation.objects.all()
+        if self.is_summary():
+            return queryset.select_related('customer').annotate(
+                item_count=Count('quotationitem'),
+                items_total=Coalesce(
+                    Sum('quotationitem__total'), Value(Decimal('0')),
+                    output_field=DecimalField(max_digits=14, decimal_places=2)
+                )
+            )
+        if self.action in ('destroy', 'pdf'):
+            return queryset
+        return with_lines(queryset)
+    
+    def get_serializer_class(self):
+        if self.is_summary():
+            return QuotationSummarySerializer
+        return QuotationSerializer
+    
     def create(self, request, *args, **kwargs):
         """Create a new quotation"""
         customer_id = request.data.get('customer')
@@ -784,44 +1061,32 @@ class QuotationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Generate quotation number
-        last_quotation = Quotation.objects.order_by('-quotation_id').first()
-        if last_quotation:
-            last_num = int(last_quotation.quotation_number.replace('Q', ''))
-            quotation_number = f'Q{last_num + 1:05d}'
-        else:
-            quotation_number = 'Q00001'
+        from .services.quotation_service import QuotationService
         
-        # Create quotation
-        with db_transaction.atomic():
-            quotation = Quotation.objects.create(
-                quotation_number=quotation_number,
-                customer=customer,
-                total_amount=total_amount,
-                status='draft',
-                created_by=request.user.id if request.user.is_authenticated else None
+        try:
+            quotation = QuotationService.create_quotation(customer, items, total_amount, user=request.user)
+        except BusinessRuleViolation as e:
+            if e.error_code != 'NOT_FOUND':
+                raise
+            return Response(
+                {'error_code': e.error_code, 'message': e.message},
+                status=status.HTTP_404_NOT_FOUND
             )
-            
-            # Create quotation items
-            for item in items:
-                try:
-                    product = Product.objects.get(product_id=item['id'])
-                    QuotationItem.objects.create(
-                        quotation=quotation,
-                        product=product,
-                        quantity=item['quantity'],
-                        unit_price=item['price'],
-                        total=item['quantity'] * item['price']
-                    )
-                except Product.DoesNotExist:
-                    return Response(
-                        {'error_code': 'NOT_FOUND', 'message': f'المنتج {item["id"]} غير موجود'},
-                        status=status.HTTP_404_NOT_FOUND
-                    )
         
-        serializer = self.get_serializer(quotation)
+        serializer = self.get_serializer(self.get_queryset().get(pk=quotation.pk))
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
+    @action(detail=True, methods=['get'])
+    def pdf(self, request, pk=None):
+        """
+        Quotation as PDF, served from the render cache when unchanged
+        GET /api/quotations/{id}/pdf/
+        """
+        from .services.pdf_service import PDFService
+        
+        path = PDFService.get_quotation_pdf(pk)
+        return FileResponse(open(path, 'rb'), filename=f'quotation-{pk}.pdf', content_type='application/pdf')
+    
     @action(detail=True, methods=['post'])
     def convert(self, request, pk=None):
         """
@@ -829,76 +1094,51 @@ class QuotationViewSet(viewsets.ModelViewSet):
         POST /api/quotations/{id}/convert/
         Body: { "payment_method": "كاش" }
         """
-        quotation = self.get_object()
-        
-        if quotation.status == 'converted':
-            raise BusinessRuleViolation(
-                'عرض السعر محول بالفعل',
-                error_code='ALREADY_CONVERTED'
-            )
+        from .services.quotation_service import QuotationService, InsufficientStock
         
+        quotation = self.get_object()
         payment_method = request.data.get('payment_method', 'كاش')
         
-        # Check stock availability
-        quotation_items = QuotationItem.objects.filter(quotation=quotation)
-        insufficient_stock = []
-        
-        for item in quotation_items:
-            if item.product.current_stock < item.quantity:
-                insufficient_stock.append({
-                    'product': item.product.product_name,
-                    'available': float(item.product.current_stock),
-                    'required': float(item.quantity)
-                })
-        
-        if insufficient_stock:
+        try:
+            sale_transaction = QuotationService.convert(quotation, payment_method, user=request.user)
+        except InsufficientStock as e:
             return Response(
-                {
-                    'error_code': 'INSUFFICIENT_STOCK',
-                    'message': 'بعض المنتجات غير متوفرة بالكمية المطلوبة',
-                    'details': insufficient_stock
-                },
+                {'error_code': e.error_code, 'message': e.message, 'details': e.details},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Convert to sale using SaleService
-        from .services.sale_service import SaleService
+        serializer = self.get_serializer(quotation)
+        return Response({
+            'quotation': serializer.data,
+            'transaction_id': sale_transaction.transaction_id
+        }, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'])
+    def convert_many(self, request):
+        """
+        Convert several quotations to sales in one request
+        POST /api/quotations/convert_many/
+        Body: { "ids": [12, 13, 14], "payment_method": "آجل" }
         
-        # Prepare cart items
-        cart_items = []
-        for item in quotation_items:
-            cart_items.append({
-                'id': item.product.product_id,
-                'quantity': float(item.quantity),
-                'price': float(item.unit_price)
-            })
+        Each quotation converts (or fails) on its own; the response lists
+        the result of every id in request order.
+        """
+        from .services.quotation_service import QuotationService
         
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            raise BusinessRuleViolation('ids مطلوب (قائمة أرقام عروض الأسعار)', error_code='VALIDATION_ERROR')
         try:
-            sale_transaction = SaleService.complete_sale(
-                cart_items=cart_items,
-                customer_id=quotation.customer.customer_id,
-                payment_method=payment_method,
-                total_amount=float(quotation.total_amount),
-                invoice_id=quotation.quotation_number,
-                is_direct_sale=False,
-                user=request.user
-            )
-            
-            # Update quotation status
-            quotation.status = 'converted'
-            quotation.save()
-            
-            serializer = self.get_serializer(quotation)
-            return Response({
-                'quotation': serializer.data,
-                'transaction_id': sale_transaction.transaction_id
-            }, status=status.HTTP_200_OK)
-            
-        except BusinessRuleViolation as e:
-            return Response(
-                {'error_code': e.error_code, 'message': e.message},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            ids = [int(quotation_id) for quotation_id in ids]
+        except (TypeError, ValueError):
+            raise BusinessRuleViolation('ids يجب أن تكون أرقام', error_code='VALIDATION_ERROR')
+        
+        result = QuotationService.convert_many(
+            ids,
+            request.data.get('payment_method', 'كاش'),
+            user=request.user
+        )
+        return Response(result)
 
 
 
@@ -1062,27 +1302,26 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         """Filter activity logs by date range if provided"""
         queryset = super().get_queryset()
-        from_date = self.request.query_params.get('from_date')
-        to_date = self.request.query_params.get('to_date')
-        
-        if from_date:
-            queryset = queryset.filter(date__date__gte=from_date)
-        if to_date:
-            queryset = queryset.filter(date__date__lte=to_date)
-        
-        return queryset
+        return filter_date_range(
+            queryset,
+            self.request.query_params.get('from_date'),
+            self.request.query_params.get('to_date')
+        )
 
 
 
-class ReportsViewSet(viewsets.ViewSet):
+class ReportsViewSet(ReplicaReadMixin, viewsets.ViewSet):
     """
-    ViewSet for Reports
+    ViewSet for Reports (reads go to the replica when one is configured)
     
     GET /api/reports/sales/        - Sales report
     GET /api/reports/inventory/    - Inventory report
     GET /api/reports/treasury/     - Treasury report
     GET /api/reports/debts/         - Debts report
+    GET /api/reports/aging/         - Receivables / payables aging buckets
     GET /api/reports/profit_loss/   - Profit/loss report
+    GET /api/reports/dashboard/     - All dashboard KPIs in one response
+    GET /api/reports/{report}/export/ - Export a report (?file_type=csv|xlsx)
     """
     
     @action(detail=False, methods=['get'])
@@ -1095,12 +1334,7 @@ class ReportsViewSet(viewsets.ViewSet):
         to_date = request.query_params.get('to_date')
         
         # Filter sales transactions
-        sales = Transaction.objects.filter(type='بيع')
-        
-        if from_date:
-            sales = sales.filter(date__date__gte=from_date)
-        if to_date:
-            sales = sales.filter(date__date__lte=to_date)
+        sales = filter_date_range(Transaction.objects.filter(type='بيع'), from_date, to_date)
         
         # Calculate totals by payment method
         totals_by_method = {}
@@ -1128,31 +1362,34 @@ class ReportsViewSet(viewsets.ViewSet):
         Inventory report with low stock alerts
         GET /api/reports/inventory/
         """
-        products = Product.objects.all()
-        
-        low_stock_products = []
-        total_inventory_value = 0
+        from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+        
+        totals = Product.objects.aggregate(
+            total_products=Count('product_id'),
+            total_inventory_value=Sum(ExpressionWrapper(
+                F('current_stock') * F('purchase_price'),
+                output_field=DecimalField(max_digits=20, decimal_places=2)
+            ))
+        )
         
-        for product in products:
-            stock = float(product.current_stock)
-            cost = float(product.purchase_price)
-            min_stock = float(product.min_stock_level)
-            
-            total_inventory_value += stock * cost
-            
-            if stock <= min_stock:
-                low_stock_products.append({
-                    'id': product.product_id,
-                    'name': product.product_name,
-                    'current_stock': stock,
-                    'min_stock_level': min_stock
-                })
+        # Served by the partial idx_products_low_stock index
+        low_stock_products = [
+            {
+                'id': row['product_id'],
+                'name': row['product_name'],
+                'current_stock': float(row['current_stock']),
+                'min_stock_level': float(row['min_stock_level'])
+            }
+            for row in Product.objects.filter(LOW_STOCK).order_by('product_name').values(
+                'product_id', 'product_name', 'current_stock', 'min_stock_level'
+            )
+        ]
         
         return Response({
-            'total_products': products.count(),
+            'total_products': totals['total_products'],
             'low_stock_count': len(low_stock_products),
             'low_stock_products': low_stock_products,
-            'total_inventory_value': total_inventory_value
+            'total_inventory_value': float(totals['total_inventory_value'] or 0)
         })
     
     @action(detail=False, methods=['get'])
@@ -1165,12 +1402,7 @@ class ReportsViewSet(viewsets.ViewSet):
         to_date = request.query_params.get('to_date')
         
         # Filter transactions
-        transactions = Transaction.objects.all()
-        
-        if from_date:
-            transactions = transactions.filter(date__gte=from_date)
-        if to_date:
-            transactions = transactions.filter(date__lte=to_date)
+        transactions = filter_date_range(Transaction.objects.all(), from_date, to_date)
         
         # Calculate totals by type
         totals_by_type = {}
@@ -1244,6 +1476,25 @@ class ReportsViewSet(viewsets.ViewSet):
             'total_supplier_debt': total_supplier_debt
         })
     
+    @action(detail=False, methods=['get'])
+    def aging(self, request):
+        """
+        Open receivables / payables by days overdue
+        GET /api/reports/aging/?as_of=2024-12-31&entity_type=customer
+        """
+        from .services.debt_service import DebtService
+        from .utils import parse_query_date
+        
+        as_of = request.query_params.get('as_of')
+        entity_type = request.query_params.get('entity_type')
+        if entity_type not in (None, '', 'customer', 'supplier'):
+            raise BusinessRuleViolation('entity_type يجب أن يكون customer أو supplier', error_code='VALIDATION_ERROR')
+        
+        return Response(DebtService.aging(
+            parse_query_date(as_of, 'as_of') if as_of else None,
+            entity_type or None
+        ))
+    
     @action(detail=False, methods=['get'])
     def profit_loss(self, request):
         """
@@ -1254,12 +1505,7 @@ class ReportsViewSet(viewsets.ViewSet):
         to_date = request.query_params.get('to_date')
         
         # Filter transactions
-        transactions = Transaction.objects.all()
-        
-        if from_date:
-            transactions = transactions.filter(date__gte=from_date)
-        if to_date:
-            transactions = transactions.filter(date__lte=to_date)
+        transactions = filter_date_range(Transaction.objects.all(), from_date, to_date)
         
         # Calculate totals
         total_sales = 0
@@ -1285,6 +1531,66 @@ class ReportsViewSet(viewsets.ViewSet):
             'total_expenses': total_expenses,
             'net_income': net_income
         })
+    
+    @action(detail=False, methods=['get'])
+    def dashboard(self, request):
+        """
+        Dashboard KPIs, aggregated in the database
+        GET /api/reports/dashboard/?from_date=2024-01-01&to_date=2024-12-31
+        """
+        from .services.dashboard_service import DashboardService
+        
+        from_date = request.query_params.get('from_date')
+        to_date = request.query_params.get('to_date')
+        
+        return Response(DashboardService.get_kpis(from_date, to_date))
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path=r'(?P<report>sales|inventory|treasury|debts|profit_loss|dashboard)/export'
+    )
+    def export(self, request, report=None):
+        """
+        Export a report as CSV or XLSX
+        GET /api/reports/sales/export/?from_date=2024-01-01&to_date=2024-12-31&file_type=xlsx
+        
+        Row-level reports export their underlying rows; summary reports
+        (profit_loss, dashboard) export their figures as item/value pairs.
+        """
+        from_date = request.query_params.get('from_date')
+        to_date = request.query_params.get('to_date')
+        exports.get_export_format(request)  # Fail fast on a bad file_type
+        # The file name is built from the parsed dates, never the raw parameters
+        first_day = parse_query_date(from_date, 'from_date') if from_date else None
+        last_day = parse_query_date(to_date, 'to_date') if to_date else timezone.localdate()
+        
+        if report in ('sales', 'treasury'):
+            transactions = filter_date_range(Transaction.objects.all(), from_date, to_date)
+            if report == 'sales':
+                transactions = transactions.filter(type='بيع')
+            headers = exports.TRANSACTION_HEADERS
+            rows = exports.transaction_rows(transactions.order_by('date'))
+        elif report == 'inventory':
+            headers = exports.PRODUCT_HEADERS
+            rows = exports.product_rows(Product.objects.order_by('product_name'))
+        elif report == 'debts':
+            headers = exports.DEBT_HEADERS
+            rows = exports.debt_rows(
+                Customer.objects.filter(current_balance__lt=0).order_by('customer_name'),
+                Supplier.objects.filter(current_balance__gt=0).order_by('supplier_name')
+            )
+        else:
+            if report == 'dashboard':
+                from .services.dashboard_service import DashboardService
+                data = DashboardService.get_kpis(from_date, to_date)
+            else:
+                data = self.profit_loss(request).data
+            headers = exports.SUMMARY_HEADERS
+            rows = exports.summary_rows(data)
+        
+        filename = f"{report}_{first_day or 'all'}_{last_day}"
+        return exports.export_response(request, headers, rows, filename, report)
 
 
 
@@ -1300,6 +1606,7 @@ class SystemViewSet(viewsets.ViewSet):
     permission_classes = [IsAdminUser]
     
     @action(detail=False, methods=['post'])
+    @replica_reads
     def backup(self, request):
         """
         Generate JSON backup file
@@ -1501,27 +1808,10 @@ class SystemViewSet(viewsets.ViewSet):
         Reset customer/supplier balances to zero
         POST /api/system/clear_transactions/
         """
-        with db_transaction.atomic():
-            # Delete transactions
-            Transaction.objects.all().delete()
-            
-            # Delete quotations and items
-            QuotationItem.objects.all().delete()
-            Quotation.objects.all().delete()
-            
-            # Delete shifts
-            Shift.objects.all().delete()
-            
-            # Delete activity logs
-            ActivityLog.objects.all().delete()
-            
-            # Reset customer balances
-            Customer.objects.all().update(current_balance=0)
-            
-            # Reset supplier balances
-            Supplier.objects.all().update(current_balance=0)
-        
-        return Response({'message': 'تم مسح جميع المعاملات بنجاح'})
+        from .services.reset_service import ResetService
+
+        report = ResetService.clear_transactions()
+        return Response({'message': 'تم مسح جميع المعاملات بنجاح', 'tables': report})
     
     @action(detail=False, methods=['post'])
     def factory_reset(self, request):
@@ -1529,17 +1819,11 @@ class SystemViewSet(viewsets.ViewSet):
         Factory reset - restore all data to initial defaults
         POST /api/system/factory_reset/
         """
+        from .services.reset_service import ResetService
+
         with db_transaction.atomic():
-            # Delete all data
-            Transaction.objects.all().delete()
-            QuotationItem.objects.all().delete()
-            Quotation.objects.all().delete()
-            Shift.objects.all().delete()
-            ActivityLog.objects.all().delete()
-            Product.objects.all().delete()
-            Customer.objects.all().delete()
-            Supplier.objects.all().delete()
-            
+            report = ResetService.clear_all_data()
+
             # Reset settings (keep logo_url to preserve branding)
             settings = AppSettings.get_settings()
             settings.company_name = 'FOX GROUP'
@@ -1556,4 +1840,4 @@ class SystemViewSet(viewsets.ViewSet):
             settings.invoice_terms = ''
             settings.save()
         
-        return Response({'message': 'تم إعادة ضبط المصنع بنجاح'})
+        return Response({'message': 'تم إعادة ضبط المصنع بنجاح', 'tables': report})
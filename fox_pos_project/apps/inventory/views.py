@@ -1,8 +1,10 @@
-from django.shortcuts import render
-from django.contrib.auth.decorators import login_required
+from fox_pos.listing import KeysetListView
 from .models import InventoryMovement
 
-@login_required
-def movement_list(request):
-    movements = InventoryMovement.objects.all().order_by('-movement_date')
-    return render(request, 'inventory/movement_list.html', {'movements': movements})
+movement_list = KeysetListView.as_view(
+    model=InventoryMovement,
+    key_field='movement_date',
+    select_related=('product',),
+    template_name='inventory/movement_list.html',
+    context_object_name='movements',
+)
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_alter_product_product_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockAlert',
+            fields=[
+                ('alert_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('alert_type', models.CharField(choices=[('low_stock', 'مخزون منخفض'), ('restocked', 'تمت إعادة التخزين')], max_length=20)),
+                ('current_stock', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('min_stock_level', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'تنبيه مخزون',
+                'verbose_name_plural': 'تنبيهات المخزون',
+                'db_table': 'fox_system"."stock_alerts',
+                'ordering': ['alert_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('current_stock__lte', models.F('min_stock_level'))), fields=['product_name'], name='idx_products_low_stock'),
+        ),
+        migrations.AddField(
+            model_name='stockalert',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_alerts', to='products.product'),
+        ),
+    ]
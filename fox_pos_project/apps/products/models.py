@@ -1,4 +1,10 @@
 from django.db import models
+from django.db.models import F, Q
+
+# At or below the minimum level; idx_products_low_stock covers exactly this
+# predicate, so queries filtering on it scan only the low-stock rows
+LOW_STOCK = Q(current_stock__lte=F('min_stock_level'))
+
 
 class Product(models.Model):
     product_id = models.AutoField(primary_key=True)
@@ -25,6 +31,37 @@ class Product(models.Model):
         managed = True
         verbose_name = 'منتج'
         verbose_name_plural = 'المنتجات'
+        indexes = [
+            models.Index(fields=['product_name'], condition=LOW_STOCK, name='idx_products_low_stock'),
+        ]
 
     def __str__(self):
         return f"{self.product_code} - {self.product_name}"
+
+    @property
+    def is_low_stock(self):
+        return self.current_stock <= self.min_stock_level
+
+
+class StockAlert(models.Model):
+    """A product crossing its minimum stock level, in either direction"""
+    ALERT_TYPES = [
+        ('low_stock', 'مخزون منخفض'),
+        ('restocked', 'تمت إعادة التخزين'),
+    ]
+
+    alert_id = models.BigAutoField(primary_key=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_alerts')
+    alert_type = models.CharField(max_length=20, choices=ALERT_TYPES)
+    current_stock = models.DecimalField(max_digits=10, decimal_places=2)
+    min_stock_level = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'fox_system"."stock_alerts'
+        ordering = ['alert_id']
+        verbose_name = 'تنبيه مخزون'
+        verbose_name_plural = 'تنبيهات المخزون'
+
+    def __str__(self):
+        return f"{self.product_id} - {self.alert_type}"
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from fox_pos.listing import keyset_index_operation
+
+# purchase_invoices / purchase_returns are not managed by Django (they come
+# with the database dump). The list pages walk them newest first by
+# (key, pk), see fox_pos.listing.KeysetListView
+KEYSET_INDEXES = [
+    ('purchase_invoices', 'idx_purchase_invoices_keyset', 'created_at, invoice_id'),
+    ('purchase_returns', 'idx_purchase_returns_keyset', 'created_at, return_id'),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchases', '0001_initial'),
+    ]
+
+    operations = [
+        keyset_index_operation(KEYSET_INDEXES),
+    ]
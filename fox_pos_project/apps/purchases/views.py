@@ -7,11 +7,14 @@ from .models import PurchaseInvoice, PurchaseInvoiceItem, PurchaseReturn, Purcha
 from .forms import PurchaseInvoiceForm, PurchaseItemFormSet, PurchaseReturnForm, PurchaseReturnItemFormSet
 from apps.suppliers.models import Supplier
 from apps.products.models import Product
+from fox_pos.listing import KeysetListView
 
-@login_required
-def purchase_list(request):
-    invoices = PurchaseInvoice.objects.all().order_by('-created_at')
-    return render(request, 'purchases/purchase_list.html', {'invoices': invoices})
+purchase_list = KeysetListView.as_view(
+    model=PurchaseInvoice,
+    select_related=('supplier',),
+    template_name='purchases/purchase_list.html',
+    context_object_name='invoices',
+)
 
 @login_required
 def purchase_create(request):
@@ -77,10 +80,12 @@ def purchase_detail(request, pk):
     items = invoice.purchaseinvoiceitem_set.all()
     return render(request, 'purchases/purchase_detail.html', {'invoice': invoice, 'items': items})
 
-@login_required
-def purchase_return_list(request):
-    returns = PurchaseReturn.objects.all().order_by('-created_at')
-    return render(request, 'purchases/return_list.html', {'returns': returns})
+purchase_return_list = KeysetListView.as_view(
+    model=PurchaseReturn,
+    select_related=('original_invoice', 'supplier'),
+    template_name='purchases/return_list.html',
+    context_object_name='returns',
+)
 
 @login_required
 def purchase_return_create(request):
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from fox_pos.listing import keyset_index_operation
+
+# quotations is not managed by Django (it comes with the
+# database dump). The list page walks it newest first by (key, pk), see
+# fox_pos.listing.KeysetListView
+KEYSET_INDEXES = [
+    ('quotations', 'idx_quotations_keyset', 'created_at, quotation_id'),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0001_initial'),
+    ]
+
+    operations = [
+        keyset_index_operation(KEYSET_INDEXES),
+    ]
@@ -2,13 +2,16 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import transaction
+from fox_pos.listing import KeysetListView
 from .models import Quotation, QuotationItem
 from .forms import QuotationForm, QuotationItemFormSet
 
-@login_required
-def quotation_list(request):
-    quotations = Quotation.objects.all().order_by('-created_at')
-    return render(request, 'quotations/quotation_list.html', {'quotations': quotations})
+quotation_list = KeysetListView.as_view(
+    model=Quotation,
+    select_related=('customer',),
+    template_name='quotations/quotation_list.html',
+    context_object_name='quotations',
+)
 
 @login_required
 def quotation_create(request):
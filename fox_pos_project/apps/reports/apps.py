@@ -3,3 +3,14 @@ from django.apps import AppConfig
 class ReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.reports'
+
+    def ready(self):
+        from django.db.models.signals import post_save, post_delete
+        from apps.sales.models import SalesInvoice
+        from apps.treasury.models import Treasury
+        from .kpis import sales_changed, treasury_changed
+
+        post_save.connect(sales_changed, sender=SalesInvoice, dispatch_uid='kpi_sales_save')
+        post_delete.connect(sales_changed, sender=SalesInvoice, dispatch_uid='kpi_sales_delete')
+        post_save.connect(treasury_changed, sender=Treasury, dispatch_uid='kpi_treasury_save')
+        post_delete.connect(treasury_changed, sender=Treasury, dispatch_uid='kpi_treasury_delete')
@@ -0,0 +1,112 @@
+"""
+Dashboard KPIs
+
+Values for the server-rendered dashboards. DashboardKPIs is lazy: each
+value is one indexed aggregate that only runs when a template renders it,
+so wrapping it in a cache fragment means a cache hit costs no query:
+
+    {% cache 300 dashboard_sales kpis.today kpis.sales_version %}
+        {{ kpis.sales_today.count }}
+    {% endcache %}
+
+Sales and treasury fragments are keyed on version counters (see
+apps.api.catalog.get_version) that signals bump when a sales invoice or
+treasury row is written, so a write shows on the next render; product
+fragments use the catalog version. The rest rely on their TTL.
+"""
+from decimal import Decimal
+
+from django.db.models import Case, Count, DecimalField, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from apps.api.catalog import bump_version, get_catalog_version, get_version
+from apps.customers.models import Customer
+from apps.products.models import LOW_STOCK, Product
+from apps.sales.models import SalesInvoice
+from apps.treasury.models import Debt, Treasury
+
+SALES_VERSION_KEY = 'kpi:sales:version'
+TREASURY_VERSION_KEY = 'kpi:treasury:version'
+
+ZERO = Value(Decimal('0'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def treasury_totals():
+    """Income, expense and balance over the whole treasury"""
+    totals = Treasury.objects.aggregate(
+        total_income=Coalesce(Sum(Case(
+            When(transaction_type__in=['income', 'opening_balance'], then='amount'),
+            default=0,
+            output_field=DecimalField()
+        )), ZERO),
+        total_expense=Coalesce(Sum(Case(
+            When(transaction_type='expense', then='amount'),
+            default=0,
+            output_field=DecimalField()
+        )), ZERO)
+    )
+    totals['current_balance'] = totals['total_income'] - totals['total_expense']
+    return totals
+
+
+class DashboardKPIs:
+    """Lazily computed dashboard values and the versions their fragments vary on"""
+
+    def __init__(self):
+        self.today = timezone.localdate()
+
+    @cached_property
+    def sales_version(self):
+        return get_version(SALES_VERSION_KEY)
+
+    @cached_property
+    def treasury_version(self):
+        return get_version(TREASURY_VERSION_KEY)
+
+    @cached_property
+    def catalog_version(self):
+        return get_catalog_version()
+
+    @cached_property
+    def sales_today(self):
+        """Today's invoices (idx_sales_invoices_date)"""
+        return SalesInvoice.objects.filter(invoice_date=self.today, is_cancelled=False).aggregate(
+            count=Count('*'),
+            total=Coalesce(Sum('total_amount'), ZERO)
+        )
+
+    @cached_property
+    def customers_count(self):
+        return Customer.objects.filter(is_active=True).count()
+
+    @cached_property
+    def products(self):
+        """Active products and how many are at or below their minimum level"""
+        return Product.objects.filter(is_active=True).aggregate(
+            count=Count('*'),
+            low_stock=Count('product_id', filter=LOW_STOCK)
+        )
+
+    @cached_property
+    def treasury(self):
+        return treasury_totals()
+
+    @cached_property
+    def open_debts(self):
+        """Open debts (the partial idx_debts_open_due index covers the sum)"""
+        return Debt.objects.exclude(status='paid').aggregate(
+            count=Count('*'),
+            total=Coalesce(Sum('remaining_amount'), ZERO)
+        )
+
+
+def sales_changed(sender, **kwargs):
+    """post_save / post_delete receiver for SalesInvoice"""
+    bump_version(SALES_VERSION_KEY)
+
+
+def treasury_changed(sender, **kwargs):
+    """post_save / post_delete receiver for Treasury"""
+    bump_version(TREASURY_VERSION_KEY)
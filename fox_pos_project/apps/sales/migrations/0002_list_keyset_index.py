@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from fox_pos.listing import keyset_index_operation
+
+# sales_returns is not managed by Django (it comes with the
+# database dump). The list page walks it newest first by (key, pk), see
+# fox_pos.listing.KeysetListView
+KEYSET_INDEXES = [
+    ('sales_returns', 'idx_sales_returns_keyset', 'created_at, return_id'),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0001_initial'),
+    ]
+
+    operations = [
+        keyset_index_operation(KEYSET_INDEXES),
+    ]
@@ -7,6 +7,10 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from apps.products.models import Product
 from apps.customers.models import Customer
+from apps.api.services.debt_service import DebtService
+from apps.api.services.ledger_service import LedgerService
+from apps.api.services.stock_alert_service import StockAlertService
+from fox_pos.listing import KeysetListView
 from .models import SalesInvoice, SalesInvoiceItem, SalesReturn, SalesReturnItem
 from .forms import SalesReturnForm, SalesReturnItemFormSet
 import json
@@ -77,8 +81,10 @@ def api_create_invoice(request):
                 subtotal += float(item_subtotal)
                 
                 # Update Stock
+                previous_stock = product.current_stock
                 product.current_stock -= qty
                 product.save()
+                StockAlertService.record(product, previous_stock)
                 
                 invoice_items_to_create.append({
                     'product': product,
@@ -116,10 +122,13 @@ def api_create_invoice(request):
                     total=item_data['total']
                 )
             
-            # Update Customer Balance if debt
+            # Update Customer Balance if debt (negative = the customer owes us more)
             if remaining > 0:
-                customer.current_balance += remaining
-                customer.save()
+                LedgerService.post(
+                    customer, -remaining,
+                    transaction_id=invoice_number, description=f'فاتورة {invoice_number}', user=request.user
+                )
+                DebtService.open_debt(customer, remaining, invoice_number)
                 
             return JsonResponse({'success': True, 'invoice_number': invoice_number})
             
@@ -128,10 +137,12 @@ def api_create_invoice(request):
 
     return JsonResponse({'success': False, 'error': 'Invalid method'})
 
-@login_required
-def sales_return_list(request):
-    returns = SalesReturn.objects.all().order_by('-created_at')
-    return render(request, 'sales/return_list.html', {'returns': returns})
+sales_return_list = KeysetListView.as_view(
+    model=SalesReturn,
+    select_related=('original_invoice', 'customer'),
+    template_name='sales/return_list.html',
+    context_object_name='returns',
+)
 
 @login_required
 def sales_return_create(request):
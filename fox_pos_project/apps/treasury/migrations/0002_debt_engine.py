@@ -0,0 +1,93 @@
+from django.db import migrations
+from django.utils import timezone
+
+# debts / debt_payments are not managed by Django (they come with the
+# database dump), so their schema changes are applied here as SQL
+DEBT_SCHEMA_SQL = [
+    "ALTER TABLE fox_system.debts ADD COLUMN IF NOT EXISTS transaction_id varchar(50)",
+    # FIFO allocation: open debts of one party in due-date order
+    """
+    CREATE INDEX IF NOT EXISTS idx_debts_fifo
+    ON fox_system.debts (entity_type, entity_id, status, due_date, debt_id)
+    """,
+    # Aging: only open debts, covering the bucket columns (index-only scans)
+    """
+    CREATE INDEX IF NOT EXISTS idx_debts_open_due
+    ON fox_system.debts (due_date)
+    INCLUDE (debt_type, entity_type, entity_id, remaining_amount)
+    WHERE status <> 'paid'
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_debts_transaction
+    ON fox_system.debts (transaction_id)
+    WHERE transaction_id IS NOT NULL
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_debt_payments_debt ON fox_system.debt_payments (debt_id)",
+]
+
+
+def apply_debt_schema(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('fox_system.debts')")
+        if cursor.fetchone()[0] is None:
+            return
+        for sql in DEBT_SCHEMA_SQL:
+            cursor.execute(sql)
+
+
+def seed_opening_debts(apps, schema_editor):
+    """
+    Balances that predate the engine become one open debt per party, so
+    FIFO settlement and aging cover them
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Debt = apps.get_model('treasury', 'Debt')
+    Customer = apps.get_model('customers', 'Customer')
+    Supplier = apps.get_model('suppliers', 'Supplier')
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('fox_system.debts')")
+        if cursor.fetchone()[0] is None:
+            return
+
+    today = timezone.localdate()
+    open_statuses = ('pending', 'partial', 'overdue')
+    parties_with_debts = set(
+        Debt.objects.filter(status__in=open_statuses).values_list('entity_type', 'entity_id').distinct()
+    )
+
+    debts = []
+    for customer_id, balance in Customer.objects.filter(current_balance__lt=0).values_list('customer_id', 'current_balance'):
+        if ('customer', customer_id) not in parties_with_debts:
+            debts.append(Debt(
+                debt_type='receivable', entity_type='customer', entity_id=customer_id,
+                reference_type='opening_balance', original_amount=-balance, paid_amount=0,
+                remaining_amount=-balance, due_date=today, status='pending'
+            ))
+    for supplier_id, balance in Supplier.objects.filter(current_balance__gt=0).values_list('supplier_id', 'current_balance'):
+        if ('supplier', supplier_id) not in parties_with_debts:
+            debts.append(Debt(
+                debt_type='payable', entity_type='supplier', entity_id=supplier_id,
+                reference_type='opening_balance', original_amount=balance, paid_amount=0,
+                remaining_amount=balance, due_date=today, status='pending'
+            ))
+    Debt.objects.bulk_create(debts, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('treasury', '0001_initial'),
+        ('customers', '0001_initial'),
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(apply_debt_schema, migrations.RunPython.noop),
+        migrations.RunPython(seed_opening_debts, migrations.RunPython.noop),
+    ]
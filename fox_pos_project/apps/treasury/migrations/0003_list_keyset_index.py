@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from fox_pos.listing import keyset_index_operation
+
+# treasury is not managed by Django (it comes with the
+# database dump). The list page walks it newest first by (key, pk), see
+# fox_pos.listing.KeysetListView
+KEYSET_INDEXES = [
+    ('treasury', 'idx_treasury_keyset', 'created_at, transaction_id'),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('treasury', '0002_debt_engine'),
+    ]
+
+    operations = [
+        keyset_index_operation(KEYSET_INDEXES),
+    ]
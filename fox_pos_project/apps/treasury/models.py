@@ -60,12 +60,18 @@ class OperatingCost(models.Model):
         verbose_name_plural = 'تكاليف التشغيل'
 
 class Debt(models.Model):
+    # 'overdue' is allowed by the table's check constraint but not written:
+    # lateness is derived from due_date, which is indexed
+    OPEN_STATUSES = ('pending', 'partial', 'overdue')
+
     debt_id = models.AutoField(primary_key=True)
     debt_type = models.CharField(max_length=20)
     entity_type = models.CharField(max_length=20)
     entity_id = models.IntegerField()
     reference_type = models.CharField(max_length=50, blank=True, null=True)
     reference_id = models.IntegerField(blank=True, null=True)
+    # API transactions have string ids, which reference_id cannot hold
+    transaction_id = models.CharField(max_length=50, blank=True, null=True)
     original_amount = models.DecimalField(max_digits=12, decimal_places=2)
     paid_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
     remaining_amount = models.DecimalField(max_digits=12, decimal_places=2)
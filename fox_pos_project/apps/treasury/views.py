@@ -1,38 +1,25 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Sum, Case, When, DecimalField
+from fox_pos.listing import KeysetListView
+from apps.reports.kpis import treasury_totals
 from .models import Treasury
 from .forms import TreasuryForm
 
-@login_required
-def treasury_list(request):
-    transactions = Treasury.objects.all().order_by('-created_at')
-    
-    # Calculate balance
-    balance = Treasury.objects.aggregate(
-        total_income=Sum(Case(
-            When(transaction_type__in=['income', 'opening_balance'], then='amount'),
-            default=0,
-            output_field=DecimalField()
-        )),
-        total_expense=Sum(Case(
-            When(transaction_type='expense', then='amount'),
-            default=0,
-            output_field=DecimalField()
-        ))
-    )
-    
-    total_income = balance['total_income'] or 0
-    total_expense = balance['total_expense'] or 0
-    current_balance = total_income - total_expense
-    
-    return render(request, 'treasury/treasury_list.html', {
-        'transactions': transactions,
-        'total_income': total_income,
-        'total_expense': total_expense,
-        'current_balance': current_balance
-    })
+class TreasuryListView(KeysetListView):
+    model = Treasury
+    template_name = 'treasury/treasury_list.html'
+    context_object_name = 'transactions'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        # Balance covers the whole treasury, not just the page shown
+        context.update(treasury_totals())
+        return context
+
+
+treasury_list = TreasuryListView.as_view()
 
 @login_required
 def treasury_create(request):
@@ -3,6 +3,13 @@ ASGI config for fox_pos project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The live event stream (apps.api.live.EVENTS_PATH) is served directly by
+apps.api.live.events_app, so hundreds of idle tills cost one coroutine
+each; everything else goes to Django. Serve with an ASGI server, e.g.
+
+    uvicorn fox_pos.asgi:application --host 0.0.0.0 --port 8000
+    FOX_WORKER_CLASS=uvicorn.workers.UvicornWorker python run_production.py
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -13,4 +20,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fox_pos.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from apps.api.live import EVENTS_PATH, events_app  # noqa: E402  (needs the app registry)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == EVENTS_PATH:
+        await events_app(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -0,0 +1,184 @@
+"""
+Read-replica routing for reports, exports and backups
+
+The `replica` alias only exists when DB_REPLICA_HOST is set (see
+settings.py). Reads go to it only inside code explicitly marked as
+read-only reporting work:
+
+    @replica_reads                       # a view or ViewSet action
+    class ReportsViewSet(ReplicaReadMixin, viewsets.ViewSet)  # safe methods
+    with use_replica(): ...              # any block
+
+Everything else, and every write, goes to the primary. After a write the
+rest of the request is pinned to the primary, and ReplicaPinningMiddleware
+keeps the client on the primary for a short while so it reads its own
+writes. If the replica is unreachable or lags more than
+DB_REPLICA_MAX_LAG seconds, reads silently fall back to the primary.
+"""
+import contextvars
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA = 'replica'
+PRIMARY = 'default'
+PIN_COOKIE = 'fox_pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Per request (and per thread / asyncio task): may reads use the replica,
+# and has this request written anything yet
+_replica_allowed = contextvars.ContextVar('replica_allowed', default=False)
+_pinned = contextvars.ContextVar('pinned_to_primary', default=False)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def use_replica():
+    """Allow reads in this block to go to the replica"""
+    token = _replica_allowed.set(True)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(token)
+
+
+def replica_reads(view):
+    """Decorator for read-only views (functions or ViewSet actions)"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """ViewSet mixin: safe-method requests read from the replica"""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            _replica_allowed.set(True)
+
+
+def pin_to_primary():
+    _pinned.set(True)
+
+
+class ReplicaHealth:
+    """
+    Cached replica health check (one query every CHECK_INTERVAL seconds per process)
+
+    Lag is 0 when the replica has replayed everything it received, otherwise
+    the age of the last replayed transaction.
+    """
+    CHECK_INTERVAL = 5
+
+    LAG_SQL = """
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = 0
+        self._healthy = False
+
+    def is_healthy(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.CHECK_INTERVAL:
+            return self._healthy
+        with self._lock:
+            if now - self._checked_at >= self.CHECK_INTERVAL:
+                self._healthy = self._check()
+                self._checked_at = time.monotonic()
+        return self._healthy
+
+    def _check(self):
+        max_lag = getattr(settings, 'DB_REPLICA_MAX_LAG', 30)
+        try:
+            with connections[REPLICA].cursor() as cursor:
+                cursor.execute(self.LAG_SQL)
+                lag = float(cursor.fetchone()[0] or 0)
+        except Exception as e:
+            logger.warning('Replica unavailable, reading from primary: %s', e)
+            try:
+                connections[REPLICA].close()
+            except Exception:
+                pass
+            return False
+        if lag > max_lag:
+            logger.warning('Replica lag %.1fs exceeds %ss, reading from primary', lag, max_lag)
+            return False
+        return True
+
+
+replica_health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    """Send marked reads to the replica, everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if (
+            replica_configured()
+            and _replica_allowed.get()
+            and not _pinned.get()
+            and replica_health.is_healthy()
+        ):
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaPinningMiddleware:
+    """
+    Reset routing state per request; after a write request, keep the
+    client on the primary for DB_REPLICA_MAX_LAG seconds (read-your-writes)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        allowed_token = _replica_allowed.set(False)
+        pinned_token = _pinned.set(PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+            if replica_configured() and request.method not in SAFE_METHODS:
+                response.set_cookie(
+                    PIN_COOKIE, '1',
+                    max_age=int(getattr(settings, 'DB_REPLICA_MAX_LAG', 30)),
+                    httponly=True, samesite='Lax'
+                )
+            return response
+        finally:
+            _replica_allowed.reset(allowed_token)
+            _pinned.reset(pinned_token)
+
+
+def read_alias(model=None):
+    """Alias to use for raw SQL that should follow the routing rules"""
+    return ReplicaRouter().db_for_read(model)
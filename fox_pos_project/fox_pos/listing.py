@@ -0,0 +1,184 @@
+"""
+Keyset-paginated list pages for the server-rendered views
+
+    movement_list = KeysetListView.as_view(
+        model=InventoryMovement,
+        key_field='movement_date',
+        select_related=('product',),
+        template_name='inventory/movement_list.html',
+        context_object_name='movements',
+    )
+
+Rows are ordered newest first by (key_field, pk) and pages are addressed
+by a cursor holding the last row's key instead of an OFFSET, so every
+page is one index range scan of page_size + 1 rows (no COUNT, no skipped
+rows) however large the table grows. The table needs an index on
+(key_field, pk); ?from_date / ?to_date filter on the same column.
+
+Templates get the rows under context_object_name plus `pagination`
+(next_url / previous_url) and `filters`; includes/keyset_pagination.html
+and includes/list_filters.html render them.
+
+The listed tables mostly come with the database dump, so their indexes
+are created by a migration of the app that lists them:
+
+    KEYSET_INDEXES = [('sales_returns', 'idx_sales_returns_keyset', 'created_at, return_id')]
+    operations = [keyset_index_operation(KEYSET_INDEXES)]
+"""
+import base64
+import json
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import migrations
+from django.db.models import Q
+from django.views.generic import TemplateView
+from rest_framework.exceptions import ValidationError
+
+from apps.api.utils import filter_date_range
+
+
+def keyset_index_operation(indexes):
+    """
+    RunPython operation creating (key, pk) indexes in fox_system
+
+    Args:
+        indexes: [(table, index name, 'key_column, pk_column')]; a table
+            missing from the database (no dump restored) is skipped
+    """
+    def create(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            for table, index, columns in indexes:
+                cursor.execute("SELECT to_regclass(%s)", [f'fox_system.{table}'])
+                if cursor.fetchone()[0] is None:
+                    continue
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS {index} ON fox_system.{table} ({columns})')
+
+    def drop(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            for _, index, _ in indexes:
+                cursor.execute(f'DROP INDEX IF EXISTS fox_system.{index}')
+
+    return migrations.RunPython(create, drop)
+
+
+def encode_cursor(key, pk):
+    raw = json.dumps([key.isoformat() if hasattr(key, 'isoformat') else key, pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    key, pk = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    return key, pk
+
+
+class KeysetListView(LoginRequiredMixin, TemplateView):
+    model = None
+    key_field = 'created_at'
+    select_related = ()
+    page_size = 50
+    context_object_name = 'object_list'
+
+    def get_queryset(self):
+        queryset = self.model._default_manager.all()
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        return queryset
+
+    def get_filters(self):
+        return {
+            'from_date': self.request.GET.get('from_date', ''),
+            'to_date': self.request.GET.get('to_date', ''),
+        }
+
+    def filter_queryset(self, queryset, filters):
+        try:
+            return filter_date_range(queryset, filters['from_date'], filters['to_date'], field=self.key_field)
+        except ValidationError:
+            # A malformed date in the URL just shows the unfiltered list
+            return queryset
+
+    def parse_cursor(self, cursor):
+        """(key, pk) of a cursor (key None for a row without one), or None if invalid"""
+        try:
+            key, pk = decode_cursor(cursor)
+            if key is not None:
+                key = self.model._meta.get_field(self.key_field).to_python(key)
+            pk = self.model._meta.pk.to_python(pk)
+        except Exception:
+            return None
+        return (key, pk) if pk is not None else None
+
+    def page_rows(self, queryset):
+        """
+        One page of rows, newest first; rows without a key come last, by pk
+
+        The redundant `key <=` / `key >=` bound makes the cursor an index
+        range condition rather than a filter on a full index scan. Rows
+        with and without a key are read by separate queries, each an index
+        range, the second only when the first does not fill the page.
+        """
+        key, pk = self.key_field, self.model._meta.pk.name
+        limit = self.page_size + 1
+        keyed = queryset.filter(**{f'{key}__isnull': False})
+        unkeyed = queryset.filter(**{f'{key}__isnull': True})
+        after = self.parse_cursor(self.request.GET.get('after', ''))
+        before = None if after else self.parse_cursor(self.request.GET.get('before', ''))
+
+        def take(*parts):
+            rows = []
+            for part in parts:
+                if len(rows) < limit:
+                    rows += part[:limit - len(rows)]
+            return rows
+
+        if before:
+            # Previous page: walk forward from the cursor, then flip
+            value, last_pk = before
+            if value is None:
+                rows = take(unkeyed.filter(**{f'{pk}__gt': last_pk}).order_by(pk), keyed.order_by(key, pk))
+            else:
+                rows = take(keyed.filter(
+                    Q(**{f'{key}__gte': value}),
+                    Q(**{f'{key}__gt': value}) | Q(**{key: value, f'{pk}__gt': last_pk})
+                ).order_by(key, pk))
+            has_previous = len(rows) > self.page_size
+            return rows[:self.page_size][::-1], has_previous, True
+
+        newest_first = keyed.order_by(f'-{key}', f'-{pk}')
+        if after is None:
+            rows = take(newest_first, unkeyed.order_by(f'-{pk}'))
+        elif after[0] is None:
+            rows = take(unkeyed.filter(**{f'{pk}__lt': after[1]}).order_by(f'-{pk}'))
+        else:
+            value, last_pk = after
+            rows = take(newest_first.filter(
+                Q(**{f'{key}__lte': value}),
+                Q(**{f'{key}__lt': value}) | Q(**{key: value, f'{pk}__lt': last_pk})
+            ), unkeyed.order_by(f'-{pk}'))
+        has_next = len(rows) > self.page_size
+        return rows[:self.page_size], after is not None, has_next
+
+    def page_url(self, direction, row):
+        params = self.request.GET.copy()
+        params.pop('after', None)
+        params.pop('before', None)
+        params[direction] = encode_cursor(getattr(row, self.key_field), row.pk)
+        return f'?{params.urlencode()}'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        filters = self.get_filters()
+        rows, has_previous, has_next = self.page_rows(self.filter_queryset(self.get_queryset(), filters))
+
+        context[self.context_object_name] = rows
+        context['filters'] = filters
+        context['pagination'] = {
+            'previous_url': self.page_url('before', rows[0]) if rows and has_previous else None,
+            'next_url': self.page_url('after', rows[-1]) if rows and has_next else None,
+        }
+        return context
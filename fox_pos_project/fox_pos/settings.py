@@ -1,10 +1,29 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-SECRET_KEY = 'django-insecure-#1y+$h7w)48h%od*%hezte7@qi0dbmot=)dgzainemu@ya&yjd'
 
-DEBUG = True
+def env_bool(name, default=False):
+    """Read a boolean flag from the environment"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Deployment profile: 'development' (default) or 'production'.
+# run_production.py sets FOX_ENV=production before loading Django.
+FOX_ENV = os.environ.get('FOX_ENV', 'development')
+IS_PRODUCTION = FOX_ENV == 'production'
+
+SECRET_KEY = os.environ.get(
+    'DJANGO_SECRET_KEY',
+    'django-insecure-#1y+$h7w)48h%od*%hezte7@qi0dbmot=)dgzainemu@ya&yjd'
+)
+
+# DEBUG keeps every executed query in memory, so it is off in production
+DEBUG = env_bool('DJANGO_DEBUG', default=not IS_PRODUCTION)
 
 ALLOWED_HOSTS = ['*']
 
@@ -51,6 +70,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'fox_pos.db_router.ReplicaPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'fox_pos.urls'
@@ -71,22 +91,54 @@ TEMPLATES = [
     },
 ]
 
+# Production compiles each template once per process and never checks the
+# files again (deploys restart the workers)
+if IS_PRODUCTION:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'fox_pos.wsgi.application'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'fox_db',
-        'USER': 'fox_admin',
-        'PASSWORD': 'Ebnb@t0t@',
-        'HOST': 'localhost',
-        'PORT': '5444',
+        'NAME': os.environ.get('DB_NAME', 'fox_db'),
+        'USER': os.environ.get('DB_USER', 'fox_admin'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'Ebnb@t0t@'),
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', '5444'),
+        # Persistent connections: reuse the PostgreSQL session across requests
+        # instead of paying a TCP + auth handshake each time. Health checks
+        # drop connections that died while idle before they are reused.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600 if IS_PRODUCTION else 0)),
+        'CONN_HEALTH_CHECKS': True,
         'OPTIONS': {
             'options': '-c search_path=fox_system,public'
         }
     }
 }
 
+# Optional streaming replica for reports, exports and backups
+# (see fox_pos/db_router.py). Unset DB_REPLICA_HOST = single database.
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'USER': os.environ.get('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['fox_pos.db_router.ReplicaRouter']
+# Replica lag (seconds) beyond which reads fall back to the primary
+DB_REPLICA_MAX_LAG = int(os.environ.get('DB_REPLICA_MAX_LAG', 30))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -118,7 +170,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.api.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -143,6 +195,50 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Shared cache: a file cache is visible to every worker process on the
+# host (gunicorn runs several) and needs no extra service.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('FOX_CACHE_DIR', str(BASE_DIR / 'cache')),
+        'TIMEOUT': 300,
+    }
+}
+
+# Activity log sink (see apps/api/activity_log.py)
+# 'async' buffers records in memory and writes them with bulk_create from a
+# background thread; 'sync' inserts each record inside the request.
+ACTIVITY_LOG = {
+    'MODE': os.environ.get('ACTIVITY_LOG_MODE', 'async'),
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_QUEUE_SIZE': 10000,
+}
+
+# In-process cache of authenticated users and their open shift (see
+# apps/api/authentication.py); entries are dropped as soon as the user or
+# their shift changes, TIMEOUT (seconds) only bounds their age.
+AUTH_USER_CACHE = {
+    'TIMEOUT': 60,
+    'MAX_ENTRIES': 1000,
+}
+
+# Live product / settings events for the tills (see apps/api/live.py, served
+# by fox_pos/asgi.py). A stream that falls QUEUE_SIZE events behind is
+# closed and resumes from the live_events table, which keeps RETENTION_HOURS.
+LIVE_EVENTS = {
+    'QUEUE_SIZE': 100,
+    'HEARTBEAT': 20,          # Seconds between keep-alive comments
+    'RETENTION_HOURS': 24,
+    'BACKLOG_LIMIT': 1000,    # Most events replayed on resume; beyond that the till refetches
+}
+
+# Rendered invoice/quotation PDFs (see apps/api/services/pdf_service.py).
+# PDF_FONT_PATH must point to a TTF with Arabic glyphs when none of the
+# usual system fonts (Tahoma, Arial, Noto Naskh, DejaVu) is installed.
+PDF_CACHE_DIR = BASE_DIR / 'pdf_cache'  # Outside MEDIA_ROOT: never served publicly
+PDF_FONT_PATH = os.environ.get('PDF_FONT_PATH')
+
 # JWT Settings
 from datetime import timedelta
 
@@ -155,6 +251,16 @@ SIMPLE_JWT = {
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_REFRESH_SERIALIZER': 'apps.api.tokens.TokenRefreshSerializer',
+}
+
+# Refresh token blacklist (see apps/api/tokens.py). prune_tokens deletes
+# expired tokens in batches of PRUNE_BATCH_SIZE; run_production.py runs it at
+# startup and the live event hub hourly.
+TOKEN_BLACKLIST = {
+    'BLOOM_CAPACITY': 200000,    # Blacklisted JTIs before the filter is rebuilt
+    'BLOOM_ERROR_RATE': 0.001,   # Share of unrevoked tokens still checked in the database
+    'PRUNE_BATCH_SIZE': 5000,
 }
 
 # Login Configuration
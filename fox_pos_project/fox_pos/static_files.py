@@ -0,0 +1,311 @@
+"""
+Static and media file serving for the single-server deployment
+
+The React bundle, collected static files and uploads are served by Django
+itself (there is no nginx in front of the tills), so this module does what
+a web server would:
+
+* STATIC_ROOT is indexed once per process into an in-memory manifest, so a
+  request costs a dict lookup instead of several os.path.exists() calls.
+* Pre-compressed `.gz` siblings (see `manage.py compress_static`) are sent
+  to clients that accept gzip.
+* ETag / Last-Modified are answered with 304, and single byte ranges
+  with 206.
+* Vite's content-hashed assets are cached for a year as immutable; HTML
+  and unhashed files are always revalidated, which after the first visit
+  costs a 304.
+
+MEDIA_ROOT changes at runtime (uploads, generated barcodes), so it is
+looked up with one os.stat() per request instead of a manifest, with the
+same caching headers and conditional/range handling.
+"""
+import mimetypes
+import os
+import re
+import stat
+import threading
+from dataclasses import dataclass
+
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseNotAllowed, HttpResponseNotFound,
+    StreamingHttpResponse,
+)
+from django.utils.http import http_date, parse_http_date_safe
+
+# Vite names bundle files <name>-<8 char hash>.<ext>. A hash has a digit,
+# capital or underscore somewhere; an eight-letter word (react-dropzone.js,
+# app-settings.css) is a plain file name
+HASHED_ASSET = re.compile(r'-(?=[a-z-]*[0-9A-Z_])[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+# Django's ManifestStaticFilesStorage style: <name>.<12 hex>.<ext>
+HASHED_STATIC = re.compile(r'\.[0-9a-f]{12}\.[A-Za-z0-9]+$')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+COMPRESSIBLE_EXTENSIONS = ('.js', '.mjs', '.css', '.html', '.svg', '.json', '.map', '.txt', '.xml', '.ico')
+
+CHUNK_SIZE = 64 * 1024
+
+mimetypes.add_type('application/javascript', '.js')
+mimetypes.add_type('application/javascript', '.mjs')
+mimetypes.add_type('text/css', '.css')
+mimetypes.add_type('font/woff2', '.woff2')
+mimetypes.add_type('image/svg+xml', '.svg')
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    path: str
+    size: int
+    mtime: int
+    content_type: str
+    cache_control: str
+    gzip_path: str = None
+    gzip_size: int = 0
+
+    @property
+    def etag(self):
+        return f'"{self.size:x}-{self.mtime:x}"'
+
+    @property
+    def gzip_etag(self):
+        return f'"{self.size:x}-{self.mtime:x}-gz"'
+
+
+def cache_control_for(relative_path):
+    name = os.path.basename(relative_path)
+    if HASHED_ASSET.search(name) or HASHED_STATIC.search(name):
+        return IMMUTABLE
+    return REVALIDATE
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip ('gzip;q=0' refuses it)"""
+    wildcard = False
+    for coding in accept_encoding.split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        name = name.lower()
+        if name in ('gzip', 'x-gzip'):
+            return quality > 0
+        if name == '*':
+            wildcard = quality > 0
+    return wildcard
+
+
+def content_type_for(path):
+    content_type, encoding = mimetypes.guess_type(path)
+    content_type = content_type or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+        content_type += '; charset=utf-8'
+    return content_type
+
+
+def stat_file(root, relative_path):
+    """Describe one file under root (None if missing or outside root)"""
+    root = os.path.abspath(root)
+    full_path = os.path.abspath(os.path.join(root, relative_path.lstrip('/\\')))
+    if full_path != root and not full_path.startswith(root + os.sep):
+        return None
+    try:
+        info = os.stat(full_path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(info.st_mode):
+        return None
+
+    gzip_path, gzip_size = None, 0
+    try:
+        gzip_info = os.stat(full_path + '.gz')
+        if gzip_info.st_mtime >= info.st_mtime:
+            gzip_path, gzip_size = full_path + '.gz', gzip_info.st_size
+    except OSError:
+        pass
+
+    return StaticFile(
+        path=full_path,
+        size=info.st_size,
+        mtime=int(info.st_mtime),
+        content_type=content_type_for(full_path),
+        cache_control=cache_control_for(relative_path),
+        gzip_path=gzip_path,
+        gzip_size=gzip_size,
+    )
+
+
+class DirectoryIndex:
+    """Looks files up on disk on every request (for directories that change)"""
+
+    def __init__(self, root):
+        self.root = str(root)
+
+    def get(self, relative_path):
+        return stat_file(self.root, relative_path)
+
+
+class StaticManifest(DirectoryIndex):
+    """In-memory index of a directory, built once"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.files = {}
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith('.gz'):
+                    continue
+                relative_path = os.path.relpath(os.path.join(directory, filename), self.root)
+                relative_path = relative_path.replace(os.sep, '/')
+                entry = stat_file(self.root, relative_path)
+                if entry:
+                    self.files[relative_path] = entry
+
+    def get(self, relative_path):
+        return self.files.get(relative_path.lstrip('/'))
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(root, manifest=True):
+    """Shared index per root: a manifest, or a live DirectoryIndex"""
+    key = (str(root), manifest)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = StaticManifest(root) if manifest else DirectoryIndex(root)
+                _indexes[key] = index
+    return index
+
+
+def not_modified(request, etag, mtime):
+    """Evaluate If-None-Match / If-Modified-Since"""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags or f'W/{etag}' in tags
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and mtime <= if_modified_since
+
+
+def parse_range(header, size):
+    """
+    Parse a single 'bytes=' range
+
+    Returns:
+        (start, end) inclusive, None to ignore the header, or False if unsatisfiable
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None  # Absent or multi-range: send the whole file
+    start, _, end = header[6:].strip().partition('-')
+    try:
+        if start == '':
+            length = int(end)
+            if length <= 0:
+                return False
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def iter_range(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            data = handle.read(min(CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def serve_file(request, entry, cache_control=None):
+    """Build the response for a StaticFile, honouring conditional, gzip and range requests"""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+
+    cache_control = cache_control or entry.cache_control
+    range_header = request.META.get('HTTP_RANGE')
+    # Byte ranges always refer to the identity encoding
+    use_gzip = (bool(entry.gzip_path) and not range_header
+                and accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+    etag = entry.gzip_etag if use_gzip else entry.etag
+
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(entry.mtime),
+        'Cache-Control': cache_control,
+        'Accept-Ranges': 'bytes',
+    }
+    if entry.gzip_path:
+        headers['Vary'] = 'Accept-Encoding'
+
+    if not_modified(request, etag, entry.mtime):
+        response = HttpResponse(status=304)
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    byte_range = None
+    if range_header:
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if not if_range or if_range == entry.etag or if_range == http_date(entry.mtime):
+            byte_range = parse_range(range_header, entry.size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{entry.size}'
+        return response
+
+    head = request.method == 'HEAD'
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            [] if head else iter_range(entry.path, start, length),
+            status=206,
+            content_type=entry.content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{entry.size}'
+        response['Content-Length'] = str(length)
+    elif use_gzip:
+        response = (HttpResponse(content_type=entry.content_type) if head
+                    else FileResponse(open(entry.gzip_path, 'rb'), content_type=entry.content_type))
+        response['Content-Encoding'] = 'gzip'
+        response['Content-Length'] = str(entry.gzip_size)
+    else:
+        response = (HttpResponse(content_type=entry.content_type) if head
+                    else FileResponse(open(entry.path, 'rb'), content_type=entry.content_type))
+        response['Content-Length'] = str(entry.size)
+
+    # FileResponse adds an inline Content-Disposition from the file name
+    response.headers.pop('Content-Disposition', None)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def serve_from(root, manifest=True, cache_control=None):
+    """
+    View serving files under root: path('static/<path:path>', serve_from(STATIC_ROOT))
+    """
+    def view(request, path=''):
+        entry = get_index(root, manifest).get(path)
+        if entry is None:
+            return HttpResponseNotFound('Not found')
+        return serve_file(request, entry, cache_control)
+    return view
@@ -1,48 +1,34 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView
-from django.http import FileResponse
+from django.http import HttpResponseNotFound
+from fox_pos.static_files import get_index, serve_file, serve_from
 from apps.users import views as user_views
-import os
+
 
 def serve_react_app(request, path=''):
-    """Serve React app from staticfiles"""
-    if not path or path.endswith('/'):
-        path = 'index.html'
-    
-    file_path = os.path.join(settings.BASE_DIR, 'staticfiles', path)
+    """Serve the React app from staticfiles (index.html for client-side routes)"""
+    # Collected files are indexed once per process; in development they are
+    # looked up on disk so a rebuild shows up without a restart
+    index = get_index(settings.STATIC_ROOT, manifest=not settings.DEBUG)
     
-    # Try common React build subdirectories if not found in root
-    if not os.path.exists(file_path):
-        # Specific fix for root-level assets in React build
-        if path == 'fox-logo.png':
-           file_path = os.path.join(settings.BASE_DIR, 'staticfiles', 'fox-logo.png')
-        else:
-            for sub in ['assets', 'fonts', 'lib']:
-                temp_path = os.path.join(settings.BASE_DIR, 'staticfiles', sub, path)
-                if os.path.exists(temp_path):
-                    file_path = temp_path
-                    break
+    entry = None
+    if path and not path.endswith('/'):
+        # Vite assets are requested both from the root and from their subdirectory
+        for candidate in (path, f'assets/{path}', f'fonts/{path}', f'lib/{path}'):
+            entry = index.get(candidate)
+            if entry:
+                break
     
-    if os.path.exists(file_path) and os.path.isfile(file_path):
-        if path.endswith('.html'):
-            return FileResponse(open(file_path, 'rb'), content_type='text/html')
-        elif path.endswith('.js'):
-            return FileResponse(open(file_path, 'rb'), content_type='application/javascript')
-        elif path.endswith('.css'):
-            return FileResponse(open(file_path, 'rb'), content_type='text/css')
-        else:
-            return FileResponse(open(file_path, 'rb'))
-    else:
+    if entry is None:
         # Fallback to index.html for React Router
-        index_path = os.path.join(settings.BASE_DIR, 'staticfiles', 'index.html')
-        if os.path.exists(index_path):
-            return FileResponse(open(index_path, 'rb'), content_type='text/html')
-        else:
-            from django.http import HttpResponseNotFound
+        entry = index.get('index.html')
+        if entry is None:
             return HttpResponseNotFound("React app not found")
+    
+    return serve_file(request, entry)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -66,4 +52,14 @@ urlpatterns = [
     # Serve React app
     path('app/<path:path>', serve_react_app, name='react_app'),
     path('app/', serve_react_app, name='react_app_root'),
-] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT) + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT) + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+else:
+    # static() is a no-op when DEBUG is off, but the single-server deployment
+    # still has to serve collected assets and uploads itself (see static_files.py)
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), serve_from(settings.STATIC_ROOT)),
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_from(settings.MEDIA_ROOT, manifest=False)),
+    ]
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Gunicorn configuration for the FOX ERP production server.
+
+Used by run_production.py on Linux/macOS. Every value can be overridden
+from the environment so the same file works on small tills and on the
+main server.
+
+    FOX_BIND                 Address to listen on (default 0.0.0.0:8000)
+    FOX_WORKERS              Worker processes (default 2 * CPU cores + 1)
+    FOX_THREADS              Threads per worker (default 4)
+    FOX_WORKER_CLASS         gthread (WSGI, default) or uvicorn.workers.UvicornWorker
+                             (ASGI, serves the live event stream too)
+    FOX_MAX_REQUESTS         Recycle a worker after this many requests
+    FOX_WORKER_MAX_RSS_MB    Recycle a worker once its memory passes this size
+"""
+import multiprocessing
+import os
+import resource
+import sys
+
+bind = os.environ.get('FOX_BIND', '0.0.0.0:8000')
+
+# One process per core (plus spares) so checkout throughput scales with the
+# CPU instead of being bound to a single interpreter.
+workers = int(os.environ.get('FOX_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('FOX_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('FOX_THREADS', 4))
+
+# Graceful restart: `kill -HUP <master pid>` starts new workers and lets the
+# old ones finish their in-flight requests before exiting.
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+
+# Memory-growth recycling: restart workers after a bounded number of
+# requests (jittered so they do not all restart together) ...
+max_requests = int(os.environ.get('FOX_MAX_REQUESTS', 2000))
+max_requests_jitter = max(1, max_requests // 10)
+
+# ... or as soon as one grows past the RSS ceiling.
+worker_max_rss_mb = int(os.environ.get('FOX_WORKER_MAX_RSS_MB', 512))
+
+accesslog = os.environ.get('FOX_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('FOX_LOG_LEVEL', 'info')
+proc_name = 'fox_erp'
+
+raw_env = [
+    'DJANGO_SETTINGS_MODULE=fox_pos.settings',
+    'FOX_ENV=%s' % os.environ.get('FOX_ENV', 'production'),
+]
+
+
+def _rss_mb():
+    """Peak resident memory of the current process in MB"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == 'darwin':
+        return usage / (1024 * 1024)
+    return usage / 1024
+
+
+def post_request(worker, req, environ, resp):
+    """Ask the worker to exit gracefully once it grows too large"""
+    if worker_max_rss_mb and _rss_mb() > worker_max_rss_mb:
+        worker.log.info(
+            'Worker %s exceeded %s MB, recycling', worker.pid, worker_max_rss_mb
+        )
+        worker.alive = False
+
+
+def worker_exit(server, worker):
+    """Flush buffered activity logs and close the worker's DB connections"""
+    try:
+        from apps.api.activity_log import shutdown_activity_log_writer
+        shutdown_activity_log_writer()
+
+        from django.db import connections
+        connections.close_all()
+    except Exception:
+        pass
@@ -1,17 +1,91 @@
 import os
 import sys
-from waitress import serve
-from fox_pos.wsgi import application
 
 # Add current directory to path
-sys.path.append(os.getcwd())
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Load the production settings profile unless told otherwise
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fox_pos.settings')
+os.environ.setdefault('FOX_ENV', 'production')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+GUNICORN_CONFIG = os.path.join(BASE_DIR, 'gunicorn.conf.py')
+
+
+def can_use_gunicorn():
+    """Gunicorn (multi-process) is only available on POSIX systems"""
+    if os.name == 'nt' or '--waitress' in sys.argv:
+        return False
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def prepare_database():
+    """Pre-compress static assets, create upcoming monthly partitions and prune expired tokens before taking traffic"""
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import connections
+
+    try:
+        call_command('compress_static')
+    except Exception as e:
+        print(f"⚠️  Static compression skipped: {e}")
+
+    try:
+        call_command('manage_partitions')
+    except Exception as e:
+        print(f"⚠️  Partition maintenance skipped: {e}")
+
+    try:
+        call_command('prune_tokens')
+    except Exception as e:
+        print(f"⚠️  Token pruning skipped: {e}")
+    finally:
+        # Do not hand an open connection to forked workers
+        connections.close_all()
+
+
+def run_gunicorn():
+    """Run several worker processes behind a gunicorn master"""
+    from gunicorn.app.wsgiapp import run
+
+    # Uvicorn workers serve the ASGI app, which adds the live event stream
+    asgi = 'uvicorn' in os.environ.get('FOX_WORKER_CLASS', '')
+    app = 'fox_pos.asgi:application' if asgi else 'fox_pos.wsgi:application'
+    sys.argv = ['gunicorn', '--config', GUNICORN_CONFIG, app]
+    run()
+
+
+def run_waitress():
+    """Single-process fallback (Windows tills)"""
+    from waitress import serve
+    from fox_pos.wsgi import application
+
+    threads = int(os.environ.get('FOX_THREADS', 10))
+    host, _, port = os.environ.get('FOX_BIND', '0.0.0.0:8000').rpartition(':')
+
+    # We use 0.0.0.0 to allow access from local network if needed
+    serve(application, host=host or '0.0.0.0', port=int(port), threads=threads)
+
 
 if __name__ == "__main__":
+    use_gunicorn = can_use_gunicorn()
+
     print("------------------------------------------")
     print("🚀 Starting FOX ERP Production Server")
     print("🌐 URL: http://localhost:8000/app/")
+    print(f"⚙️  Mode: {'gunicorn (multi-process)' if use_gunicorn else 'waitress (single process)'}")
     print("------------------------------------------")
-    
+
+    prepare_database()
+
     # Run the server
-    # We use 0.0.0.0 to allow access from local network if needed
-    serve(application, host='0.0.0.0', port=8000, threads=10)
+    if use_gunicorn:
+        run_gunicorn()
+    else:
+        run_waitress()